@@ -1,8 +1,10 @@
 from pydantic import BaseModel, validator
-from typing import Optional
+from typing import List, Optional
 
 class Query(BaseModel):
     text: str
+    max_sentences: Optional[int] = None
+    stop: Optional[List[str]] = None
     
     @validator('text')
     def validate_text(cls, v):
@@ -18,9 +20,28 @@ class Query(BaseModel):
         sanitized = ''.join(char for char in sanitized if ord(char) >= 32)
         
         return sanitized
+    
+    @validator('max_sentences')
+    def validate_max_sentences(cls, v):
+        """Limit the sentence budget to a sensible range"""
+        if v is not None and not 1 <= v <= 10:
+            raise ValueError('max_sentences must be between 1 and 10')
+        return v
+    
+    @validator('stop')
+    def validate_stop(cls, v):
+        """Validate extra stop sequences"""
+        if v is None:
+            return v
+        if len(v) > 4:
+            raise ValueError('At most 4 stop sequences allowed')
+        if any(not s or len(s) > 32 for s in v):
+            raise ValueError('Stop sequences must be 1-32 characters')
+        return v
 
 class TranslationRequest(BaseModel):
     text: str
+    tier: Optional[str] = None  # "fast", "balanced" or "best"
     
     @validator('text')
     def validate_text(cls, v):
@@ -35,6 +56,56 @@ class TranslationRequest(BaseModel):
         sanitized = ''.join(char for char in sanitized if ord(char) >= 32)
         
         return sanitized
+    
+    @validator('tier')
+    def validate_tier(cls, v):
+        """Quality/latency tier; None lets the server choose"""
+        if v is not None and v not in ('fast', 'balanced', 'best'):
+            raise ValueError("Tier must be 'fast', 'balanced' or 'best'")
+        return v
+
+class BatchTranslationItem(BaseModel):
+    text: str
+    direction: str
+    tier: Optional[str] = None
+    
+    @validator('text')
+    def validate_text(cls, v):
+        """Validate and sanitize translation text"""
+        if not v or len(v.strip()) == 0:
+            raise ValueError('Text cannot be empty')
+        if len(v) > 2000:
+            raise ValueError('Text too long (max 2000 characters)')
+        
+        # Basic sanitization
+        sanitized = v.strip()
+        sanitized = ''.join(char for char in sanitized if ord(char) >= 32)
+        
+        return sanitized
+    
+    @validator('direction')
+    def validate_direction(cls, v):
+        """Only the two supported directions"""
+        if v not in ('en2rw', 'rw2en'):
+            raise ValueError("Direction must be 'en2rw' or 'rw2en'")
+        return v
+    
+    @validator('tier')
+    def validate_tier(cls, v):
+        """Quality/latency tier; None lets the server choose"""
+        if v is not None and v not in ('fast', 'balanced', 'best'):
+            raise ValueError("Tier must be 'fast', 'balanced' or 'best'")
+        return v
+
+class BatchTranslationRequest(BaseModel):
+    items: List[BatchTranslationItem]
+    
+    @validator('items')
+    def validate_items(cls, v):
+        """Require at least one item (size caps are enforced by the endpoint)"""
+        if not v:
+            raise ValueError('At least one item is required')
+        return v
 
 class MapsQuery(BaseModel):
     query: str
@@ -80,6 +151,21 @@ class TranslationResponse(BaseModel):
     source_language: str
     target_language: str
     service_used: str
+    tier: Optional[str] = None  # None when answered from the phrasebook
+    detected_language: Optional[str] = None  # set when the text looks like the target language
+    warning: Optional[str] = None
+
+class BatchTranslationResult(BaseModel):
+    translation: Optional[str] = None
+    direction: str
+    time_ms: float
+    cached: bool = False
+    error: Optional[str] = None
+
+class BatchTranslationResponse(BaseModel):
+    results: List[BatchTranslationResult]
+    processing_time: str
+    service_used: str
 
 class HealthResponse(BaseModel):
     status: str
@@ -1,12 +1,51 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, constr, validator
 from typing import Dict, List, Optional
 
 # ===== Base Models =====
 class Query(BaseModel):
     text: str
+    max_sentences: Optional[int] = Field(None, ge=1, le=10)
+    stop: Optional[List[constr(min_length=1, max_length=32)]] = Field(None, max_length=4)
 
 class TranslationRequest(BaseModel):
     text: str
+    tier: Optional[str] = None  # "fast", "balanced" or "best"; None lets the server choose
+
+class BatchTranslationItem(BaseModel):
+    text: str
+    direction: str  # "en2rw" or "rw2en"
+    tier: Optional[str] = None
+    
+    @validator('text')
+    def validate_text(cls, v):
+        """Validate and sanitize translation text"""
+        if not v or len(v.strip()) == 0:
+            raise ValueError('Text cannot be empty')
+        if len(v) > 2000:
+            raise ValueError('Text too long (max 2000 characters)')
+        
+        # Basic sanitization
+        sanitized = v.strip()
+        sanitized = ''.join(char for char in sanitized if ord(char) >= 32)
+        
+        return sanitized
+    
+    @validator('direction')
+    def validate_direction(cls, v):
+        """Only the two supported directions"""
+        if v not in ('en2rw', 'rw2en'):
+            raise ValueError("Direction must be 'en2rw' or 'rw2en'")
+        return v
+
+class BatchTranslationRequest(BaseModel):
+    items: List[BatchTranslationItem]
+    
+    @validator('items')
+    def validate_items(cls, v):
+        """Require at least one item (size caps are enforced by the endpoint)"""
+        if not v:
+            raise ValueError('At least one item is required')
+        return v
 
 class MapsQuery(BaseModel):
     query: str
@@ -25,6 +64,21 @@ class TranslationResponse(BaseModel):
     source_language: str
     target_language: str
     service_used: str
+    tier: Optional[str] = None  # None when answered from the phrasebook
+    detected_language: Optional[str] = None  # set when the text looks like the target language
+    warning: Optional[str] = None
+
+class BatchTranslationResult(BaseModel):
+    translation: Optional[str] = None
+    direction: str
+    time_ms: float
+    cached: bool = False
+    error: Optional[str] = None
+
+class BatchTranslationResponse(BaseModel):
+    results: List[BatchTranslationResult]
+    processing_time: str
+    service_used: str
 
 class HealthResponse(BaseModel):
     status: str
@@ -1,12 +1,16 @@
 import os
 import gc
+import asyncio
+import json
 import logging
 import time
 import shutil
 import torch
+from typing import Optional
 from fastapi import FastAPI, Request, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from twilio.twiml.messaging_response import MessagingResponse
 
 # Import our modular components
@@ -14,12 +18,15 @@ from config import settings
 from utils.helpers import ensure_directories, get_dir_size
 from services.vector_store import VectorStoreService
 from services.rag_service import RAGService
-from services.translation import TranslationService
+from services.translation import TRANSLATION_TIERS, TranslationService
 from services.maps_service import MapsService
 from services.weather_service import WeatherService
+from services.inference_executor import InferenceExecutor, QueueFullError
+from services.model_registry import model_registry
 from services.whatsapp_service import WhatsAppService
 from api.models import (
     Query, TranslationRequest, QueryResponse, TranslationResponse, 
+    BatchTranslationRequest, BatchTranslationResult, BatchTranslationResponse,
     HealthResponse, RootResponse, MapsQuery, WeatherQuery
 )
 from middleware.rate_limiter import RateLimiter, rate_limit_middleware
@@ -53,6 +60,7 @@ rate_limiter = RateLimiter(requests_per_minute=60)
 app.middleware("http")(rate_limit_middleware(rate_limiter))
 
 # Global service instances
+inference_executor = None
 vector_store_service = None
 rag_service = None
 translation_service = None
@@ -63,7 +71,7 @@ whatsapp_service = None
 @app.on_event("startup")
 async def startup_event():
     """Initialize application with all services including WhatsApp"""
-    global vector_store_service, rag_service, translation_service, maps_service, weather_service, whatsapp_service
+    global inference_executor, vector_store_service, rag_service, translation_service, maps_service, weather_service, whatsapp_service
     
     try:
         # Optimize memory usage
@@ -77,6 +85,12 @@ async def startup_event():
             settings.vector_db_path_obj
         )
         
+        # Initialize inference executor
+        logger.info("Initializing inference executor...")
+        inference_executor = InferenceExecutor()
+        inference_executor.initialize()
+        model_registry.start()
+        
         # Initialize vector store service
         logger.info("Initializing vector store service...")
         vector_store_service = VectorStoreService()
@@ -108,7 +122,8 @@ async def startup_event():
             rag_service=rag_service,
             translation_service=translation_service,
             maps_service=maps_service,
-            weather_service=weather_service
+            weather_service=weather_service,
+            inference_executor=inference_executor
         )
         whatsapp_service.initialize()
         
@@ -120,14 +135,44 @@ async def startup_event():
         os.makedirs(settings.vector_db_path_obj, exist_ok=True)
         raise RuntimeError("Startup initialization failed") from e
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop inference workers and persist caches"""
+    if rag_service:
+        rag_service.shutdown()
+    if translation_service:
+        translation_service.shutdown()
+    if vector_store_service and vector_store_service.embedding_cache:
+        vector_store_service.embedding_cache.close()
+    if inference_executor:
+        inference_executor.shutdown()
+    model_registry.stop()
+
+def queue_full_exception(e: QueueFullError) -> HTTPException:
+    """Translate executor backpressure into a 503 with Retry-After"""
+    logger.warning(f"Rejecting request, {e}")
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry shortly.",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Format one Server-Sent Events message"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
 @app.get("/", response_model=RootResponse)
 def read_root():
     return RootResponse(
         message="Welcome to Hura Tourism Chatbot with WhatsApp!",
         endpoints={
             "ask_question": "POST /ask",
+            "ask_question_stream": "POST /ask/stream",
             "translate_en2rw": "POST /translate/en2rw",
             "translate_rw2en": "POST /translate/rw2en",
+            "translate_auto": "POST /translate/auto",
+            "translate_batch": "POST /translate/batch",
             "location_service": "POST /maps",
             "weather_service": "POST /weather",
             "whatsapp_webhook": "POST /whatsapp/webhook",
@@ -148,6 +193,15 @@ async def health_check():
             "whatsapp_service": whatsapp_service is not None,
             "persistent_storage": str(settings.persistent_path),
             "storage_usage": f"{get_dir_size(settings.persistent_path)/1024/1024:.2f} MB",
+            "inference_pools": inference_executor.get_stats() if inference_executor else {},
+            "rag_paths": rag_service.get_stats() if rag_service else {},
+            "semantic_cache": rag_service.semantic_cache.get_stats() if rag_service and rag_service.semantic_cache else {},
+            "translation_batching": translation_service.get_stats() if translation_service else {},
+            "translation_memory": translation_service.memory.get_stats() if translation_service and translation_service.memory else {},
+            "phrasebook": translation_service.phrasebook.get_stats() if translation_service and translation_service.phrasebook else {},
+            "language_id": translation_service.language_id.get_stats() if translation_service and translation_service.language_id else {},
+            "embedding_cache": vector_store_service.embedding_cache.get_stats() if vector_store_service and vector_store_service.embedding_cache else {},
+            "models": model_registry.get_stats(),
             "features": {
                 "rag": rag_service is not None,
                 "translation": translation_service is not None,
@@ -174,8 +228,8 @@ async def whatsapp_webhook(
         # Extract phone number (remove 'whatsapp:' prefix)
         user_phone = From.replace('whatsapp:', '') if From.startswith('whatsapp:') else From
         
-        # Process the message
-        response_text = whatsapp_service.process_message(Body, user_phone)
+        # Process the message (off the event loop; model calls are bounded by the executor)
+        response_text = await run_in_threadpool(whatsapp_service.process_message, Body, user_phone)
         
         # Create TwiML response
         twiml_response = MessagingResponse()
@@ -203,53 +257,212 @@ async def answer_query(query: Query, request: Request):
     
     try:
         start_time = time.time()
-        response = rag_service.query(query.text)
+        # Cheap embedding-only paths first (direct answer, semantic cache), so they never queue behind the LLM
+        result, query_vector = await inference_executor.run(
+            "embedding", rag_service.fast_answer, query.text, None, query.max_sentences, query.stop
+        )
+        if result is None:
+            result = await inference_executor.run(
+                "llm", rag_service.answer, query.text,
+                use_fast_path=False, max_sentences=query.max_sentences, stop=query.stop, query_vector=query_vector
+            )
         process_time = time.time() - start_time
         
         return QueryResponse(
-            response=response,
+            response=result["response"],
             processing_time=f"{process_time:.2f} seconds",
-            service_used="RAG"
+            service_used=result["service_used"]
         )
+    except QueueFullError as e:
+        raise queue_full_exception(e) from e
     except Exception as e:
         logger.error(f"RAG query processing error: {e}")
         raise HTTPException(status_code=500, detail="Error processing your question") from e
 
+@app.post("/ask/stream")
+async def answer_query_stream(query: Query, request: Request):
+    """Endpoint (streaming): Ask a question and receive the answer as Server-Sent Events"""
+    if not rag_service:
+        raise HTTPException(status_code=503, detail="RAG service initializing, try again in 30 seconds")
+    
+    start_time = time.time()
+    result = {"service_used": "RAG"}
+    token_stream = rag_service.astream(query.text, inference_executor, query.max_sentences, query.stop, result)
+    try:
+        # Wait for the first token so backpressure and retrieval errors still map to status codes
+        first_token = await token_stream.__anext__()
+    except StopAsyncIteration:
+        first_token = ""
+    except QueueFullError as e:
+        raise queue_full_exception(e) from e
+    except Exception as e:
+        logger.error(f"RAG stream processing error: {e}")
+        raise HTTPException(status_code=500, detail="Error processing your question") from e
+    
+    async def event_stream():
+        try:
+            if first_token:
+                yield sse_event({"token": first_token})
+            async for token in token_stream:
+                yield sse_event({"token": token})
+            yield sse_event({
+                "processing_time": f"{time.time() - start_time:.2f} seconds",
+                "service_used": result["service_used"]
+            }, event="done")
+        except Exception as e:
+            logger.error(f"RAG stream processing error: {e}")
+            yield sse_event({"detail": "Error processing your question"}, event="error")
+        finally:
+            await token_stream.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Source and target language names per direction
+LANGUAGE_NAMES = {"en2rw": ("English", "Kinyarwanda"), "rw2en": ("Kinyarwanda", "English")}
+
+async def translate_text(direction: str, text: str, tier: Optional[str] = None,
+                         check_direction: bool = True) -> TranslationResponse:
+    """Shared translation path: phrasebook, wrong-direction check, then the batched model"""
+    if not translation_service:
+        raise HTTPException(status_code=503, detail="Translation service not loaded yet.")
+    
+    source_language, target_language = LANGUAGE_NAMES[direction]
+    translation = translation_service.lookup_phrase(direction, text)
+    service_used = "phrasebook"
+    used_tier = None
+    detected_language, warning = None, None
+    if translation is None:
+        # Text already in the target language costs a full model pass for a useless output. Place names
+        # can fool the detector, so by default the text is still translated and the response flags it.
+        detected = translation_service.detect_direction(text) if check_direction else None
+        if detected and detected != direction:
+            detected_language = target_language
+            warning = f"The text looks like {target_language}; /translate/{detected} may be the right endpoint."
+            if settings.translation_reject_wrong_direction:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"The text looks like {target_language}; use /translate/{detected} or /translate/auto."
+                )
+        try:
+            used_tier = translation_service.resolve_tier(direction, tier)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            # submit() reads the translation memory (SQLite), so dispatch happens off the event loop
+            future = await asyncio.to_thread(
+                translation_service.submit, direction, text, use_phrasebook=False, tier=used_tier
+            )
+            translation = await asyncio.wrap_future(future)
+        except QueueFullError as e:
+            raise queue_full_exception(e) from e
+        except Exception as e:
+            logger.error(f"Translation error ({direction}): {e}")
+            raise HTTPException(status_code=500, detail="Translation failed.")
+        service_used = "NLLB-200"
+    
+    return TranslationResponse(
+        translation=translation,
+        source_language=source_language,
+        target_language=target_language,
+        service_used=service_used,
+        tier=used_tier,
+        detected_language=detected_language,
+        warning=warning
+    )
+
 @app.post("/translate/en2rw", response_model=TranslationResponse)
 async def translate_en2rw(req: TranslationRequest, request: Request):
     """Endpoint: Translate English to Kinyarwanda"""
+    return await translate_text("en2rw", req.text, req.tier)
+
+@app.post("/translate/rw2en", response_model=TranslationResponse)
+async def translate_rw2en(req: TranslationRequest, request: Request):
+    """Endpoint: Translate Kinyarwanda to English"""
+    return await translate_text("rw2en", req.text, req.tier)
+
+@app.post("/translate/auto", response_model=TranslationResponse)
+async def translate_auto(req: TranslationRequest, request: Request):
+    """Endpoint: Detect English or Kinyarwanda and translate to the other"""
     if not translation_service:
         raise HTTPException(status_code=503, detail="Translation service not loaded yet.")
+    if not translation_service.language_id:
+        raise HTTPException(status_code=503, detail="Language identification is disabled.")
     
-    try:
-        translation = translation_service.translate_en_to_rw(req.text)
-        return TranslationResponse(
-            translation=translation,
-            source_language="English",
-            target_language="Kinyarwanda",
-            service_used="NLLB-200"
+    direction = translation_service.detect_direction(req.text)
+    if direction is None:
+        raise HTTPException(
+            status_code=422,
+            detail="Could not tell whether the text is English or Kinyarwanda; use /translate/en2rw or /translate/rw2en."
         )
-    except Exception as e:
-        logger.error(f"Translation error (en2rw): {e}")
-        raise HTTPException(status_code=500, detail="Translation failed.")
+    return await translate_text(direction, req.text, req.tier, check_direction=False)
 
-@app.post("/translate/rw2en", response_model=TranslationResponse)
-async def translate_rw2en(req: TranslationRequest, request: Request):
-    """Endpoint: Translate Kinyarwanda to English"""
+@app.post("/translate/batch", response_model=BatchTranslationResponse)
+async def translate_batch(req: BatchTranslationRequest, request: Request):
+    """Endpoint: Translate a list of texts in one request"""
     if not translation_service:
         raise HTTPException(status_code=503, detail="Translation service not loaded yet.")
+    if len(req.items) > settings.translation_batch_max_items:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {settings.translation_batch_max_items}).")
+    if sum(len(item.text) for item in req.items) > settings.translation_batch_max_chars:
+        raise HTTPException(status_code=413, detail=f"Too much text (max {settings.translation_batch_max_chars} characters).")
+    if any(item.direction not in translation_service.DIRECTIONS for item in req.items):
+        raise HTTPException(status_code=400, detail="Direction must be 'en2rw' or 'rw2en'.")
+    if any(item.tier and item.tier not in TRANSLATION_TIERS for item in req.items):
+        raise HTTPException(status_code=400, detail="Tier must be 'fast', 'balanced' or 'best'.")
+    
+    start_time = time.time()
+    # Per item: served without the model (phrasebook/memory), and when its translation finished
+    cached = [False] * len(req.items)
+    finished_at = [start_time] * len(req.items)
+    
+    def admit():
+        futures = []
+        try:
+            for i, item in enumerate(req.items):
+                future = translation_service.submit(item.direction, item.text, tier=item.tier,
+                                                    wait=settings.translation_batch_admission_wait)
+                cached[i] = future.done()
+                future.add_done_callback(lambda _, i=i: finished_at.__setitem__(i, time.time()))
+                futures.append(future)
+        except QueueFullError:
+            # The request fails as a whole; don't spend model time on its queued items
+            for future in futures:
+                future.cancel()
+            raise
+        return futures
     
     try:
-        translation = translation_service.translate_rw_to_en(req.text)
-        return TranslationResponse(
+        # All items go through the batchers together; repeats are served from translation memory.
+        # A request can hold more sentences than the queue, so admission waits for space as batches drain.
+        futures = await asyncio.to_thread(admit)
+    except QueueFullError as e:
+        raise queue_full_exception(e) from e
+    
+    async def collect(i, item, future):
+        translation, error = None, None
+        try:
+            translation = await asyncio.wrap_future(future)
+        except Exception as e:
+            logger.error(f"Batch translation error ({item.direction}): {e}")
+            error = "Translation failed."
+        return BatchTranslationResult(
             translation=translation,
-            source_language="Kinyarwanda",
-            target_language="English",
-            service_used="NLLB-200"
+            direction=item.direction,
+            time_ms=round((finished_at[i] - start_time) * 1000, 1),
+            cached=cached[i],
+            error=error
         )
-    except Exception as e:
-        logger.error(f"Translation error (rw2en): {e}")
-        raise HTTPException(status_code=500, detail="Translation failed.")
+    
+    results = await asyncio.gather(*(collect(i, item, future) for i, (item, future) in enumerate(zip(req.items, futures))))
+    return BatchTranslationResponse(
+        results=list(results),
+        processing_time=f"{time.time() - start_time:.2f} seconds",
+        service_used="NLLB-200"
+    )
 
 @app.post("/maps", response_model=QueryResponse)
 async def maps_service_endpoint(query: MapsQuery, request: Request):
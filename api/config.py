@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import List
 from pydantic import BaseModel
 
 class Settings(BaseModel):
@@ -12,10 +13,16 @@ class Settings(BaseModel):
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     llm_model: str = "TheBloke/TinyLlama-1.1B-Chat-v1.0-GGUF"
     llm_model_file: str = "tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf"
+    llm_backend: str = os.getenv("LLM_BACKEND", "ctransformers")  # "ctransformers" or "llama_cpp" (prefix KV cache)
+    # Prompt-lookup speculative decoding (llama_cpp backend only): draft tokens copied from the prompt context
+    llm_prompt_lookup: bool = os.getenv("LLM_PROMPT_LOOKUP", "false").lower() == "true"
+    llm_prompt_lookup_max_ngram: int = 3
+    llm_prompt_lookup_num_pred_tokens: int = 10
     
     # Translation models
     en2rw_model: str = "facebook/nllb-200-distilled-600M"
     rw2en_model: str = "facebook/nllb-200-distilled-600M"
+    translation_backend: str = os.getenv("TRANSLATION_BACKEND", "transformers")  # "transformers" or "ctranslate2" (int8)
     
     # Improved translation options
     use_improved_translation: bool = True
@@ -45,13 +52,95 @@ class Settings(BaseModel):
     max_new_tokens: int = 256
     temperature: float = 0.3
     gpu_layers: int = 0
-    batch_size: int = 32
+    batch_size: int = 32  # prompt-eval batch: prompt tokens per forward pass, not concurrent requests
     context_length: int = 2048
     threads: int = 8
     
+    # Generation control: stop decoding on these sequences or after N complete sentences (0 = no limit)
+    llm_stop_sequences: List[str] = ["</s>", "<|user|>", "<|system|>"]
+    llm_max_sentences: int = 3
+    
+    # Embedding backend: "torch" (HuggingFaceEmbeddings) or "onnx" (onnxruntime, see scripts/export_embedding_onnx.py)
+    embedding_backend: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    embedding_onnx_int8: bool = os.getenv("EMBEDDING_ONNX_INT8", "true").lower() == "true"  # dynamically quantized export
+    
+    # Embedding cache (SQLite under model_cache_path): texts are encoded once per embedding model
+    embedding_cache_enabled: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    embedding_cache_max_mb: int = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "256"))
+    
+    # Vector store: "chroma" (HNSW + SQLite) or "numpy" (exact search over a memory-mapped .npy matrix)
+    vector_store_backend: str = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+    vector_store_dtype: str = os.getenv("VECTOR_STORE_DTYPE", "float32")  # "float32" or "float16" (numpy backend)
+    
     # Retrieval settings
     search_k: int = 2
     search_type: str = "mmr"
+    # Hybrid retrieval: dense results fused with BM25 keyword matches ("dense" disables BM25)
+    retrieval_mode: str = os.getenv("RETRIEVAL_MODE", "hybrid")  # "hybrid" or "dense"
+    hybrid_fusion: str = os.getenv("HYBRID_FUSION", "rrf")  # "rrf" (reciprocal rank) or "weighted" (normalized scores)
+    hybrid_dense_weight: float = float(os.getenv("HYBRID_DENSE_WEIGHT", "1.0"))
+    hybrid_sparse_weight: float = float(os.getenv("HYBRID_SPARSE_WEIGHT", "1.0"))
+    hybrid_fetch_k: int = 20  # candidates taken from each index before fusion
+    hybrid_rrf_k: int = 60
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+    context_token_budget: int = 768  # max prompt tokens spent on retrieved passages
+    context_dedup_threshold: float = 0.8  # word overlap above which a passage counts as a duplicate
+    
+    # Direct answers: return the stored corpus answer when the question matches closely
+    direct_answer_enabled: bool = os.getenv("DIRECT_ANSWER_ENABLED", "true").lower() == "true"
+    direct_answer_threshold: float = 0.9  # cosine similarity between questions
+    
+    # Inference executor settings (workers per model, max queued requests)
+    llm_workers: int = int(os.getenv("LLM_WORKERS", "1"))
+    llm_queue_size: int = int(os.getenv("LLM_QUEUE_SIZE", "8"))
+    embedding_workers: int = int(os.getenv("EMBEDDING_WORKERS", "2"))
+    embedding_queue_size: int = int(os.getenv("EMBEDDING_QUEUE_SIZE", "32"))
+    inference_retry_after: int = 5  # seconds, sent in Retry-After on 503
+    
+    # Translation batching (per direction; each batch is split into length buckets of similar texts)
+    translation_max_batch_size: int = int(os.getenv("TRANSLATION_MAX_BATCH_SIZE", "16"))
+    translation_batch_wait_ms: int = int(os.getenv("TRANSLATION_BATCH_WAIT_MS", "30"))
+    translation_bucket_size: int = 8  # max texts per generate call
+    translation_batch_queue_size: int = 128  # sentences waiting per direction
+    translation_max_sentence_chars: int = 400  # longer sentences are wrapped at commas/spaces
+    translation_batch_max_items: int = 50  # /translate/batch limits
+    translation_batch_max_chars: int = 10000
+    translation_batch_admission_wait: float = 30.0  # seconds a /translate/batch sentence waits for queue space
+    
+    # Phrasebook (data/phrasebook.json): fixed greetings and tourist phrases answered without the model
+    phrasebook_enabled: bool = os.getenv("PHRASEBOOK_ENABLED", "true").lower() == "true"
+    
+    # Quality/latency tiers ("fast", "balanced", "best"; see TRANSLATION_TIERS in services/translation.py)
+    translation_default_tier: str = os.getenv("TRANSLATION_TIER", "balanced")
+    translation_fast_tier_queue_depth: int = 32  # untiered requests drop to "fast" at this queue depth
+    
+    # Language identification (character n-grams): /translate/auto and wrong-direction checks
+    language_id_enabled: bool = os.getenv("LANGUAGE_ID_ENABLED", "true").lower() == "true"
+    language_id_threshold: float = 0.9  # minimum probability to act on a detection
+    # 422 instead of translating text that looks like the target language; otherwise the response carries a warning
+    translation_reject_wrong_direction: bool = os.getenv("TRANSLATION_REJECT_WRONG_DIRECTION", "false").lower() == "true"
+    
+    # Translation memory (SQLite under persistent_path): exact repeats skip the model
+    translation_memory_enabled: bool = os.getenv("TRANSLATION_MEMORY_ENABLED", "true").lower() == "true"
+    translation_memory_lru_size: int = 2000
+    # Near-exact reuse; even then numbers, times and negations must match exactly
+    translation_memory_fuzzy: bool = os.getenv("TRANSLATION_MEMORY_FUZZY", "false").lower() == "true"
+    translation_memory_fuzzy_threshold: float = 0.9  # Dice similarity of character trigrams
+    translation_memory_fuzzy_max_chars: int = 120
+    translation_memory_max_entries: int = 20000  # entries kept in the fuzzy index
+    
+    # Semantic answer cache (stored under persistent_path/semantic_cache)
+    semantic_cache_enabled: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    semantic_cache_threshold: float = 0.92  # cosine similarity for a hit
+    semantic_cache_ttl: int = 7 * 24 * 3600  # seconds
+    semantic_cache_max_entries: int = 2000
+    semantic_cache_max_mb: int = 64
+    semantic_cache_save_every: int = 10  # writes between saves to disk
+    
+    # Model registry: models load on first use; idle models are evicted (LRU) to stay under the budget
+    model_ram_budget_mb: int = int(os.getenv("MODEL_RAM_BUDGET_MB", "10240"))
+    model_idle_ttl: float = float(os.getenv("MODEL_IDLE_TTL", "1800"))  # seconds unused before eviction; 0 disables
     
     @property
     def persistent_path(self) -> Path:
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Offline bulk translation of JSONL/TXT corpora (e.g. dataset/translation)
+Streams the input through a process pool of TranslationService workers, each
+feeding its own micro-batcher, and appends results to a JSONL file as chunks
+finish. Re-running with the same output resumes: finished lines are skipped
+and failed ones retried (a later line for the same index supersedes earlier ones).
+
+Input:  .txt (one text per line) or .jsonl ({"text": ..., optional "id", "direction"})
+Output: JSONL lines {"index", "id", "direction", "source", "translation", "error"}
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from utils.text import split_sentences
+
+# Per-process state set by init_worker
+service = None
+worker_tier = None
+
+def init_worker(threads, tier, use_memory):
+    """Load one TranslationService per worker process"""
+    global service, worker_tier
+    import torch
+    from services.translation import TranslationService
+
+    torch.set_num_threads(threads)
+    settings.threads = threads
+    settings.translation_memory_enabled = use_memory
+    # A whole chunk is queued at once; offline runs never need back-pressure
+    settings.translation_batch_queue_size = 100000
+
+    service = TranslationService()
+    service.initialize()
+    worker_tier = tier
+
+def translate_chunk(chunk):
+    """Translate a list of records; returns (output records, sentence count)"""
+    futures = [service.submit(r["direction"], r["text"], tier=worker_tier) for r in chunk]
+    output, sentences = [], 0
+    for record, future in zip(chunk, futures):
+        translation, error = None, None
+        try:
+            translation = future.result()
+        except Exception as e:
+            error = str(e)
+        sentences += len(split_sentences(record["text"], service.SOURCE_LANGUAGES[record["direction"]],
+                                         settings.translation_max_sentence_chars))
+        output.append({
+            "index": record["index"],
+            "id": record.get("id"),
+            "direction": record["direction"],
+            "source": record["text"],
+            "translation": translation,
+            "error": error,
+        })
+    if service.memory:
+        # Memory writes are asynchronous; persist them before the chunk counts as done
+        service.memory.flush()
+    return output, sentences
+
+def read_records(path, direction, text_field):
+    """Yield {"index", "text", "direction", "id"} per non-empty input line"""
+    is_jsonl = path.endswith(".jsonl")
+    with open(path, "r", encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            if is_jsonl:
+                item = json.loads(line)
+                record = {"text": item.get(text_field, ""), "id": item.get("id"),
+                          "direction": item.get("direction", direction)}
+            else:
+                record = {"text": line, "id": None, "direction": direction}
+            if record["direction"] not in ("en2rw", "rw2en"):
+                raise ValueError(f"Line {index + 1}: direction must be 'en2rw' or 'rw2en'")
+            if record["text"].strip():
+                record["index"] = index
+                yield record
+
+def load_finished(path):
+    """Indices already translated, dropping a partial last line left by a crash"""
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].decode("utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("translation") is not None:
+            finished.add(record["index"])
+    return finished
+
+def chunked(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate a JSONL/TXT corpus with a pool of NLLB workers")
+    parser.add_argument("input", help="Input .txt or .jsonl file")
+    parser.add_argument("--output", help="Output .jsonl file (default: <input>.translated.jsonl)")
+    parser.add_argument("--direction", default="en2rw", choices=["en2rw", "rw2en"],
+                        help="Direction for lines that do not set one")
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the text")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (each loads the model)")
+    parser.add_argument("--threads", type=int, help="Torch threads per worker (default: cores / workers)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Lines sent to a worker at a time")
+    parser.add_argument("--tier", default="best", choices=["fast", "balanced", "best"])
+    parser.add_argument("--no-memory", action="store_true", help="Do not read or write the translation memory")
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.splitext(args.input)[0] + ".translated.jsonl"
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+
+    print("🌍 Batch translation")
+    print("=" * 50)
+    finished = load_finished(output_path)
+    if finished:
+        print(f"↩️  Resuming: {len(finished)} lines already in {output_path}")
+    print(f"⚙️  {args.workers} workers x {threads} threads, tier '{args.tier}', chunks of {args.chunk_size}")
+
+    records = (r for r in read_records(args.input, args.direction, args.text_field) if r["index"] not in finished)
+    # Bound the chunks in flight so large inputs are streamed, not queued whole
+    in_flight = threading.BoundedSemaphore(args.workers * 2)
+    write_lock = threading.Lock()
+    totals = {"items": 0, "sentences": 0, "errors": 0, "failed_chunks": 0}
+    start_time = time.time()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        def on_done(result):
+            output, sentences = result
+            with write_lock:
+                for record in output:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                totals["items"] += len(output)
+                totals["sentences"] += sentences
+                totals["errors"] += sum(1 for record in output if record["error"])
+                rate = totals["sentences"] / max(time.time() - start_time, 1e-9)
+                print(f"   {totals['items']} lines, {totals['sentences']} sentences ({rate:.1f} sentences/s)")
+            in_flight.release()
+
+        def on_error(error):
+            # Lines of a failed chunk are not written, so the next run retries them
+            print(f"❌ Chunk failed: {error}")
+            with write_lock:
+                totals["failed_chunks"] += 1
+            in_flight.release()
+
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.workers, initializer=init_worker,
+                          initargs=(threads, args.tier, not args.no_memory)) as pool:
+            for chunk in chunked(records, args.chunk_size):
+                in_flight.acquire()
+                pool.apply_async(translate_chunk, (chunk,), callback=on_done, error_callback=on_error)
+            pool.close()
+            pool.join()
+
+    elapsed = time.time() - start_time
+    print("\n📊 Summary")
+    print(f"   Lines translated: {totals['items']} ({totals['errors']} with errors)")
+    print(f"   Sentences:        {totals['sentences']}")
+    print(f"   Elapsed:          {elapsed:.1f}s (including model loading)")
+    print(f"   Throughput:       {totals['sentences'] / max(elapsed, 1e-9):.2f} sentences/s")
+    if totals["failed_chunks"] or totals["errors"]:
+        print("⚠️  Some lines failed; re-run the same command to retry them")
+    print(f"✅ Output: {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Prefill benchmark for the llama.cpp backend
+Compares prompt evaluation time with and without the cached system-prompt KV state
+"""
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import Document
+
+from services.context_assembler import ContextAssembler
+from services.llama_backend import LlamaCppPrefixCache
+from services.rag_service import RAGService
+from utils.helpers import load_data
+
+def build_prompts(rag_service: RAGService, limit: int):
+    """Render real RAG prompts using corpus answers as the retrieved context"""
+    data = load_data("data/tourism_faq_gov.json") + load_data("data/tripadvisor_forum.json")
+    prompts = []
+    for item in data[:limit]:
+        docs = [Document(page_content=f"QUESTION: {item['question']}\nANSWER: {item['answer']}")]
+        prompts.append(rag_service.build_prompt(item["question"], docs))
+    return prompts
+
+def time_prefill(llm: LlamaCppPrefixCache, prompts, use_prefix_cache: bool):
+    timings = []
+    evaluated = []
+    for prompt in prompts:
+        start_time = time.perf_counter()
+        evaluated.append(llm.prefill(prompt, use_prefix_cache=use_prefix_cache))
+        timings.append(time.perf_counter() - start_time)
+    return timings, evaluated
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print("🧪 Prefix KV cache prefill benchmark")
+    print("=" * 50)
+
+    rag_service = RAGService(vector_store_service=None)
+    rag_service.prompt = rag_service.create_prompt_template()
+    rag_service.context_assembler = ContextAssembler()
+
+    print("📥 Loading TinyLlama with llama.cpp...")
+    llm = LlamaCppPrefixCache.from_settings(prefix=rag_service.prompt_prefix())
+    print(f"✅ Prefix is {len(llm.prefix_tokens)} tokens")
+
+    prompts = build_prompts(rag_service, limit)
+    print(f"📊 Prefilling {len(prompts)} prompts\n")
+
+    # Warm up both paths once
+    llm.prefill(prompts[0], use_prefix_cache=False)
+    llm.prefill(prompts[0], use_prefix_cache=True)
+
+    cold, cold_tokens = time_prefill(llm, prompts, use_prefix_cache=False)
+    warm, warm_tokens = time_prefill(llm, prompts, use_prefix_cache=True)
+
+    print(f"{'':<22}{'mean ms':>10}{'p50 ms':>10}{'tokens':>10}")
+    for label, timings, tokens in [("Full prefill", cold, cold_tokens), ("Cached prefix", warm, warm_tokens)]:
+        print(f"{label:<22}{statistics.mean(timings) * 1000:>10.1f}"
+              f"{statistics.median(timings) * 1000:>10.1f}{statistics.mean(tokens):>10.0f}")
+
+    print(f"\n⚡ Speedup: {statistics.mean(cold) / statistics.mean(warm):.2f}x")
+
+if __name__ == "__main__":
+    main()
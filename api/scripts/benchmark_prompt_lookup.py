@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Prompt-lookup speculative decoding benchmark
+Generates answers for the data/ questions with and without n-gram drafting from the prompt context
+"""
+
+import gc
+import os
+import sys
+import time
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import Document
+
+from config import settings
+from services.context_assembler import ContextAssembler
+from services.llama_backend import LlamaCppPrefixCache
+from services.rag_service import RAGService
+from utils.helpers import load_data
+
+def load_questions(limit: int):
+    """QA pairs from all three corpus files"""
+    data = (load_data("data/tourism_faq_gov.json")
+            + load_data("data/tripadvisor_forum.json")
+            + load_data("data/local_blog_etiquette.json"))
+    return data[:limit]
+
+def load_llm(prefix: str, prompt_lookup: bool) -> LlamaCppPrefixCache:
+    """Load a separate model instance; prompt lookup also turns on logits_all, which slows plain decoding"""
+    settings.llm_prompt_lookup = prompt_lookup
+    llm = LlamaCppPrefixCache.from_settings(prefix=prefix)
+    llm.temperature = 0.0  # greedy, so both runs must produce identical tokens
+    return llm
+
+def run(llm: LlamaCppPrefixCache, prompts):
+    """Generate every prompt; returns per-prompt latency, token counts and outputs"""
+    latencies, token_counts, outputs = [], [], []
+    for prompt in prompts:
+        start_time = time.perf_counter()
+        tokens = list(llm._generate_tokens(prompt))
+        latencies.append(time.perf_counter() - start_time)
+        token_counts.append(len(tokens))
+        outputs.append(tokens)
+    return latencies, token_counts, outputs
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print("🧪 Prompt-lookup decoding benchmark")
+    print("=" * 50)
+
+    rag_service = RAGService(vector_store_service=None)
+    rag_service.prompt = rag_service.create_prompt_template()
+    rag_service.context_assembler = ContextAssembler()
+
+    prompts = []
+    for item in load_questions(limit):
+        docs = [Document(page_content=f"QUESTION: {item['question']}\nANSWER: {item['answer']}")]
+        prompts.append(rag_service.build_prompt(item["question"], docs))
+    print(f"📊 Generating answers for {len(prompts)} questions\n")
+
+    # One model at a time, each configured as production would load it
+    results = {}
+    for prompt_lookup in (False, True):
+        print(f"📥 Loading TinyLlama with llama.cpp (prompt lookup {'on' if prompt_lookup else 'off'})...")
+        llm = load_llm(rag_service.prompt_prefix(), prompt_lookup)
+        run(llm, prompts[:1])  # warm-up
+        results[prompt_lookup] = run(llm, prompts)
+        del llm
+        gc.collect()
+
+    base_latency, base_tokens, base_outputs = results[False]
+    spec_latency, spec_tokens, spec_outputs = results[True]
+
+    print(f"{'':<22}{'mean s':>10}{'p50 s':>10}{'tokens/s':>10}")
+    for label, latencies, tokens in [("Standard decoding", base_latency, base_tokens),
+                                     ("Prompt lookup", spec_latency, spec_tokens)]:
+        throughput = sum(tokens) / sum(latencies)
+        print(f"{label:<22}{statistics.mean(latencies):>10.2f}"
+              f"{statistics.median(latencies):>10.2f}{throughput:>10.1f}")
+
+    identical = sum(a == b for a, b in zip(base_outputs, spec_outputs))
+    print(f"\n⚡ Speedup: {sum(base_latency) / sum(spec_latency):.2f}x")
+    print(f"✅ Identical greedy outputs: {identical}/{len(prompts)}")
+
+if __name__ == "__main__":
+    main()
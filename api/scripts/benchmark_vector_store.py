@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Vector store benchmark: Chroma (HNSW) vs the NumPy exact-search backend
+Embeds the QA corpus once, then measures build time, load time and query
+latency (similarity and MMR) for each store, and how often Chroma's
+approximate top-k matches the exact one
+"""
+
+import os
+import sys
+import time
+import tempfile
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.embeddings.base import Embeddings
+from langchain.schema import Document
+from langchain_community.vectorstores import Chroma
+
+from config import settings
+from services.numpy_store import NumpyVectorStore
+from services.vector_store import VectorStoreService
+
+class PrecomputedEmbeddings(Embeddings):
+    """Serves vectors computed up front so only the store itself is timed"""
+    def __init__(self, embeddings: Embeddings, texts):
+        self.vectors = dict(zip(texts, embeddings.embed_documents(list(texts))))
+
+    def embed_documents(self, texts):
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+def timed(fn):
+    start_time = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start_time
+
+def query_latency(search, query_vectors):
+    timings = []
+    for vector in query_vectors:
+        start_time = time.perf_counter()
+        search(vector)
+        timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings) * 1000, max(timings) * 1000
+
+def main():
+    k = settings.search_k
+    print("🧪 Vector store benchmark")
+    print("=" * 50)
+
+    service = VectorStoreService()
+    service.ensure_embedding_model()
+    service.load_embeddings()
+    corpus = service.load_corpus()
+    documents = [
+        Document(page_content=f"QUESTION: {item['question']}\nANSWER: {item['answer']}",
+                 metadata={"source": item["source"], "original_question": item["question"]})
+        for item in corpus
+    ]
+    queries = [item["question"] for item in corpus]
+
+    print(f"📥 Embedding {len(documents)} documents and {len(queries)} queries...")
+    embeddings = PrecomputedEmbeddings(service.embeddings, [doc.page_content for doc in documents] + queries)
+    query_vectors = [embeddings.embed_query(query) for query in queries]
+
+    results = {}
+    top_ids = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        chroma_dir = os.path.join(workdir, "chroma")
+        _, build = timed(lambda: Chroma.from_documents(
+            documents=documents, embedding=embeddings, persist_directory=chroma_dir,
+            collection_name="benchmark", collection_metadata={"hnsw:space": "cosine"}
+        ).persist())
+        store, load = timed(lambda: Chroma(persist_directory=chroma_dir, embedding_function=embeddings,
+                                          collection_name="benchmark"))
+        results["chroma"] = (build, load,
+                             query_latency(lambda v: store.similarity_search_by_vector(v, k=k), query_vectors),
+                             query_latency(lambda v: store.max_marginal_relevance_search_by_vector(v, k=k), query_vectors))
+        top_ids["chroma"] = [[doc.page_content for doc in store.similarity_search_by_vector(v, k=k)] for v in query_vectors]
+
+        for dtype in ("float32", "float16"):
+            name = f"numpy-{dtype}"
+            path = os.path.join(workdir, name)
+            _, build = timed(lambda: NumpyVectorStore.from_documents(
+                documents=documents, embedding=embeddings, path=path, dtype=dtype
+            ).save())
+            store, load = timed(lambda: NumpyVectorStore.load(embeddings, path))
+            results[name] = (build, load,
+                             query_latency(lambda v: store.similarity_search_by_vector(v, k=k), query_vectors),
+                             query_latency(lambda v: store.max_marginal_relevance_search_by_vector(v, k=k), query_vectors))
+            top_ids[name] = [[doc.page_content for doc in store.similarity_search_by_vector(v, k=k)] for v in query_vectors]
+
+    print(f"\n{'Store':<16}{'build s':>9}{'load ms':>9}{'p50 ms':>9}{'max ms':>9}{'mmr p50':>9}{'mmr max':>9}")
+    for name, (build, load, (p50, worst), (mmr_p50, mmr_worst)) in results.items():
+        print(f"{name:<16}{build:>9.2f}{load * 1000:>9.1f}{p50:>9.3f}{worst:>9.3f}{mmr_p50:>9.3f}{mmr_worst:>9.3f}")
+
+    exact = top_ids["numpy-float32"]
+    for name in ("chroma", "numpy-float16"):
+        overlap = statistics.mean(len(set(a) & set(b)) / len(a) for a, b in zip(top_ids[name], exact) if a)
+        print(f"\n🎯 {name} top-{k} agreement with exact float32 search: {overlap:.1%}")
+
+if __name__ == "__main__":
+    main()
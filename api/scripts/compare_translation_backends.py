@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Side-by-side comparison of the PyTorch and int8 CTranslate2 NLLB backends
+Reports latency per backend and BLEU, against references when a file is given,
+otherwise of CTranslate2 against the PyTorch output (quantization drift)
+
+Reference file: JSONL lines {"source": ..., "reference": ..., "direction": "en2rw" | "rw2en"}
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from services.translation import CT2Translator, NLLBTranslator, TranslationService
+
+DEFAULT_SAMPLES = [
+    {"source": "Where is the nearest ATM?", "direction": "en2rw"},
+    {"source": "How much does a taxi cost?", "direction": "en2rw"},
+    {"source": "What time does the museum open?", "direction": "en2rw"},
+    {"source": "Can you recommend a good restaurant?", "direction": "en2rw"},
+    {"source": "Do I need a visa to visit Rwanda?", "direction": "en2rw"},
+    {"source": "Muraho, amakuru?", "direction": "rw2en"},
+    {"source": "Murakoze cyane", "direction": "rw2en"},
+    {"source": "Ndashaka kujya ku kibuga cy'indege", "direction": "rw2en"},
+]
+
+def load_samples(path):
+    if not path:
+        return DEFAULT_SAMPLES
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def run(translator, samples):
+    outputs, timings = [], []
+    for sample in samples:
+        src_lang, tgt_lang = TranslationService.DIRECTIONS[sample["direction"]]
+        start_time = time.perf_counter()
+        outputs.append(translator.translate([sample["source"]], src_lang, tgt_lang)[0])
+        timings.append(time.perf_counter() - start_time)
+    return outputs, timings
+
+def bleu(hypotheses, references):
+    try:
+        import sacrebleu
+    except ImportError:
+        return None
+    return sacrebleu.corpus_bleu(hypotheses, [references]).score
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare NLLB translation backends")
+    parser.add_argument("--references", help="JSONL file with source/reference/direction")
+    args = parser.parse_args()
+
+    samples = load_samples(args.references)
+    model_name = settings.en2rw_model
+
+    print("🧪 Translation backend comparison")
+    print("=" * 50)
+    print(f"📥 Loading {model_name} (PyTorch) and its int8 CTranslate2 conversion...")
+    backends = {"pytorch": NLLBTranslator(model_name), "ctranslate2-int8": CT2Translator(model_name)}
+
+    results = {}
+    for name, translator in backends.items():
+        run(translator, samples[:1])  # warm up
+        results[name] = run(translator, samples)
+
+    references = [s["reference"] for s in samples] if all("reference" in s for s in samples) else None
+    print(f"\n{'Backend':<20}{'mean ms':>10}{'p50 ms':>10}{'BLEU':>10}")
+    for name, (outputs, timings) in results.items():
+        if references:
+            score = bleu(outputs, references)
+        elif name == "pytorch":
+            score = 100.0
+        else:
+            score = bleu(outputs, results["pytorch"][0])
+        score_text = f"{score:.1f}" if score is not None else "n/a"
+        print(f"{name:<20}{statistics.mean(timings) * 1000:>10.1f}"
+              f"{statistics.median(timings) * 1000:>10.1f}{score_text:>10}")
+
+    if not references:
+        print("\nℹ️  No references given: BLEU is measured against the PyTorch output")
+    if bleu([""], [""]) is None:
+        print("ℹ️  Install sacrebleu to report BLEU")
+
+    print("\n📝 Sample outputs:")
+    for i, sample in enumerate(samples[:5]):
+        print(f"  {sample['source']}")
+        for name, (outputs, _) in results.items():
+            print(f"    {name:<18} {outputs[i]}")
+
+    speedup = statistics.mean(results["pytorch"][1]) / statistics.mean(results["ctranslate2-int8"][1])
+    print(f"\n⚡ CTranslate2 int8 speedup: {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
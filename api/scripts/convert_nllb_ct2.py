@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Convert the NLLB-200 translation model to CTranslate2 with int8 weights
+Writes to settings.model_cache_path/ct2/<model>-int8 for TRANSLATION_BACKEND=ctranslate2
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from services.translation import ct2_model_dir
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert NLLB-200 to an int8 CTranslate2 model")
+    parser.add_argument("--model", default=settings.en2rw_model, help="Hugging Face checkpoint to convert")
+    parser.add_argument("--force", action="store_true", help="Overwrite an existing conversion")
+    args = parser.parse_args()
+
+    try:
+        from ctranslate2.converters import TransformersConverter
+    except ImportError:
+        print("❌ ctranslate2 is not installed (pip install ctranslate2)")
+        sys.exit(1)
+
+    output_dir = ct2_model_dir(args.model)
+    print(f"🔄 Converting {args.model} to int8 CTranslate2...")
+    print(f"📁 Output: {output_dir}")
+
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    converter = TransformersConverter(args.model)
+    converter.convert(str(output_dir), quantization="int8", force=args.force)
+
+    size_mb = sum(f.stat().st_size for f in output_dir.iterdir() if f.is_file()) / 1024 / 1024
+    print(f"✅ Converted model is {size_mb:.0f} MB")
+    print("👉 Set TRANSLATION_BACKEND=ctranslate2 to use it")
+
+if __name__ == "__main__":
+    main()
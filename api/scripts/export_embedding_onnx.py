@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Export the sentence embedding model (all-MiniLM-L6-v2) to ONNX, optionally with
+dynamic int8 quantization
+Writes to settings.model_cache_path/onnx/<model>[-int8] for EMBEDDING_BACKEND=onnx
+Check the result with scripts/verify_embedding_drift.py
+"""
+
+import os
+import sys
+import shutil
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from services.onnx_embeddings import onnx_model_dir
+
+def export(source, output_dir, opset):
+    """Export the transformer (token embeddings out; pooling is done at inference)"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    model = AutoModel.from_pretrained(source)
+    model.eval()
+
+    sample = tokenizer(["Where is the Kigali Genocide Memorial?"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(output_dir / "model.onnx"),
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(str(output_dir))
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--no-quantize", action="store_true", help="Keep float32 weights")
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--force", action="store_true", help="Overwrite an existing export")
+    args = parser.parse_args()
+
+    try:
+        import onnx  # noqa: F401
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError:
+        print("❌ onnx and onnxruntime are required (pip install onnx onnxruntime)")
+        sys.exit(1)
+
+    quantize = not args.no_quantize
+    # The cached sentence-transformers copy, or the hub checkpoint
+    source = settings.model_cache_path / "embedding_model"
+    source = str(source) if source.exists() else settings.embedding_model
+    output_dir = onnx_model_dir(settings.embedding_model, quantized=quantize)
+
+    if (output_dir / "model.onnx").exists() and not args.force:
+        print(f"❌ {output_dir} already exists (use --force to overwrite)")
+        sys.exit(1)
+
+    print(f"🔄 Exporting {source} to ONNX (opset {args.opset})...")
+    print(f"📁 Output: {output_dir}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    export(source, output_dir, args.opset)
+
+    if quantize:
+        print("🔢 Applying dynamic int8 quantization...")
+        float_model = output_dir / "model.float32.onnx"
+        shutil.move(str(output_dir / "model.onnx"), str(float_model))
+        quantize_dynamic(str(float_model), str(output_dir / "model.onnx"), weight_type=QuantType.QInt8)
+        float_model.unlink()
+
+    size_mb = (output_dir / "model.onnx").stat().st_size / 1024 / 1024
+    print(f"✅ Exported model is {size_mb:.0f} MB")
+    print("👉 Run scripts/verify_embedding_drift.py, then set EMBEDDING_BACKEND=onnx"
+          + ("" if quantize else " and EMBEDDING_ONNX_INT8=false"))
+
+if __name__ == "__main__":
+    main()
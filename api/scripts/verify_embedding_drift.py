@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Cosine drift of the ONNX embedding export against the PyTorch model
+Embeds the QA corpus with both, reports per-text cosine similarity, top-k
+retrieval agreement and query latency, and exits non-zero when the drift is
+above the allowed threshold
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.embeddings import HuggingFaceEmbeddings
+
+from config import settings
+from services.onnx_embeddings import OnnxEmbeddings, onnx_model_dir
+from services.vector_store import VectorStoreService
+
+def normalized(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def query_latency(embeddings, queries):
+    embeddings.embed_query(queries[0])  # warm up
+    timings = []
+    for query in queries:
+        start_time = time.perf_counter()
+        embeddings.embed_query(query)
+        timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ONNX and PyTorch sentence embeddings")
+    parser.add_argument("--float32", action="store_true", help="Check the unquantized export")
+    parser.add_argument("--min-cosine", type=float, default=0.95, help="Lowest acceptable per-text cosine")
+    parser.add_argument("--mean-cosine", type=float, default=0.99, help="Lowest acceptable mean cosine")
+    parser.add_argument("--k", type=int, default=5, help="Top-k for retrieval agreement")
+    args = parser.parse_args()
+
+    print("🧪 Embedding drift check")
+    print("=" * 50)
+    corpus = VectorStoreService().load_corpus()
+    questions = [item["question"] for item in corpus]
+    documents = [f"QUESTION: {item['question']}\nANSWER: {item['answer']}" for item in corpus]
+
+    model_dir = onnx_model_dir(settings.embedding_model, quantized=not args.float32)
+    print(f"📥 Loading PyTorch model and ONNX export from {model_dir}...")
+    torch_embeddings = HuggingFaceEmbeddings(model_name=str(settings.model_cache_path / "embedding_model"))
+    onnx_embeddings = OnnxEmbeddings(model_dir)
+
+    timings = {}
+    vectors = {}
+    for name, embeddings in (("pytorch", torch_embeddings), ("onnx", onnx_embeddings)):
+        start_time = time.perf_counter()
+        vectors[name] = (normalized(embeddings.embed_documents(documents)),
+                         normalized(embeddings.embed_documents(questions)))
+        timings[name] = (time.perf_counter() - start_time, query_latency(embeddings, questions[:50]))
+
+    doc_cosines = np.sum(vectors["pytorch"][0] * vectors["onnx"][0], axis=1)
+    question_cosines = np.sum(vectors["pytorch"][1] * vectors["onnx"][1], axis=1)
+    cosines = np.concatenate([doc_cosines, question_cosines])
+
+    # Does each question retrieve the same documents with both models?
+    k = min(args.k, len(documents))
+    top = {name: np.argsort(-(q @ d.T), axis=1)[:, :k] for name, (d, q) in vectors.items()}
+    agreement = statistics.mean(len(set(a) & set(b)) / k for a, b in zip(top["pytorch"], top["onnx"]))
+
+    print(f"\n📊 {len(cosines)} texts")
+    print(f"   Cosine to PyTorch: mean {cosines.mean():.4f}, min {cosines.min():.4f}, "
+          f"p1 {np.percentile(cosines, 1):.4f}")
+    print(f"   Top-{k} retrieval agreement: {agreement:.1%}")
+    print(f"\n{'Backend':<10}{'corpus s':>10}{'query p50 ms':>14}")
+    for name, (corpus_time, latency) in timings.items():
+        print(f"{name:<10}{corpus_time:>10.2f}{latency:>14.2f}")
+
+    if cosines.min() < args.min_cosine or cosines.mean() < args.mean_cosine:
+        print(f"\n❌ Drift above threshold (min {args.min_cosine}, mean {args.mean_cosine})")
+        sys.exit(1)
+    print("\n✅ ONNX embeddings match the PyTorch model")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import logging
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i",
+    "in", "is", "it", "of", "on", "or", "the", "to", "what", "when", "where", "which", "with", "you",
+    "question", "answer",
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords (place names survive intact)"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class BM25Index:
+    """Okapi BM25 over an inverted index stored as flat NumPy arrays.
+
+    Postings are kept CSR-style: the documents containing term t are
+    doc_ids[offsets[t]:offsets[t + 1]] with matching term_freqs. The whole
+    index saves to a single .npz file.
+    """
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.vocabulary = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.term_freqs = np.zeros(0, dtype=np.uint16)
+        self.doc_lengths = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def build(self, ids: List[str], texts: List[str]):
+        """Index texts; ids[i] identifies texts[i]"""
+        postings = {}
+        lengths = []
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc, count))
+
+        terms = sorted(postings)
+        self.ids = list(ids)
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        sizes = np.array([len(postings[term]) for term in terms], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        flat = [entry for term in terms for entry in postings[term]]
+        self.doc_ids = np.array([doc for doc, _ in flat], dtype=np.int32)
+        self.term_freqs = np.minimum([count for _, count in flat], np.iinfo(np.uint16).max).astype(np.uint16)
+        self.doc_lengths = np.array(lengths, dtype=np.int32)
+
+    def save(self, path: Path):
+        np.savez_compressed(
+            path,
+            ids=np.array(self.ids, dtype=str),
+            terms=np.array(sorted(self.vocabulary, key=self.vocabulary.get), dtype=str),
+            offsets=self.offsets,
+            doc_ids=self.doc_ids,
+            term_freqs=self.term_freqs,
+            doc_lengths=self.doc_lengths,
+            params=np.array([self.k1, self.b]),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BM25Index"]:
+        """Load a saved index, or None if there is none"""
+        if not Path(path).exists():
+            return None
+        with np.load(path) as data:
+            k1, b = data["params"].tolist()
+            index = cls(k1, b)
+            index.ids = data["ids"].tolist()
+            index.vocabulary = {term: i for i, term in enumerate(data["terms"].tolist())}
+            index.offsets = data["offsets"]
+            index.doc_ids = data["doc_ids"]
+            index.term_freqs = data["term_freqs"]
+            index.doc_lengths = data["doc_lengths"]
+        return index
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        if not len(self.ids):
+            return scores
+        n_docs = len(self.ids)
+        avg_length = max(float(self.doc_lengths.mean()), 1.0)
+        norms = self.k1 * (1 - self.b + self.b * self.doc_lengths / avg_length)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            freqs = self.term_freqs[start:end].astype(np.float32)
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + norms[docs])
+        return scores
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top-k (document position, score) pairs with a positive score"""
+        scores = self.scores(query)
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top]
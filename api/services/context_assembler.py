@@ -0,0 +1,102 @@
+import logging
+import re
+from typing import Callable, List, Optional, Set
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+QA_PATTERN = re.compile(r"^QUESTION:\s*(?P<question>.*?)\s*ANSWER:\s*(?P<answer>.*)$", re.DOTALL)
+WORD_PATTERN = re.compile(r"\w+")
+
+def estimate_tokens(text: str) -> int:
+    """Rough llama-tokenizer estimate used when no tokenizer is available"""
+    return int(len(text.split()) * 1.3) + 1
+
+def llm_token_counter(llm) -> Callable[[str], int]:
+    """Return a token counter backed by the LLM's own tokenizer when it exposes one"""
+    tokenize = getattr(llm, "tokenize", None)  # llama.cpp backend
+    if tokenize is None:
+        tokenize = getattr(getattr(llm, "client", None), "tokenize", None)  # ctransformers
+    if tokenize is None:
+        return estimate_tokens
+
+    def count(text: str) -> int:
+        try:
+            return len(tokenize(text))
+        except Exception:
+            return estimate_tokens(text)
+    return count
+
+class ContextAssembler:
+    """Turns retrieved documents into a compact, deduplicated, token-budgeted context"""
+    def __init__(self, count_tokens: Callable[[str], int] = estimate_tokens,
+                 token_budget: Optional[int] = None, dedup_threshold: Optional[float] = None):
+        self.count_tokens = count_tokens
+        self.token_budget = token_budget or settings.context_token_budget
+        self.dedup_threshold = dedup_threshold or settings.context_dedup_threshold
+
+    @staticmethod
+    def format_document(doc) -> str:
+        """Compact "Q:/A:" form of a QA document instead of the Document repr"""
+        content = doc.page_content.strip()
+        match = QA_PATTERN.match(content)
+        if match:
+            return f"Q: {match.group('question')}\nA: {match.group('answer')}"
+        return content
+
+    @staticmethod
+    def _word_set(text: str) -> Set[str]:
+        return set(WORD_PATTERN.findall(text.lower()))
+
+    def _is_duplicate(self, words: Set[str], kept: List[Set[str]]) -> bool:
+        """True when the passage mostly overlaps one already included"""
+        for other in kept:
+            smaller = min(len(words), len(other))
+            if smaller and len(words & other) / smaller >= self.dedup_threshold:
+                return True
+        return False
+
+    def _truncate(self, text: str, budget: int) -> str:
+        """Cut text at a word boundary so it fits in budget tokens"""
+        words = text.split(" ")
+        low, high = 0, len(words)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.count_tokens(" ".join(words[:mid])) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+        return " ".join(words[:low]).rstrip() + " ..." if low else ""
+
+    def assemble(self, docs) -> str:
+        """Build the {context} string for the prompt"""
+        passages = []
+        kept_words: List[Set[str]] = []
+        used = 0
+        dropped = 0
+
+        for doc in docs:
+            text = self.format_document(doc)
+            words = self._word_set(text)
+            if not words or self._is_duplicate(words, kept_words):
+                dropped += 1
+                continue
+
+            remaining = self.token_budget - used
+            tokens = self.count_tokens(text)
+            if tokens > remaining:
+                # Only worth keeping a truncated passage if a meaningful part fits
+                text = self._truncate(text, remaining - 4) if remaining > 32 else ""
+                if not text:
+                    dropped += 1
+                    break
+                tokens = self.count_tokens(text)
+
+            passages.append(text)
+            kept_words.append(words)
+            used += tokens
+
+        logger.info(f"Context assembled: {len(passages)} passages, ~{used} tokens "
+                    f"(budget {self.token_budget}, {dropped} dropped)")
+        return "\n\n".join(passages)
@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Max host parameters per SQLite IN (...) query
+LOOKUP_CHUNK = 500
+# Hits are recorded in memory and written to last_used in batches
+LAST_USED_FLUSH_SIZE = 1000
+LAST_USED_FLUSH_SECONDS = 60.0
+
+def text_hash(text: str) -> str:
+    """Exact-text key; no normalization, since the model may see case and spacing"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache(Embeddings):
+    """Persistent embeddings keyed by (model id, text hash) in front of an embedding model.
+
+    Rebuilding the index, re-chunking and the semantic cache then only encode
+    texts never seen before. Queries and documents share entries, which holds
+    for models that embed both the same way (MiniLM via HuggingFaceEmbeddings).
+    When the database outgrows its size cap, the least recently used vectors
+    are evicted. Hits update last_used in memory, and those timestamps are
+    written in batches (and always before an eviction), so a hit does not
+    cost a write transaction.
+    """
+    def __init__(self, embeddings: Embeddings, model_id: str, db_path: Optional[Path] = None,
+                 max_mb: Optional[int] = None):
+        self.embeddings = embeddings
+        self.model_id = model_id
+        self.db_path = db_path or settings.model_cache_path / "embedding_cache.db"
+        self.max_bytes = (max_mb if max_mb is not None else settings.embedding_cache_max_mb) * 1024 * 1024
+
+        self.lock = threading.Lock()
+        self.conn = None
+        self.total_bytes = 0
+        # text hash -> time of the latest hit not yet written to last_used
+        self.touched: Dict[str, float] = {}
+        self.last_flush = time.time()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self):
+        """Open (or create) the cache database"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embedding_cache_last_used ON embedding_cache (last_used)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embedding_cache").fetchone()[0]
+        logger.info(f"Embedding cache opened at {self.db_path} ({self.total_bytes / 1024 / 1024:.1f} MB)")
+
+    def _fetch(self, hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        for start in range(0, len(hashes), LOOKUP_CHUNK):
+            chunk = hashes[start:start + LOOKUP_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT text_hash, vector FROM embedding_cache WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                [self.model_id, *chunk]
+            ).fetchall()
+            found.update((key, np.frombuffer(blob, dtype=np.float32).tolist()) for key, blob in rows)
+        if found:
+            now = time.time()
+            self.touched.update(dict.fromkeys(found, now))
+            if len(self.touched) >= LAST_USED_FLUSH_SIZE or now - self.last_flush >= LAST_USED_FLUSH_SECONDS:
+                self._flush_last_used()
+        return found
+
+    def _flush_last_used(self):
+        """Write the pending hit timestamps to the database"""
+        if self.touched:
+            self.conn.executemany(
+                "UPDATE embedding_cache SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(used, self.model_id, key) for key, used in self.touched.items()]
+            )
+            self.conn.commit()
+            self.touched.clear()
+        self.last_flush = time.time()
+
+    def _store(self, vectors: Dict[str, List[float]]):
+        now = time.time()
+        rows = [(self.model_id, key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in vectors.items()]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)", rows
+        )
+        self.conn.commit()
+        self.total_bytes += sum(len(row[2]) for row in rows)
+        for key in vectors:
+            self.touched.pop(key, None)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used vectors until the cache is under 90% of its cap"""
+        target = self.max_bytes * 0.9
+        self._flush_last_used()
+        freed, rowids = 0, []
+        for rowid, size in self.conn.execute("SELECT rowid, LENGTH(vector) FROM embedding_cache ORDER BY last_used"):
+            if self.total_bytes - freed <= target:
+                break
+            rowids.append((rowid,))
+            freed += size
+        self.conn.executemany("DELETE FROM embedding_cache WHERE rowid = ?", rowids)
+        self.conn.commit()
+        self.total_bytes -= freed
+        self.evictions += len(rowids)
+        logger.info(f"Embedding cache evicted {len(rowids)} vectors ({freed / 1024 / 1024:.1f} MB)")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        with self.lock:
+            cached = self._fetch(list(set(hashes))) if self.conn else {}
+
+        # Encode each missing text once, even if it repeats within the batch
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing, vectors))
+            with self.lock:
+                if self.conn:
+                    self._store(computed)
+            cached.update(computed)
+
+        with self.lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return [cached[key] for key in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = text_hash(text)
+        with self.lock:
+            cached = self._fetch([key]) if self.conn else {}
+            if key in cached:
+                self.hits += 1
+                return cached[key]
+
+        vector = self.embeddings.embed_query(text)
+        with self.lock:
+            self.misses += 1
+            if self.conn:
+                self._store({key: vector})
+        return vector
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate and size"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_id,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size_mb": round(self.total_bytes / 1024 / 1024, 2),
+            }
+
+    def close(self):
+        with self.lock:
+            if self.conn:
+                self._flush_last_used()
+                self.conn.close()
+                self.conn = None
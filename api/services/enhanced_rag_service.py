@@ -1,12 +1,14 @@
 import logging
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.runnable import RunnablePassthrough, RunnableLambda
 from langchain_community.llms import CTransformers
 from langchain.schema.output_parser import StrOutputParser
 
 from config import settings
+from services.context_assembler import ContextAssembler, llm_token_counter
+from services.generation_control import complete_with_budget, default_stop_sequences, stream_tokens
 from services.maps_service import MapsService
 from services.weather_service import WeatherService
 
@@ -43,6 +45,7 @@ class EnhancedRAGService:
                 'batch_size': settings.batch_size,
                 'context_length': settings.context_length,
                 'threads': settings.threads,
+                'stop': settings.llm_stop_sequences,
             }
         )
     
@@ -101,6 +104,10 @@ Additional Information:
             result["is_translation"] = True
             result["is_general"] = False
         
+        # Language of the query itself, from the character n-gram identifier
+        direction = self.translation_service.detect_direction(query) if self.translation_service else None
+        result["language"] = self.translation_service.SOURCE_LANGUAGES.get(direction) if direction else None
+        
         return result
     
     def process_maps_query(self, query: str) -> str:
@@ -122,14 +129,29 @@ Additional Information:
             if len(parts) > 1:
                 text_to_translate = parts[1].strip()
                 if text_to_translate:
-                    # Determine direction
-                    if "kinyarwanda" in query_lower or "rwanda" in query_lower:
+                    # An explicit target language wins; otherwise translate out of the detected language
+                    if "to kinyarwanda" in query_lower or "in kinyarwanda" in query_lower:
                         return self.translation_service.translate_en_to_rw(text_to_translate)
-                    else:
+                    if "to english" in query_lower or "in english" in query_lower:
                         return self.translation_service.translate_rw_to_en(text_to_translate)
+                    if self.translation_service.detect_direction(text_to_translate) == "en2rw":
+                        return self.translation_service.translate_en_to_rw(text_to_translate)
+                    if "kinyarwanda" in query_lower or "rwanda" in query_lower:
+                        return self.translation_service.translate_en_to_rw(text_to_translate)
+                    return self.translation_service.translate_rw_to_en(text_to_translate)
         
         return "Please specify what you'd like to translate. For example: 'Translate hello to Kinyarwanda' or 'Translate Muraho to English'"
     
+    def generate(self, prompt_value, config) -> str:
+        """Generate an answer, stopping on stop sequences or once the sentence budget is spent"""
+        options = (config.get("metadata") or {}).get("generation") or {}
+        stop = default_stop_sequences(options.get("stop"))
+        max_sentences = options.get("max_sentences")
+        if max_sentences is None:
+            max_sentences = settings.llm_max_sentences
+        pieces = stream_tokens(self.llm, prompt_value.to_string(), stop)
+        return complete_with_budget(pieces, stop, max_sentences)
+    
     def build_rag_chain(self):
         """Build the RAG chain with query optimization"""
         # Get retriever from vector store service
@@ -138,17 +160,20 @@ Additional Information:
         # Create prompt template
         prompt = self.create_prompt_template()
         
+        # Compact, deduplicated, token-budgeted context
+        context_assembler = ContextAssembler(llm_token_counter(self.llm))
+        
         # Build RAG chain
         self.rag_chain = (
-            {"context": retriever, 
+            {"context": retriever | RunnableLambda(context_assembler.assemble), 
              "question": RunnablePassthrough() | RunnableLambda(self.expand_query),
              "additional_info": RunnablePassthrough() | RunnableLambda(lambda x: "")}
             | prompt
-            | self.llm
+            | RunnableLambda(self.generate)
             | StrOutputParser()
         )
     
-    def query(self, text: str) -> str:
+    def query(self, text: str, max_sentences: Optional[int] = None, stop: Optional[List[str]] = None) -> str:
         """Process a query through the enhanced RAG system"""
         start_time = time.time()
         
@@ -174,7 +199,8 @@ Additional Information:
                 if not self.rag_chain:
                     raise RuntimeError("RAG chain not initialized")
                 
-                response = self.rag_chain.invoke(text)
+                generation = {"max_sentences": max_sentences, "stop": stop}
+                response = self.rag_chain.invoke(text, config={"metadata": {"generation": generation}})
                 logger.info(f"General RAG query processed: {text[:50]}...")
             
             process_time = time.time() - start_time
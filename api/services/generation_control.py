@@ -0,0 +1,107 @@
+import re
+from typing import Any, Iterable, Iterator, List, Optional
+
+from config import settings
+
+# A sentence ends at . ! or ? (optionally followed by closing quotes/brackets) and whitespace.
+# Requiring the whitespace keeps decimals like "3.5" and abbreviations mid-token intact.
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)")
+
+class GenerationBudget:
+    """Incremental stop-sequence and sentence-count control over streamed text.
+
+    feed() returns the part of the text that is safe to emit. Text that could be
+    the start of a stop sequence is held back until it is resolved. `done` is set
+    once a stop sequence appears or the sentence budget is spent, and the caller
+    should stop decoding.
+    """
+    def __init__(self, stop: Optional[List[str]] = None, max_sentences: Optional[int] = None):
+        self.stop = [s for s in (stop or []) if s]
+        # Zero or a negative count means no sentence budget
+        self.max_sentences = max(max_sentences or 0, 0)
+        self.text = ""
+        self.emitted = 0
+        self.done = False
+
+    def _held_back(self) -> int:
+        """Length of the longest text suffix that is a proper prefix of a stop sequence"""
+        longest = 0
+        for s in self.stop:
+            for size in range(min(len(s) - 1, len(self.text)), longest, -1):
+                if self.text.endswith(s[:size]):
+                    longest = size
+                    break
+        return longest
+
+    def _cut_at(self, end: int) -> str:
+        self.text = self.text[:end]
+        self.done = True
+        return self._flush(len(self.text))
+
+    def _flush(self, end: int) -> str:
+        piece = self.text[self.emitted:end]
+        self.emitted = max(self.emitted, end)
+        return piece
+
+    def feed(self, piece: str) -> str:
+        if self.done:
+            return ""
+        self.text += piece
+
+        stop_positions = [self.text.find(s) for s in self.stop if s in self.text]
+        if stop_positions:
+            return self._cut_at(min(stop_positions))
+
+        if self.max_sentences:
+            ends = list(SENTENCE_END.finditer(self.text))
+            if len(ends) >= self.max_sentences:
+                return self._cut_at(ends[self.max_sentences - 1].end())
+
+        return self._flush(len(self.text) - self._held_back())
+
+    def finish(self) -> str:
+        """Flush held-back text once the model has stopped on its own"""
+        self.done = True
+        return self._flush(len(self.text))
+
+def default_stop_sequences(extra: Optional[List[str]] = None) -> List[str]:
+    """Configured stop sequences plus any per-request additions"""
+    return list(dict.fromkeys(settings.llm_stop_sequences + (extra or [])))
+
+def stream_tokens(llm: Any, prompt: str, stop: Optional[List[str]] = None) -> Iterator[str]:
+    """Yield text as the model decodes it.
+
+    LangChain's CTransformers wrapper has no _stream, so llm.stream() returns the
+    whole completion as one chunk after decoding has finished. Its ctransformers
+    client streams token by token, and closing that generator stops decoding.
+    """
+    if getattr(llm, "_llm_type", None) == "ctransformers":
+        return llm.client(prompt, stop=stop, stream=True)
+    return llm.stream(prompt, stop=stop)
+
+def stream_with_budget(pieces: Iterable[str], stop: Optional[List[str]] = None,
+                       max_sentences: Optional[int] = None) -> Iterator[str]:
+    """Yield text from a token stream until a stop sequence or the sentence budget is hit.
+
+    Closing the source iterator (done when this generator returns) stops decoding.
+    """
+    budget = GenerationBudget(stop, max_sentences)
+    iterator = iter(pieces)
+    try:
+        for piece in iterator:
+            out = budget.feed(piece)
+            if out:
+                yield out
+            if budget.done:
+                return
+        tail = budget.finish()
+        if tail:
+            yield tail
+    finally:
+        if hasattr(iterator, "close"):
+            iterator.close()
+
+def complete_with_budget(pieces: Iterable[str], stop: Optional[List[str]] = None,
+                         max_sentences: Optional[int] = None) -> str:
+    """Collect a budgeted completion into one string"""
+    return "".join(stream_with_budget(pieces, stop, max_sentences)).strip()
@@ -0,0 +1,89 @@
+import logging
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+from langchain.schema import BaseRetriever, Document
+
+from services.bm25 import tokenize
+from services.numpy_store import mmr_select, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+def reciprocal_rank_fusion(rankings: Sequence[List[str]], weights: Sequence[float], k: int = 60) -> Dict[str, float]:
+    """Weighted RRF: each list adds weight / (k + rank) for the keys it ranks"""
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + weight / (k + rank)
+    return fused
+
+def weighted_fusion(scored: Sequence[Dict[str, float]], weights: Sequence[float]) -> Dict[str, float]:
+    """Weighted sum of per-list scores, each scaled to [0, 1] by its best score"""
+    fused: Dict[str, float] = {}
+    for scores, weight in zip(scored, weights):
+        best = max(scores.values(), default=0.0)
+        if best <= 0:
+            continue
+        for key, score in scores.items():
+            fused[key] = fused.get(key, 0.0) + weight * max(score, 0.0) / best
+    return fused
+
+def term_vectors(texts: Sequence[str]) -> np.ndarray:
+    """Normalized bag-of-terms rows, so dot products measure how much two texts overlap"""
+    vocabulary: Dict[str, int] = {}
+    rows = [[vocabulary.setdefault(term, len(vocabulary)) for term in set(tokenize(text))] for text in texts]
+    vectors = np.zeros((len(texts), max(len(vocabulary), 1)), dtype=np.float32)
+    for i, columns in enumerate(rows):
+        vectors[i, columns] = 1.0
+    return normalize_rows(vectors)
+
+class HybridRetriever(BaseRetriever):
+    """Dense vector search fused with BM25 keyword search.
+
+    Rare names (Kimironko, Nyamirambo, Kacyiru) that the embedding model
+    blurs together still match exactly in BM25, so fusing both candidate
+    lists finds the right QA pair with a smaller k.
+
+    With search_type "mmr" the fused candidates are re-ranked by maximal
+    marginal relevance, using term overlap as redundancy since the two
+    indexes share no vectors.
+    """
+    vector_store: Any
+    bm25: Any
+    documents: List[Document]  # BM25 document positions -> documents
+    k: int = 2
+    fetch_k: int = 20
+    fusion: str = "rrf"  # "rrf" or "weighted"
+    dense_weight: float = 1.0
+    sparse_weight: float = 1.0
+    rrf_k: int = 60
+    search_type: str = "similarity"  # "similarity" or "mmr"
+    lambda_mult: float = 0.5  # MMR trade-off: 1 is pure relevance
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        # Documents are keyed by content: it is unique per QA pair and identical in both indexes
+        by_content: Dict[str, Document] = {}
+        dense_scores: Dict[str, float] = {}
+        for doc, score in self.vector_store.similarity_search_with_relevance_scores(query, k=self.fetch_k):
+            by_content.setdefault(doc.page_content, doc)
+            dense_scores[doc.page_content] = score
+
+        sparse_scores: Dict[str, float] = {}
+        for position, score in self.bm25.search(query, self.fetch_k):
+            doc = self.documents[position]
+            by_content.setdefault(doc.page_content, doc)
+            sparse_scores[doc.page_content] = score
+
+        weights = (self.dense_weight, self.sparse_weight)
+        if self.fusion == "weighted":
+            fused = weighted_fusion([dense_scores, sparse_scores], weights)
+        else:
+            # Both dicts were filled best-first
+            fused = reciprocal_rank_fusion([list(dense_scores), list(sparse_scores)], weights, self.rrf_k)
+        ranked = sorted(fused, key=fused.get, reverse=True)
+        if self.search_type == "mmr" and ranked:
+            candidates = ranked[:self.fetch_k]
+            relevance = np.asarray([fused[key] for key in candidates], dtype=np.float32) / fused[candidates[0]]
+            ranked = [candidates[i] for i in mmr_select(term_vectors(candidates), relevance, self.k, self.lambda_mult)]
+        return [by_content[key] for key in ranked[:self.k]]
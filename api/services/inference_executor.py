@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_END_OF_STREAM = object()
+
+class QueueFullError(RuntimeError):
+    """Raised when a model pool cannot accept more work"""
+    def __init__(self, pool_name: str, retry_after: int):
+        super().__init__(f"Inference queue '{pool_name}' is full")
+        self.pool_name = pool_name
+        self.retry_after = retry_after
+
+class ModelPool:
+    """Fixed-size worker pool with a bounded backlog for one model"""
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-worker")
+        # Running + waiting jobs may never exceed workers + queue_size
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule fn on the pool, rejecting immediately when the backlog is full"""
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise QueueFullError(self.name, settings.inference_retry_after)
+
+        with self.lock:
+            self.pending += 1
+
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        with self.lock:
+            self.pending -= 1
+            self.completed += 1
+        self.slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return current pool utilisation"""
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class InferenceExecutor:
+    """Runs blocking model calls off the event loop in per-model pools"""
+    def __init__(self):
+        self.pools: Dict[str, ModelPool] = {}
+
+    def register_pool(self, name: str, workers: int, queue_size: int):
+        """Create a dedicated pool for a model"""
+        self.pools[name] = ModelPool(name, workers, queue_size)
+        logger.info(f"Inference pool '{name}' ready ({workers} workers, queue {queue_size})")
+
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> Future:
+        """Submit work to a pool from synchronous code"""
+        if name not in self.pools:
+            raise KeyError(f"Unknown inference pool: {name}")
+        return self.pools[name].submit(fn, *args, **kwargs)
+
+    async def run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        """Await the result of fn without blocking the event loop"""
+        future = self.submit(name, fn, *args, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def stream(self, name: str, gen_fn: Callable[..., Iterator], *args) -> AsyncIterator:
+        """Run a blocking generator on a pool and expose it as an async iterator.
+
+        Must be called from the event loop. The pool slot is claimed immediately,
+        so QueueFullError is raised here rather than on first iteration.
+        """
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def push(item, error=None):
+            try:
+                loop.call_soon_threadsafe(items.put_nowait, (item, error))
+            except RuntimeError:
+                # Event loop already closed, nobody is listening
+                cancelled.set()
+
+        def produce():
+            generator = gen_fn(*args)
+            try:
+                for item in generator:
+                    if cancelled.is_set():
+                        break
+                    push(item)
+            except Exception as e:
+                push(_END_OF_STREAM, e)
+                return
+            finally:
+                if hasattr(generator, "close"):
+                    generator.close()
+            push(_END_OF_STREAM)
+
+        self.submit(name, produce)
+        return self._drain(items, cancelled)
+
+    async def _drain(self, items: asyncio.Queue, cancelled: threading.Event) -> AsyncIterator:
+        try:
+            while True:
+                item, error = await items.get()
+                if item is _END_OF_STREAM:
+                    if error:
+                        raise error
+                    return
+                yield item
+        finally:
+            # Stops the producer early if the client went away
+            cancelled.set()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return utilisation for every pool"""
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
+
+    def shutdown(self):
+        """Stop all pools"""
+        for pool in self.pools.values():
+            pool.shutdown()
+
+    def initialize(self):
+        """Create the pools for the LLM and embedding models.
+
+        Translation has no pool: its per-direction micro-batchers queue and
+        batch the sentences themselves.
+        """
+        self.register_pool("llm", settings.llm_workers, settings.llm_queue_size)
+        self.register_pool("embedding", settings.embedding_workers, settings.embedding_queue_size)
+        logger.info("Inference executor initialized successfully")
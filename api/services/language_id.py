@@ -0,0 +1,103 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.helpers import load_data
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)*")
+
+def char_ngrams(text: str, max_n: int = 3) -> List[str]:
+    """Character 1..max_n-grams of each word, padded with spaces to mark word edges"""
+    grams = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f" {word} "
+        for n in range(1, max_n + 1):
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+class LanguageIdentifier:
+    """Naive Bayes over character n-grams for English vs Kinyarwanda.
+
+    Trained at startup from the QA corpus (English) and the bundled Kinyarwanda
+    sentences plus the phrasebook. Kinyarwanda's letter patterns ("rw", "cy",
+    "nya", word-initial "mu"/"ku", few consonant clusters) separate it from
+    English after a word or two.
+    """
+    def __init__(self, max_n: int = 3, alpha: float = 0.5):
+        self.max_n = max_n
+        self.alpha = alpha
+        self.log_probs: Dict[str, Dict[str, float]] = {}
+        self.unseen: Dict[str, float] = {}
+
+        self.lock = threading.Lock()
+        self.detections: Counter = Counter()
+        self.total_time = 0.0
+
+    def train(self, samples: Dict[str, Iterable[str]]):
+        """Fit smoothed n-gram log probabilities per language"""
+        counts = {lang: Counter(g for text in texts for g in char_ngrams(text, self.max_n))
+                  for lang, texts in samples.items()}
+        vocabulary = set().union(*counts.values())
+        for lang, counter in counts.items():
+            total = sum(counter.values()) + self.alpha * (len(vocabulary) + 1)
+            self.log_probs[lang] = {g: math.log((c + self.alpha) / total) for g, c in counter.items()}
+            self.unseen[lang] = math.log(self.alpha / total)
+
+    def load(self):
+        """Train from the repository's data files"""
+        english, kinyarwanda = [], []
+        for path in ["data/tourism_faq_gov.json", "data/tripadvisor_forum.json", "data/local_blog_etiquette.json"]:
+            for item in load_data(path):
+                english.extend([item.get("question", ""), item.get("answer", "")])
+        for entry in load_data("data/phrasebook.json"):
+            english.extend(entry["en"])
+            kinyarwanda.extend(entry["rw"])
+        try:
+            with open("data/langid_kinyarwanda.txt", "r", encoding="utf-8") as f:
+                kinyarwanda.extend(line.strip() for line in f if line.strip())
+        except OSError as e:
+            logger.error(f"Error loading Kinyarwanda samples: {e}")
+
+        self.train({"en": english, "rw": kinyarwanda})
+        logger.info(f"Language identifier trained on {len(english)} English and "
+                    f"{len(kinyarwanda)} Kinyarwanda texts")
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Posterior probability per language (uniform prior); empty when text has no letters"""
+        grams = char_ngrams(text, self.max_n)
+        if not grams or not self.log_probs:
+            return {}
+        log_likelihoods = {
+            lang: sum(probs.get(g, self.unseen[lang]) for g in grams)
+            for lang, probs in self.log_probs.items()
+        }
+        best = max(log_likelihoods.values())
+        # Scale by n-gram count so confidence reflects per-character evidence, not text length
+        scaled = {lang: math.exp((ll - best) / math.sqrt(len(grams))) for lang, ll in log_likelihoods.items()}
+        total = sum(scaled.values())
+        return {lang: value / total for lang, value in scaled.items()}
+
+    def detect(self, text: str) -> Tuple[Optional[str], float]:
+        """Most likely language and its probability, or (None, 0.0)"""
+        start_time = time.perf_counter()
+        scores = self.scores(text)
+        lang, confidence = max(scores.items(), key=lambda item: item[1]) if scores else (None, 0.0)
+        with self.lock:
+            self.detections[lang or "unknown"] += 1
+            self.total_time += time.perf_counter() - start_time
+        return lang, confidence
+
+    def get_stats(self) -> Dict[str, object]:
+        """Detection counts and mean latency"""
+        with self.lock:
+            total = sum(self.detections.values())
+            return {
+                "detections": dict(self.detections),
+                "avg_us": round(self.total_time / total * 1e6, 1) if total else 0.0,
+            }
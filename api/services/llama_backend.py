@@ -0,0 +1,200 @@
+import logging
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain.callbacks.manager import CallbackManagerForLLMRun
+from langchain.llms.base import LLM
+from langchain.schema.output import GenerationChunk
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class LlamaCppPrefixCache(LLM):
+    """llama.cpp LLM that keeps the KV state of a constant prompt prefix.
+
+    The prefix (the system block shared by every RAG prompt) is evaluated once
+    in load(). Its KV state is restored before each request, so only the
+    retrieved context and question are prefilled.
+
+    With prompt_lookup enabled, draft tokens are proposed by n-gram matching
+    against the prompt (the retrieved answers) and verified in one forward pass.
+    No draft model is involved.
+    """
+    model_path: str
+    prefix: str = ""
+    max_new_tokens: int = 256
+    temperature: float = 0.3
+    top_k: int = 40
+    top_p: float = 0.95
+    repeat_penalty: float = 1.1
+    context_length: int = 2048
+    batch_size: int = 32
+    threads: int = 8
+    gpu_layers: int = 0
+    prompt_lookup: bool = False
+    prompt_lookup_max_ngram: int = 3
+    prompt_lookup_num_pred_tokens: int = 10
+
+    client: Any = None  #: :meta private:
+    prefix_tokens: List[int] = []  #: :meta private:
+    prefix_state: Any = None  #: :meta private:
+
+    @property
+    def _llm_type(self) -> str:
+        return "llama_cpp_prefix_cache"
+
+    @classmethod
+    def from_settings(cls, prefix: str) -> "LlamaCppPrefixCache":
+        """Download the GGUF model named in settings and load it with the given prefix"""
+        from huggingface_hub import hf_hub_download
+
+        model_path = hf_hub_download(
+            repo_id=settings.llm_model,
+            filename=settings.llm_model_file,
+            cache_dir=str(settings.model_cache_path)
+        )
+        llm = cls(
+            model_path=model_path,
+            prefix=prefix,
+            max_new_tokens=settings.max_new_tokens,
+            temperature=settings.temperature,
+            context_length=settings.context_length,
+            batch_size=settings.batch_size,
+            threads=settings.threads,
+            gpu_layers=settings.gpu_layers,
+            prompt_lookup=settings.llm_prompt_lookup,
+            prompt_lookup_max_ngram=settings.llm_prompt_lookup_max_ngram,
+            prompt_lookup_num_pred_tokens=settings.llm_prompt_lookup_num_pred_tokens,
+        )
+        llm.load()
+        return llm
+
+    def load(self):
+        """Load the model and precompute the prefix KV state"""
+        try:
+            from llama_cpp import Llama
+            from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+        except ImportError as e:
+            raise ImportError(
+                "LLM_BACKEND=llama_cpp requires llama-cpp-python (pip install llama-cpp-python)"
+            ) from e
+
+        draft_model = None
+        if self.prompt_lookup:
+            # Speculation needs logits for every drafted position; llama.cpp enables logits_all for it
+            draft_model = LlamaPromptLookupDecoding(
+                max_ngram_size=self.prompt_lookup_max_ngram,
+                num_pred_tokens=self.prompt_lookup_num_pred_tokens,
+            )
+            logger.info("Prompt-lookup speculative decoding enabled")
+
+        self.client = Llama(
+            model_path=self.model_path,
+            n_ctx=self.context_length,
+            n_batch=self.batch_size,
+            n_threads=self.threads,
+            n_gpu_layers=self.gpu_layers,
+            draft_model=draft_model,
+            verbose=False,
+        )
+        if self.prefix:
+            start_time = time.time()
+            self.prefix_tokens = self.tokenize(self.prefix)
+            self.client.reset()
+            self.client.eval(self.prefix_tokens)
+            self.prefix_state = self.client.save_state()
+            logger.info(f"Cached KV state for {len(self.prefix_tokens)} prefix tokens "
+                        f"in {time.time() - start_time:.2f}s")
+
+    def tokenize(self, text: str) -> List[int]:
+        return self.client.tokenize(text.encode("utf-8"), add_bos=True)
+
+    def restore_prefix(self, tokens: List[int]) -> bool:
+        """Make sure the KV cache holds the prefix before generating for tokens.
+
+        Returns True when the prompt starts with the cached prefix. The KV cells
+        of the prefix survive between requests, so the state only needs to be
+        reloaded when something else has overwritten them.
+        """
+        n_prefix = len(self.prefix_tokens)
+        if not self.prefix_state or tokens[:n_prefix] != self.prefix_tokens:
+            return False
+        if self.client.n_tokens < n_prefix or list(self.client.input_ids[:n_prefix]) != self.prefix_tokens:
+            self.client.load_state(self.prefix_state)
+        return True
+
+    def prefill(self, prompt: str, use_prefix_cache: bool = True) -> int:
+        """Evaluate a prompt without sampling; returns the number of tokens evaluated"""
+        tokens = self.tokenize(prompt)
+        if use_prefix_cache and self.restore_prefix(tokens):
+            self.client.n_tokens = len(self.prefix_tokens)
+            remaining = tokens[len(self.prefix_tokens):]
+        else:
+            self.client.reset()
+            remaining = tokens
+        self.client.eval(remaining)
+        return len(remaining)
+
+    def _generate_tokens(self, prompt: str) -> Iterator[int]:
+        tokens = self.tokenize(prompt)
+        if not self.restore_prefix(tokens):
+            self.client.reset()
+        # generate() reuses the longest KV prefix shared with the restored state
+        generator = self.client.generate(
+            tokens,
+            top_k=self.top_k,
+            top_p=self.top_p,
+            temp=self.temperature,
+            repeat_penalty=self.repeat_penalty,
+        )
+        eos = self.client.token_eos()
+        for i, token in enumerate(generator):
+            if token == eos or i >= self.max_new_tokens:
+                break
+            yield token
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        pending = b""
+        text = ""
+        for token in self._generate_tokens(prompt):
+            # Tokens may split multi-byte characters; emit only complete text
+            pending += self.client.detokenize([token])
+            try:
+                piece = pending.decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+            pending = b""
+
+            text += piece
+            positions = [text.find(s) for s in stop or [] if s in text]
+            if positions:
+                # Emit whatever precedes the stop sequence, then stop decoding
+                piece = piece[:max(0, min(positions) - (len(text) - len(piece)))]
+                if piece:
+                    yield GenerationChunk(text=piece)
+                break
+
+            chunk = GenerationChunk(text=piece)
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        text = "".join(chunk.text for chunk in self._stream(prompt, stop, run_manager, **kwargs))
+        if stop:
+            for s in stop:
+                text = text.split(s)[0]
+        return text
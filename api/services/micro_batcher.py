@@ -0,0 +1,179 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from config import settings
+from services.inference_executor import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+def length_buckets(lengths: List[int], max_bucket_size: int, max_ratio: float = 2.0) -> List[List[int]]:
+    """Group item indices by length so each padded batch wastes little compute.
+
+    Items are sorted by length; a new bucket starts when the bucket is full or
+    the next item is more than max_ratio times longer than the bucket's shortest.
+    """
+    buckets: List[List[int]] = []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        bucket = buckets[-1] if buckets else None
+        if (bucket is None or len(bucket) >= max_bucket_size
+                or lengths[index] > max(lengths[bucket[0]], 1) * max_ratio):
+            buckets.append([index])
+        else:
+            bucket.append(index)
+    return buckets
+
+def completed(value: Any) -> Future:
+    """An already-resolved future, for results served without the model"""
+    future = Future()
+    future.set_result(value)
+    return future
+
+def gather(futures: List[Future], combine: Callable[[List[Any]], Any]) -> Future:
+    """Future resolving to combine(results) once every future is done (first error wins)"""
+    combined = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        try:
+            combined.set_result(combine([future.result() for future in futures]))
+        except Exception as e:
+            combined.set_exception(e)
+
+    if not futures:
+        combined.set_result(combine([]))
+    for future in futures:
+        future.add_done_callback(on_done)
+    return combined
+
+class MicroBatcher:
+    """Collects requests arriving within a short window and runs them as one batch"""
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int, max_wait_ms: int, queue_size: int = 64):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.running = False
+
+        # Metrics
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.batch_size_counts: Dict[int, int] = {}
+
+    def start(self):
+        """Start the dispatcher thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+        self.thread.start()
+        logger.info(f"Micro-batcher '{self.name}' started (max batch {self.max_batch_size}, "
+                    f"window {self.max_wait * 1000:.0f} ms)")
+
+    def stop(self):
+        """Stop the dispatcher thread after the current batch"""
+        self.running = False
+        if self.thread:
+            try:
+                # Wakes a dispatcher blocked on an empty queue
+                self.queue.put_nowait((None, None, 0.0))
+            except queue.Full:
+                # The dispatcher has work and checks `running` after the current batch
+                pass
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def submit(self, payload: Any, timeout: Optional[float] = None) -> Future:
+        """Queue a payload; the future resolves to its result from the batch.
+
+        Without a timeout a full queue is rejected at once; with one, the caller
+        waits up to timeout seconds for space.
+        """
+        future = Future()
+        try:
+            if timeout is None:
+                self.queue.put_nowait((payload, future, time.time()))
+            else:
+                self.queue.put((payload, future, time.time()), timeout=timeout)
+        except queue.Full:
+            raise QueueFullError(self.name, settings.inference_retry_after)
+        return future
+
+    def _collect(self) -> List[tuple]:
+        """Block for the first item, then gather more until the window closes or the batch is full"""
+        first = self.queue.get()
+        if first[1] is None:
+            return []
+        batch = [first]
+        deadline = time.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item[1] is None:
+                self.running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while self.running:
+            # Skip payloads whose caller gave up (e.g. a sentence of a rejected multi-sentence text)
+            batch = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self._record(batch)
+
+            payloads = [payload for payload, _, _ in batch]
+            try:
+                results = self.batch_fn(payloads)
+            except Exception as e:
+                logger.error(f"Batch '{self.name}' failed ({len(batch)} items): {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _record(self, batch: List[tuple]):
+        now = time.time()
+        with self.lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_size_counts[len(batch)] = self.batch_size_counts.get(len(batch), 0) + 1
+            for _, _, enqueued_at in batch:
+                wait = now - enqueued_at
+                self.total_queue_wait += wait
+                self.max_queue_wait = max(self.max_queue_wait, wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return batching metrics (queue wait and batch size)"""
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "queued": self.queue.qsize(),
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+                "avg_queue_wait_ms": round(self.total_queue_wait / self.items * 1000, 2) if self.items else 0.0,
+                "max_queue_wait_ms": round(self.max_queue_wait * 1000, 2),
+            }
@@ -0,0 +1,204 @@
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux), 0 when unavailable"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def parameter_bytes(model: Any) -> int:
+    """Size of the torch weights held by a model, pipeline or LangChain wrapper"""
+    for candidate in (model, getattr(model, "model", None), getattr(model, "client", None)):
+        parameters = getattr(candidate, "parameters", None)
+        if callable(parameters):
+            try:
+                return sum(p.numel() * p.element_size() for p in parameters())
+            except Exception:
+                continue
+    return 0
+
+class ModelRegistry:
+    """Loads models on first use and keeps their total resident size under a RAM budget.
+
+    Services register a loader per model name and borrow the model with
+    acquire(). When loading would exceed the budget, the least-recently-used
+    model that nobody is currently using is evicted. Models left unused for
+    longer than the idle TTL are evicted by a background thread.
+    """
+    def __init__(self, budget_mb: Optional[int] = None, idle_ttl: Optional[float] = None):
+        self.budget_bytes = (budget_mb if budget_mb is not None else settings.model_ram_budget_mb) * 1024 * 1024
+        self.idle_ttl = idle_ttl if idle_ttl is not None else settings.model_idle_ttl
+        self.lock = threading.RLock()
+        self.loaders: Dict[str, Callable[[], Any]] = {}
+        self.size_hints: Dict[str, int] = {}
+        self.load_locks: Dict[str, threading.Lock] = {}
+        # name -> {"model", "size_bytes", "in_use", "last_used"}; ordered least to most recently used
+        self.resident: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.reaper = None
+        self.stop_reaper = threading.Event()
+
+    def register(self, name: str, loader: Callable[[], Any], size_hint_mb: int = 0):
+        """Register how to load a model; nothing is loaded yet"""
+        with self.lock:
+            self.loaders[name] = loader
+            self.size_hints[name] = size_hint_mb * 1024 * 1024
+            self.load_locks.setdefault(name, threading.Lock())
+            self.counters.setdefault(name, {"loads": 0, "evictions": 0})
+
+    def resident_bytes(self) -> int:
+        with self.lock:
+            return sum(entry["size_bytes"] for entry in self.resident.values())
+
+    def _evict(self, name: str, reason: str):
+        entry = self.resident.pop(name)
+        self.counters[name]["evictions"] += 1
+        logger.info(f"Evicted model '{name}' ({entry['size_bytes'] / 1024 / 1024:.0f} MB, {reason})")
+
+    def _evict_for(self, needed: int, keep: Optional[str] = None):
+        """Evict idle models, least recently used first, until needed bytes fit"""
+        evicted = False
+        with self.lock:
+            for name in list(self.resident.keys()):
+                if self.resident_bytes() + needed <= self.budget_bytes:
+                    break
+                entry = self.resident[name]
+                if name == keep or entry["in_use"] > 0:
+                    continue
+                self._evict(name, "over budget")
+                evicted = True
+        if evicted:
+            # Release the weights now rather than at the next collection
+            gc.collect()
+
+    def _load(self, name: str):
+        with self.load_locks[name]:
+            with self.lock:
+                if name in self.resident:
+                    return
+                loader = self.loaders[name]
+                expected = self.size_hints[name]
+
+            self._evict_for(expected, keep=name)
+
+            start_time = time.time()
+            rss_before = current_rss_bytes()
+            model = loader()
+            size = parameter_bytes(model) or max(current_rss_bytes() - rss_before, 0) or expected
+
+            with self.lock:
+                self.resident[name] = {"model": model, "size_bytes": size, "in_use": 0, "last_used": time.time()}
+                self.counters[name]["loads"] += 1
+                # Later loads can pre-evict using the measured size
+                self.size_hints[name] = size
+            logger.info(f"Loaded model '{name}' in {time.time() - start_time:.1f}s ({size / 1024 / 1024:.0f} MB)")
+
+            # The loader may have been larger than its hint
+            self._evict_for(0, keep=name)
+            if self.resident_bytes() > self.budget_bytes:
+                logger.warning(f"Model RAM budget exceeded: {self.resident_bytes() / 1024 / 1024:.0f} MB "
+                               f"resident, budget {self.budget_bytes / 1024 / 1024:.0f} MB")
+
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[Any]:
+        """Borrow a model, loading it if needed; it cannot be evicted while borrowed"""
+        if name not in self.loaders:
+            raise KeyError(f"Unknown model: {name}")
+        while True:
+            with self.lock:
+                entry = self.resident.get(name)
+                if entry is not None:
+                    entry["in_use"] += 1
+                    entry["last_used"] = time.time()
+                    self.resident.move_to_end(name)
+                    break
+            self._load(name)
+        try:
+            yield entry["model"]
+        finally:
+            with self.lock:
+                entry["in_use"] -= 1
+                entry["last_used"] = time.time()
+                over_budget = self.resident_bytes() > self.budget_bytes
+            # A model pinned during another load may have left us over budget
+            if over_budget:
+                self._evict_for(0)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Evict models nobody has used for longer than the idle TTL; returns how many were evicted"""
+        if not self.idle_ttl:
+            return 0
+        now = now if now is not None else time.time()
+        with self.lock:
+            idle = [name for name, entry in self.resident.items()
+                    if entry["in_use"] == 0 and now - entry["last_used"] > self.idle_ttl]
+            for name in idle:
+                self._evict(name, f"idle {now - self.resident[name]['last_used']:.0f}s")
+        if idle:
+            gc.collect()
+        return len(idle)
+
+    def _reap(self):
+        # Check a few times per TTL so a model is evicted soon after it expires
+        interval = max(self.idle_ttl / 4, 1.0)
+        while not self.stop_reaper.wait(interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.error(f"Idle model eviction failed: {e}")
+
+    def start(self):
+        """Start evicting idle models in the background (no-op when the idle TTL is 0)"""
+        if self.reaper or not self.idle_ttl:
+            return
+        self.stop_reaper.clear()
+        self.reaper = threading.Thread(target=self._reap, name="model-idle-reaper", daemon=True)
+        self.reaper.start()
+        logger.info(f"Idle models are evicted after {self.idle_ttl:.0f}s")
+
+    def stop(self):
+        """Stop the idle eviction thread"""
+        self.stop_reaper.set()
+        if self.reaper:
+            self.reaper.join(timeout=5)
+            self.reaper = None
+
+    def is_loaded(self, name: str) -> bool:
+        with self.lock:
+            return name in self.resident
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Budget, resident total and per-model state for /health"""
+        with self.lock:
+            models = {}
+            for name in self.loaders:
+                entry = self.resident.get(name)
+                models[name] = {
+                    "loaded": entry is not None,
+                    "size_mb": round(entry["size_bytes"] / 1024 / 1024, 1) if entry else 0.0,
+                    "in_use": entry["in_use"] if entry else 0,
+                    "idle_seconds": round(time.time() - entry["last_used"], 1) if entry else None,
+                    **self.counters[name],
+                }
+            return {
+                "budget_mb": round(self.budget_bytes / 1024 / 1024),
+                "idle_ttl": self.idle_ttl,
+                "resident_mb": round(self.resident_bytes() / 1024 / 1024, 1),
+                "models": models,
+            }
+
+# Global registry shared by all services
+model_registry = ModelRegistry()
@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+from langchain.schema import Document
+from langchain.schema.vectorstore import VectorStore
+
+logger = logging.getLogger(__name__)
+
+MATRIX_FILE = "embeddings.npy"
+DOCUMENTS_FILE = "documents.json"
+# Rows per block when scoring a float16 matrix in float32
+SCORE_BLOCK_ROWS = 4096
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products are cosine similarities"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        norm = np.linalg.norm(vectors)
+        return vectors / norm if norm else vectors
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+def mmr_select(candidates: np.ndarray, relevance: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """Maximal marginal relevance over normalized candidate rows; returns positions into candidates"""
+    selected: List[int] = []
+    if not len(candidates):
+        return selected
+    # Highest similarity of each candidate to anything already selected
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    for _ in range(min(k, len(candidates))):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, candidates @ candidates[best])
+    return selected
+
+class NumpyVectorStore(VectorStore):
+    """Exact cosine search over one contiguous matrix of normalized embeddings.
+
+    Sized for corpora of a few thousand passages, where a single matrix-vector
+    product beats an HNSW index and needs neither SQLite nor a server. The
+    matrix is saved as .npy (float32 or float16) next to a JSON file of
+    documents, and memory-mapped when loaded.
+    """
+    def __init__(self, embedding: Embeddings, path: Optional[Path] = None, dtype: str = "float32"):
+        self._embedding = embedding
+        self.path = Path(path) if path else None
+        self.dtype = np.dtype(dtype)
+        self.matrix = np.zeros((0, 0), dtype=self.dtype)
+        self.documents: List[Document] = []
+        self.ids: List[str] = []
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add_vectors(self, vectors: np.ndarray, documents: List[Document], ids: Optional[List[str]] = None) -> List[str]:
+        """Append precomputed embeddings and their documents"""
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in documents]
+        rows = normalize_rows(vectors).astype(self.dtype)
+        # An mmap'd matrix is read-only; appending makes an in-memory copy
+        self.matrix = np.vstack([self.matrix, rows]) if len(self.matrix) else rows
+        self.documents.extend(documents)
+        self.ids.extend(ids)
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        documents = [Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas)]
+        vectors = np.asarray(self._embedding.embed_documents(texts), dtype=np.float32)
+        return self.add_vectors(vectors, documents, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Remove documents by id"""
+        if not ids:
+            return False
+        remove = set(ids)
+        keep = [i for i, doc_id in enumerate(self.ids) if doc_id not in remove]
+        if len(keep) == len(self.ids):
+            return False
+        self.matrix = np.ascontiguousarray(self.matrix[keep]) if keep else np.zeros((0, 0), dtype=self.dtype)
+        self.documents = [self.documents[i] for i in keep]
+        self.ids = [self.ids[i] for i in keep]
+        return True
+
+    def save(self):
+        """Write the matrix and documents, replacing the previous files atomically"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        matrix_tmp = self.path / f"{MATRIX_FILE}.tmp"
+        with open(matrix_tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.matrix, dtype=self.dtype))
+        documents_tmp = self.path / f"{DOCUMENTS_FILE}.tmp"
+        with open(documents_tmp, "w", encoding="utf-8") as f:
+            json.dump([
+                {"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata}
+                for doc_id, doc in zip(self.ids, self.documents)
+            ], f, ensure_ascii=False)
+        os.replace(matrix_tmp, self.path / MATRIX_FILE)
+        os.replace(documents_tmp, self.path / DOCUMENTS_FILE)
+
+    @classmethod
+    def load(cls, embedding: Embeddings, path: Path) -> Optional["NumpyVectorStore"]:
+        """Open a saved store with the matrix memory-mapped, or None if there is none"""
+        path = Path(path)
+        if not (path / MATRIX_FILE).exists() or not (path / DOCUMENTS_FILE).exists():
+            return None
+        matrix = np.load(path / MATRIX_FILE, mmap_mode="r")
+        with open(path / DOCUMENTS_FILE, "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        store = cls(embedding, path, dtype=str(matrix.dtype))
+        store.matrix = matrix
+        store.ids = [record["id"] for record in records]
+        store.documents = [Document(page_content=record["page_content"], metadata=record["metadata"]) for record in records]
+        logger.info(f"Loaded {len(store)} vectors ({matrix.dtype}) from {path}")
+        return store
+
+    def scores(self, query_vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query to every stored vector"""
+        if not len(self.matrix):
+            return np.zeros(0, dtype=np.float32)
+        query = normalize_rows(query_vector)
+        if self.matrix.dtype == np.float32:
+            return self.matrix @ query
+        # float16 has no BLAS path and accumulates badly; upcast a block at a time
+        return np.concatenate([
+            self.matrix[start:start + SCORE_BLOCK_ROWS].astype(np.float32) @ query
+            for start in range(0, len(self.matrix), SCORE_BLOCK_ROWS)
+        ])
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        scores = self.scores(np.asarray(embedding, dtype=np.float32))
+        return [(self.documents[i], float(scores[i])) for i in top_k(scores, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Documents with their cosine similarity (higher is closer)"""
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k)
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are already cosine similarities
+        return lambda score: score
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5, **kwargs: Any) -> List[Document]:
+        scores = self.scores(np.asarray(embedding, dtype=np.float32))
+        candidates = top_k(scores, max(fetch_k, k))
+        rows = np.asarray(self.matrix[candidates], dtype=np.float32)
+        return [self.documents[candidates[i]] for i in mmr_select(rows, scores[candidates], k, lambda_mult)]
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20,
+                                      lambda_mult: float = 0.5, **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self._embedding.embed_query(query), k, fetch_k, lambda_mult
+        )
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   path: Optional[Path] = None, dtype: str = "float32", **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(embedding, path, dtype)
+        store.add_texts(texts, metadatas, ids=kwargs.get("ids"))
+        return store
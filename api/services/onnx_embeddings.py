@@ -0,0 +1,60 @@
+import logging
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+def onnx_model_dir(model_name: str, quantized: bool = True) -> Path:
+    """Where the ONNX export of an embedding model is stored"""
+    suffix = "-int8" if quantized else ""
+    return settings.model_cache_path / "onnx" / f"{model_name.replace('/', '--')}{suffix}"
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings from an ONNX export of a sentence-transformers model.
+
+    Reproduces the MiniLM pipeline (mean pooling over the attention mask, then
+    L2 normalization) on onnxruntime, with all cores available to one
+    session. Create the model with scripts/export_embedding_onnx.py.
+    """
+    def __init__(self, model_dir: Path, batch_size: int = 32, max_length: int = 256):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        model_file = Path(model_dir) / "model.onnx"
+        if not model_file.exists():
+            raise FileNotFoundError(f"No ONNX embedding model at {model_dir}; run scripts/export_embedding_onnx.py")
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = os.cpu_count() or settings.threads
+        self.session = onnxruntime.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        inputs = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        feed = {name: np.asarray(value, dtype=np.int64) for name, value in inputs.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, feed)[0]
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Batch texts of similar length together to keep padding small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[List[float]] = [[] for _ in texts]
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
@@ -0,0 +1,130 @@
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.helpers import load_data
+
+logger = logging.getLogger(__name__)
+
+PUNCTUATION = re.compile(r"[^\w\s']")
+CLAUSE_SPLIT = re.compile(r"([,.!?;:]+\s*)")
+TERMINAL = "$"
+
+class Phrasebook:
+    """Curated fixed phrases answered without the translation model.
+
+    Each direction compiles to a dict of normalized phrases and a word trie.
+    Inputs that are not a phrase on their own, such as "Muraho, murakoze
+    cyane!", are segmented greedily into the longest known phrases. They are
+    answered only when every word is covered. Entries marked "compose": false
+    (single nouns whose order would matter) only match a whole input.
+    """
+    # Which side of a phrasebook entry is the source for each direction
+    SIDES = {"en2rw": ("en", "rw"), "rw2en": ("rw", "en")}
+
+    def __init__(self, path: str = "data/phrasebook.json"):
+        self.path = path
+        self.phrases: Dict[str, Dict[str, str]] = {}
+        self.tries: Dict[str, Dict[str, Any]] = {}
+
+        self.lock = threading.Lock()
+        self.exact_hits = 0
+        self.composed_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        text = text.lower().replace("’", "'")
+        return " ".join(PUNCTUATION.sub(" ", text).split())
+
+    def load(self):
+        """Compile the phrasebook file into lookup tables"""
+        entries = load_data(self.path)
+        for direction, (source, target) in self.SIDES.items():
+            phrases = {}
+            trie: Dict[str, Any] = {}
+            for entry in entries:
+                translation = entry[target][0]
+                for variant in entry[source]:
+                    key = self.normalize(variant)
+                    # The first entry wins when variants collide
+                    if key and key not in phrases:
+                        phrases[key] = translation
+                        if entry.get("compose", True):
+                            self._insert(trie, key.split(), translation)
+            self.phrases[direction] = phrases
+            self.tries[direction] = trie
+        logger.info(f"Phrasebook loaded {len(entries)} entries from {self.path}")
+
+    @staticmethod
+    def _insert(trie: Dict[str, Any], words: List[str], translation: str):
+        node = trie
+        for word in words:
+            node = node.setdefault(word, {})
+        node[TERMINAL] = translation
+
+    def _segment(self, direction: str, words: List[str]) -> Optional[List[str]]:
+        """Greedy longest-match cover of words by known phrases, or None"""
+        trie = self.tries.get(direction, {})
+        output = []
+        i = 0
+        while i < len(words):
+            node = trie
+            match = None
+            for j in range(i, len(words)):
+                node = node.get(words[j])
+                if node is None:
+                    break
+                if TERMINAL in node:
+                    match = (j + 1, node[TERMINAL])
+            if match is None:
+                return None
+            i, translation = match
+            output.append(translation.rstrip(".!?"))
+        return output
+
+    def _compose(self, direction: str, text: str) -> Optional[str]:
+        """Translate clause by clause, keeping the original punctuation between clauses"""
+        parts = CLAUSE_SPLIT.split(text)
+        output = []
+        for i, part in enumerate(parts):
+            if i % 2:
+                output.append(part)
+                continue
+            words = self.normalize(part).split()
+            if not words:
+                continue
+            translated = self._segment(direction, words)
+            if translated is None:
+                return None
+            output.append(" ".join(translated))
+        return "".join(output).strip() or None
+
+    def lookup(self, direction: str, text: str) -> Optional[str]:
+        """Return the phrasebook translation of text, or None"""
+        translation = self.phrases.get(direction, {}).get(self.normalize(text))
+        if translation is not None:
+            with self.lock:
+                self.exact_hits += 1
+            return translation
+
+        translation = self._compose(direction, text)
+        with self.lock:
+            if translation is None:
+                self.misses += 1
+            else:
+                self.composed_hits += 1
+        return translation
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rates of exact and composed phrase lookups"""
+        with self.lock:
+            lookups = self.exact_hits + self.composed_hits + self.misses
+            return {
+                "phrases": {direction: len(phrases) for direction, phrases in self.phrases.items()},
+                "exact_hits": self.exact_hits,
+                "composed_hits": self.composed_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.composed_hits) / lookups, 3) if lookups else 0.0,
+            }
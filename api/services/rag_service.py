@@ -1,24 +1,50 @@
 import logging
+import threading
 import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.runnable import RunnablePassthrough, RunnableLambda
 from langchain_community.llms import CTransformers
 from langchain.schema.output_parser import StrOutputParser
 
 from config import settings
+from services.context_assembler import ContextAssembler, llm_token_counter
+from services.generation_control import complete_with_budget, default_stop_sequences, stream_tokens, stream_with_budget
+from services.model_registry import model_registry
+from services.semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
 class RAGService:
+    LLM_MODEL = "llm"
+    
     def __init__(self, vector_store_service):
         self.vector_store_service = vector_store_service
-        self.llm = None
         self.rag_chain = None
+        self.retriever = None
+        self.prompt = None
+        self.semantic_cache = None
+        self.context_assembler = None
+        self.path_counts = {"direct": 0, "cache": 0, "llm": 0}
+        self.stats_lock = threading.Lock()
+        # The CTransformers model is not thread-safe; generations take turns
+        self.llm_lock = threading.Lock()
         
     def initialize_llm(self):
-        """Initialize the language model"""
+        """Register the language model; it loads on the first generation"""
+        if settings.llm_backend != "llama_cpp" and settings.llm_prompt_lookup:
+            logger.warning("LLM_PROMPT_LOOKUP requires LLM_BACKEND=llama_cpp; ignoring it for CTransformers")
+        model_registry.register(self.LLM_MODEL, self.load_llm, size_hint_mb=800)
+    
+    def load_llm(self):
+        """Load the language model for the configured backend"""
+        if settings.llm_backend == "llama_cpp":
+            from services.llama_backend import LlamaCppPrefixCache
+            logger.info("Initializing TinyLlama-1.1B-Chat model (llama.cpp, cached prompt prefix)...")
+            return LlamaCppPrefixCache.from_settings(prefix=self.prompt_prefix())
+        
         logger.info("Initializing TinyLlama-1.1B-Chat model...")
-        self.llm = CTransformers(
+        return CTransformers(
             model=settings.llm_model,
             model_file=settings.llm_model_file,
             model_type="llama",
@@ -32,6 +58,12 @@ class RAGService:
             }
         )
     
+    def prompt_prefix(self) -> str:
+        """The rendered prompt text that precedes the first variable (identical for every request)"""
+        marker = "\x00"
+        rendered = self.create_prompt_template().invoke({"context": marker, "question": marker}).to_string()
+        return rendered.split(marker)[0]
+    
     def create_prompt_template(self):
         """Create the prompt template for the RAG chain"""
         template = """<|system|>
@@ -53,44 +85,209 @@ Information:
             return input_text + " in Kigali, Rwanda"
         return input_text
     
+    def generation_options(self, max_sentences: Optional[int] = None,
+                           stop: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Per-request stop sequences and sentence budget, falling back to settings"""
+        return {
+            "stop": default_stop_sequences(stop),
+            "max_sentences": settings.llm_max_sentences if max_sentences is None else max_sentences,
+        }
+    
+    def use_cache(self, options: Dict[str, Any]) -> bool:
+        """Whether the semantic cache applies; it only holds answers generated with the default options"""
+        return self.semantic_cache is not None and options == self.generation_options()
+    
+    def log_prompt_size(self, prompt_text: str):
+        """Log the prompt token count; prefill cost grows linearly with it"""
+        logger.info(f"Prompt tokens: {self.context_assembler.count_tokens(prompt_text)}")
+    
+    def complete(self, prompt_text: str, options: Dict[str, Any]) -> str:
+        """Generate one completion, stopping early on stop sequences or the sentence budget"""
+        self.log_prompt_size(prompt_text)
+        # Concurrent requests are serialized, not micro-batched: neither LLM backend decodes
+        # several sequences in one pass, so a batch window would only add latency
+        with self.llm_lock, model_registry.acquire(self.LLM_MODEL) as llm:
+            pieces = stream_tokens(llm, prompt_text, options["stop"])
+            return complete_with_budget(pieces, options["stop"], options["max_sentences"])
+    
+    def generate(self, prompt_value, config) -> str:
+        """Generate the answer for the rendered RAG prompt"""
+        options = (config.get("metadata") or {}).get("generation") or self.generation_options()
+        return self.complete(prompt_value.to_string(), options)
+    
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the LLM's tokenizer, borrowing the model from the registry"""
+        with model_registry.acquire(self.LLM_MODEL) as llm:
+            return llm_token_counter(llm)(text)
+    
+    def retrieve(self, text: str):
+        """Fetch context documents for a query"""
+        return self.retriever.invoke(text)
+    
+    def build_prompt(self, text: str, docs) -> str:
+        """Render the prompt exactly as the RAG chain would"""
+        context = self.context_assembler.assemble(docs)
+        return self.prompt.invoke({"context": context, "question": self.expand_query(text)}).to_string()
+    
+    def stream_prompt(self, prompt_text: str, options: Dict[str, Any]) -> Iterator[str]:
+        """Yield generated text for a rendered prompt within the generation budget"""
+        self.log_prompt_size(prompt_text)
+        with self.llm_lock, model_registry.acquire(self.LLM_MODEL) as llm:
+            pieces = stream_tokens(llm, prompt_text, options["stop"])
+            for piece in stream_with_budget(pieces, options["stop"], options["max_sentences"]):
+                yield piece
+    
+    async def astream(self, text: str, inference_executor, max_sentences: Optional[int] = None,
+                      stop: Optional[List[str]] = None,
+                      result: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Async token stream: retrieval once up front, then generation on the LLM pool.
+        
+        If given, result["service_used"] is set to the path that produced the answer.
+        """
+        if not self.rag_chain:
+            raise RuntimeError("RAG chain not initialized")
+        result = result if result is not None else {}
+        
+        fast, query_vector = await inference_executor.run("embedding", self.fast_answer, text, None, max_sentences, stop)
+        if fast:
+            result["service_used"] = fast["service_used"]
+            yield fast["response"]
+            return
+        
+        result["service_used"] = "RAG"
+        
+        docs = await inference_executor.run("embedding", self.retrieve, text)
+        # Token counting borrows (and may load) the LLM, so it must not run on the event loop
+        prompt_text = await inference_executor.run("llm", self.build_prompt, text, docs)
+        tokens = []
+        options = self.generation_options(max_sentences, stop)
+        async for token in inference_executor.stream("llm", self.stream_prompt, prompt_text, options):
+            tokens.append(token)
+            yield token
+        self.record_path("llm")
+        
+        if self.use_cache(options):
+            await inference_executor.run("embedding", self.semantic_cache.store, text, "".join(tokens), query_vector)
+    
     def build_rag_chain(self):
         """Build the RAG chain with query optimization"""
         # Get retriever from vector store service
-        retriever = self.vector_store_service.get_retriever()
+        self.retriever = self.vector_store_service.get_retriever()
         
         # Create prompt template
-        prompt = self.create_prompt_template()
+        self.prompt = self.create_prompt_template()
+        
+        # Compact, deduplicated, token-budgeted context instead of raw Document reprs
+        self.context_assembler = ContextAssembler(self.count_tokens)
         
         # Build RAG chain
         self.rag_chain = (
-            {"context": retriever, 
+            {"context": self.retriever | RunnableLambda(self.context_assembler.assemble), 
              "question": RunnablePassthrough() | RunnableLambda(self.expand_query)}
-            | prompt
-            | self.llm
+            | self.prompt
+            | RunnableLambda(self.generate)
             | StrOutputParser()
         )
     
-    def query(self, text: str) -> str:
-        """Process a query through the RAG chain"""
+    def query_vector(self, text: str, use_fast_path: bool = True):
+        """Embed the query once for the direct-answer match and the semantic cache, if either needs it"""
+        if self.semantic_cache or (use_fast_path and settings.direct_answer_enabled):
+            return self.vector_store_service.embed_query(text)
+        return None
+    
+    def fast_answer(self, text: str, query_vector=None, max_sentences: Optional[int] = None,
+                    stop: Optional[List[str]] = None) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """Answer without touching the LLM when possible.
+        
+        A near-identical corpus question returns its stored answer directly;
+        otherwise the semantic cache is consulted, unless the request asks for
+        non-default generation options. Returns the answer (None on a miss) and
+        the query vector, so the LLM path can reuse it instead of embedding again.
+        """
+        use_cache = self.use_cache(self.generation_options(max_sentences, stop))
+        if not settings.direct_answer_enabled and not use_cache:
+            return None, query_vector
+        
+        if query_vector is None:
+            query_vector = self.vector_store_service.embed_query(text)
+        
+        if settings.direct_answer_enabled:
+            score, item = self.vector_store_service.match_question(query_vector)
+            if item and score >= settings.direct_answer_threshold:
+                self.record_path("direct")
+                logger.info(f"Direct answer ({score:.3f}) for: {text[:50]}")
+                return {"response": item["answer"], "service_used": "RAG-direct"}, query_vector
+        
+        if use_cache:
+            cached = self.semantic_cache.lookup(text, query_vector)
+            if cached is not None:
+                self.record_path("cache")
+                return {"response": cached, "service_used": "RAG-cache"}, query_vector
+        return None, query_vector
+    
+    def record_path(self, path: str):
+        """Count which path answered a query"""
+        with self.stats_lock:
+            self.path_counts[path] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return how often each answer path fired"""
+        with self.stats_lock:
+            total = sum(self.path_counts.values())
+            stats = dict(self.path_counts)
+        stats["direct_rate"] = round(stats["direct"] / total, 3) if total else 0.0
+        return stats
+    
+    def answer(self, text: str, use_fast_path: bool = True, max_sentences: Optional[int] = None,
+               stop: Optional[List[str]] = None, query_vector=None) -> Dict[str, Any]:
+        """Process a query and report which path produced the answer.
+        
+        Pass the query_vector returned by fast_answer to avoid embedding the query twice.
+        """
         if not self.rag_chain:
             raise RuntimeError("RAG chain not initialized")
         
         start_time = time.time()
         try:
-            response = self.rag_chain.invoke(text)
+            if query_vector is None:
+                query_vector = self.query_vector(text, use_fast_path)
+            if use_fast_path:
+                fast, query_vector = self.fast_answer(text, query_vector, max_sentences, stop)
+                if fast:
+                    return fast
+            
+            options = self.generation_options(max_sentences, stop)
+            response = self.rag_chain.invoke(text, config={"metadata": {"generation": options}})
+            self.record_path("llm")
+            if self.use_cache(options):
+                self.semantic_cache.store(text, response, query_vector)
             process_time = time.time() - start_time
             
             logger.info(f"Processed query in {process_time:.2f}s: {text[:50]}{'...' if len(text) > 50 else ''}")
-            return response
+            return {"response": response, "service_used": "RAG"}
         except Exception as e:
             logger.error(f"Query processing error: {e}")
             raise
     
+    def query(self, text: str) -> str:
+        """Process a query through the RAG chain"""
+        return self.answer(text)["response"]
+    
+    def shutdown(self):
+        """Persist the semantic cache"""
+        if self.semantic_cache:
+            self.semantic_cache.save()
+    
     def initialize(self):
         """Initialize the RAG service"""
         # Initialize LLM
         self.initialize_llm()
         
+        # Load the semantic answer cache
+        if settings.semantic_cache_enabled:
+            self.semantic_cache = SemanticCache(self.vector_store_service)
+            self.semantic_cache.load()
+        
         # Build RAG chain
         self.build_rag_chain()
         
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """Answer cache keyed on query embeddings with LRU + TTL eviction.
+
+    A lookup returns the cached answer of the most similar stored query when the
+    cosine similarity is above the threshold. Entries are tied to the vector
+    store's index_id and dropped when the index is rebuilt.
+    """
+    def __init__(self, vector_store_service, cache_dir: Optional[Path] = None):
+        self.vector_store_service = vector_store_service
+        self.cache_dir = cache_dir or settings.persistent_path / "semantic_cache"
+        self.threshold = settings.semantic_cache_threshold
+        self.ttl = settings.semantic_cache_ttl
+        self.max_entries = settings.semantic_cache_max_entries
+        self.max_bytes = settings.semantic_cache_max_mb * 1024 * 1024
+
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.size_bytes = 0
+        self.index_id = None
+        self.unsaved_writes = 0
+
+        # Dense matrix of entry vectors, rebuilt lazily after changes
+        self.matrix = None
+        self.matrix_keys = []
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a query with the vector store's model, L2-normalized"""
+        return self.vector_store_service.embed_query(text)
+
+    def _entry_size(self, entry: Dict[str, Any]) -> int:
+        return entry["vector"].nbytes + len(entry["query"]) + len(entry["response"])
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key)
+        self.size_bytes -= self._entry_size(entry)
+        self.matrix = None
+
+    def _check_index(self):
+        """Drop everything if the vector store was rebuilt since the entries were cached"""
+        current = self.vector_store_service.index_id
+        if current != self.index_id:
+            if self.entries:
+                logger.info("Vector store changed, invalidating semantic cache")
+            self.entries.clear()
+            self.size_bytes = 0
+            self.matrix = None
+            self.index_id = current
+
+    def _expire(self, now: float):
+        expired = [key for key, entry in self.entries.items() if now - entry["created_at"] > self.ttl]
+        for key in expired:
+            self._remove(key)
+
+    def _ensure_matrix(self):
+        if self.matrix is None:
+            self.matrix_keys = list(self.entries.keys())
+            if self.matrix_keys:
+                self.matrix = np.stack([self.entries[key]["vector"] for key in self.matrix_keys])
+            else:
+                self.matrix = np.empty((0, 0), dtype=np.float32)
+
+    def lookup(self, text: str, vector: Optional[np.ndarray] = None) -> Optional[str]:
+        """Return a cached answer for a semantically equivalent query, if any"""
+        if vector is None:
+            vector = self.embed(text)
+
+        with self.lock:
+            self._check_index()
+            self._expire(time.time())
+            if not self.entries:
+                self.misses += 1
+                return None
+
+            self._ensure_matrix()
+            scores = self.matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            key = self.matrix_keys[best]
+            self.entries.move_to_end(key)
+            self.hits += 1
+            logger.info(f"Semantic cache hit ({scores[best]:.3f}): {text[:50]}")
+            return self.entries[key]["response"]
+
+    def store(self, text: str, response: str, vector: Optional[np.ndarray] = None):
+        """Cache an answer, evicting least-recently-used entries over the limits"""
+        if vector is None:
+            vector = self.embed(text)
+
+        key = self.normalize_query(text)
+        entry = {"query": text, "response": response, "vector": vector, "created_at": time.time()}
+
+        with self.lock:
+            self._check_index()
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = entry
+            self.size_bytes += self._entry_size(entry)
+            self.matrix = None
+
+            while self.entries and (len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes):
+                self._remove(next(iter(self.entries)))
+
+            self.unsaved_writes += 1
+            should_save = self.unsaved_writes >= settings.semantic_cache_save_every
+
+        if should_save:
+            self.save()
+
+    def invalidate(self):
+        """Remove all entries"""
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+            self.matrix = None
+
+    def save(self):
+        """Persist entries to disk"""
+        with self.lock:
+            keys = list(self.entries.keys())
+            records = [
+                {"key": key, "query": self.entries[key]["query"],
+                 "response": self.entries[key]["response"], "created_at": self.entries[key]["created_at"]}
+                for key in keys
+            ]
+            vectors = np.stack([self.entries[key]["vector"] for key in keys]) if keys else None
+            index_id = self.index_id
+            self.unsaved_writes = 0
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if vectors is not None:
+                vectors_tmp = self.cache_dir / "vectors.npy.tmp"
+                with open(vectors_tmp, "wb") as f:
+                    np.save(f, vectors)
+                os.replace(vectors_tmp, self.cache_dir / "vectors.npy")
+            tmp_path = self.cache_dir / "entries.json.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"index_id": index_id, "entries": records}, f)
+            os.replace(tmp_path, self.cache_dir / "entries.json")
+        except Exception as e:
+            logger.error(f"Failed to save semantic cache: {e}")
+
+    def load(self):
+        """Restore persisted entries, discarding them if the index changed"""
+        entries_file = self.cache_dir / "entries.json"
+        if not entries_file.exists():
+            return
+        try:
+            with open(entries_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            records = data.get("entries", [])
+            vectors = np.load(self.cache_dir / "vectors.npy") if records else None
+            if vectors is not None and len(vectors) != len(records):
+                raise ValueError(f"{len(records)} entries but {len(vectors)} vectors")
+        except Exception as e:
+            logger.error(f"Failed to load semantic cache: {e}")
+            return
+
+        with self.lock:
+            self.index_id = data.get("index_id")
+            for i, record in enumerate(records):
+                entry = {
+                    "query": record["query"], "response": record["response"],
+                    "vector": vectors[i], "created_at": record["created_at"]
+                }
+                self.entries[record["key"]] = entry
+                self.size_bytes += self._entry_size(entry)
+            self._check_index()
+            self._expire(time.time())
+        logger.info(f"Loaded {len(self.entries)} semantic cache entries")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache size and hit rate"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "size_mb": round(self.size_bytes / 1024 / 1024, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
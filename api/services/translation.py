@@ -1,66 +1,314 @@
 import logging
-from transformers import pipeline
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 
 from config import settings
+from services.inference_executor import QueueFullError
+from services.language_id import LanguageIdentifier
+from services.micro_batcher import MicroBatcher, completed, gather, length_buckets
+from services.model_registry import model_registry
+from services.phrasebook import Phrasebook
+from services.translation_memory import TranslationMemory
+from utils.text import split_sentences
 
 logger = logging.getLogger(__name__)
 
+# NLLB-200 language codes
+ENGLISH = "eng_Latn"
+KINYARWANDA = "kin_Latn"
+
+# Per-direction Marian models used when NLLB cannot be loaded
+HELSINKI_MODELS = {
+    (ENGLISH, KINYARWANDA): "Helsinki-NLP/opus-mt-en-rw",
+    (KINYARWANDA, ENGLISH): "Helsinki-NLP/opus-mt-rw-en",
+}
+
+# Generation settings per quality/latency tier
+TRANSLATION_TIERS = {
+    "fast": {"num_beams": 1, "max_length": 256},
+    "balanced": {"num_beams": 2, "max_length": 400},
+    "best": {"num_beams": 5, "max_length": 512},
+}
+
+class NLLBTranslator:
+    """One NLLB-200 model and tokenizer serving every language pair.
+    
+    The source language is set on the tokenizer and the target language is
+    forced as the first generated token, so both directions share the weights.
+    """
+    def __init__(self, model_name: str):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        self.model.eval()
+        # tokenizer.src_lang is shared state; set it and tokenize atomically
+        self.tokenizer_lock = threading.Lock()
+    
+    def translate(self, texts: List[str], src_lang: str, tgt_lang: str, **generate_kwargs) -> List[str]:
+        with self.tokenizer_lock:
+            self.tokenizer.src_lang = src_lang
+            inputs = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True)
+        with torch.inference_mode():
+            output = self.model.generate(
+                **inputs,
+                forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(tgt_lang),
+                **generate_kwargs
+            )
+        return self.tokenizer.batch_decode(output, skip_special_tokens=True)
+
+def ct2_model_dir(model_name: str) -> Path:
+    """Where the int8 CTranslate2 conversion of a checkpoint is stored"""
+    return settings.model_cache_path / "ct2" / f"{model_name.replace('/', '--')}-int8"
+
+class CT2Translator:
+    """NLLB-200 converted to CTranslate2 and run with int8 weights on CPU.
+    
+    Uses the HF tokenizer for SentencePiece pieces and language tokens; the
+    target language is given as the decoder prefix instead of forced_bos_token_id.
+    Create the model with scripts/convert_nllb_ct2.py.
+    """
+    def __init__(self, model_name: str):
+        import ctranslate2
+        
+        model_dir = ct2_model_dir(model_name)
+        if not (model_dir / "model.bin").exists():
+            raise FileNotFoundError(f"No CTranslate2 model at {model_dir}; run scripts/convert_nllb_ct2.py")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.translator = ctranslate2.Translator(
+            str(model_dir),
+            device="cpu",
+            compute_type="int8",
+            intra_threads=settings.threads
+        )
+        self.tokenizer_lock = threading.Lock()
+    
+    def translate(self, texts: List[str], src_lang: str, tgt_lang: str, **generate_kwargs) -> List[str]:
+        with self.tokenizer_lock:
+            self.tokenizer.src_lang = src_lang
+            sources = [self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(text)) for text in texts]
+        results = self.translator.translate_batch(
+            sources,
+            target_prefix=[[tgt_lang]] * len(texts),
+            beam_size=generate_kwargs.get("num_beams", 1),
+            max_decoding_length=generate_kwargs.get("max_length", 256)
+        )
+        # Drop the target language token from each hypothesis
+        return [
+            self.tokenizer.decode(self.tokenizer.convert_tokens_to_ids(result.hypotheses[0][1:]), skip_special_tokens=True)
+            for result in results
+        ]
+
+class HelsinkiTranslator:
+    """Helsinki-NLP fallback with the same interface as NLLBTranslator"""
+    def __init__(self):
+        self.pipelines = {pair: pipeline("translation", model=name) for pair, name in HELSINKI_MODELS.items()}
+    
+    def translate(self, texts: List[str], src_lang: str, tgt_lang: str, **generate_kwargs) -> List[str]:
+        results = self.pipelines[(src_lang, tgt_lang)](texts, **generate_kwargs)
+        return [result['translation_text'] for result in results]
+
+def load_translator(model_name: str):
+    """Load NLLB-200 with the configured backend, falling back to PyTorch, then Helsinki-NLP"""
+    if settings.translation_backend == "ctranslate2":
+        try:
+            logger.info(f"Loading int8 CTranslate2 translation model for {model_name}...")
+            return CT2Translator(model_name)
+        except Exception as e:
+            logger.warning(f"CTranslate2 backend unavailable ({e}); using the PyTorch model")
+    
+    try:
+        logger.info(f"Loading NLLB-200 translation model {model_name} (both directions)...")
+        translator = NLLBTranslator(model_name)
+        logger.info("NLLB-200 translation model loaded successfully.")
+        return translator
+    except Exception as e:
+        logger.error(f"Error loading NLLB-200 model: {e}")
+        logger.info("Falling back to Helsinki-NLP models...")
+        return HelsinkiTranslator()
+
+def register_translator(model_name: str) -> str:
+    """Register a translation checkpoint once and return its registry name.
+    
+    Services asking for the same checkpoint share a single model instance.
+    """
+    name = f"translation:{model_name}"
+    if name not in model_registry.loaders:
+        model_registry.register(name, lambda: load_translator(model_name), size_hint_mb=2500)
+    return name
+
 class TranslationService:
+    # Source and target NLLB codes per direction
+    DIRECTIONS = {
+        "en2rw": (ENGLISH, KINYARWANDA),
+        "rw2en": (KINYARWANDA, ENGLISH),
+    }
+    # Source language of each direction, for sentence segmentation
+    SOURCE_LANGUAGES = {"en2rw": "en", "rw2en": "rw"}
+    
     def __init__(self):
-        self.en2rw_translator = None
-        self.rw2en_translator = None
-        
+        # Registry model name per direction; both point at the same NLLB checkpoint by default
+        self.models: Dict[str, str] = {}
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self.memory: Optional[TranslationMemory] = None
+        self.phrasebook: Optional[Phrasebook] = None
+        self.language_id: Optional[LanguageIdentifier] = None
+    
     def initialize_models(self):
-        """Initialize translation models with NLLB-200"""
-        try:
-            logger.info("Loading NLLB-200 translation models for English<->Kinyarwanda...")
-            
-            # Use NLLB-200 for both directions with proper language codes
-            self.en2rw_translator = pipeline(
-                "translation", 
-                model=settings.en2rw_model,
-                src_lang="eng_Latn",
-                tgt_lang="kin_Latn"
-            )
-            self.rw2en_translator = pipeline(
-                "translation", 
-                model=settings.rw2en_model,
-                src_lang="kin_Latn",
-                tgt_lang="eng_Latn"
+        """Register the translation model; it loads on the first request"""
+        self.models = {
+            "en2rw": register_translator(settings.en2rw_model),
+            "rw2en": register_translator(settings.rw2en_model),
+        }
+    
+    def start_batchers(self):
+        """Start one request batcher per direction"""
+        for direction in self.DIRECTIONS:
+            batcher = MicroBatcher(
+                f"translation_{direction}",
+                lambda items, direction=direction: self.translate_batch(direction, items),
+                max_batch_size=settings.translation_max_batch_size,
+                max_wait_ms=settings.translation_batch_wait_ms,
+                queue_size=settings.translation_batch_queue_size
             )
-            logger.info("NLLB-200 translation models loaded successfully.")
-        except Exception as e:
-            logger.error(f"Error loading NLLB-200 models: {e}")
-            logger.info("Falling back to Helsinki-NLP models...")
-            
-            # Fallback to original models
-            self.en2rw_translator = pipeline("translation", model="Helsinki-NLP/opus-mt-en-rw")
-            self.rw2en_translator = pipeline("translation", model="Helsinki-NLP/opus-mt-rw-en")
+            batcher.start()
+            self.batchers[direction] = batcher
     
-    def translate_en_to_rw(self, text: str) -> str:
-        """Translate English text to Kinyarwanda"""
-        if not self.en2rw_translator:
-            raise RuntimeError("English to Kinyarwanda translator not initialized")
-        
+    def translate_batch(self, direction: str, items: List[Tuple[str, str]]) -> List[str]:
+        """Translate (text, tier) items, one generate call per tier and bucket of similar-length texts"""
+        src_lang, tgt_lang = self.DIRECTIONS[direction]
+        results: List[Optional[str]] = [None] * len(items)
+        by_tier: Dict[str, List[int]] = {}
+        for i, (_, tier) in enumerate(items):
+            by_tier.setdefault(tier, []).append(i)
         try:
-            result = self.en2rw_translator(text)
-            return result[0]['translation_text']
+            with model_registry.acquire(self.models[direction]) as translator:
+                for tier, indices in by_tier.items():
+                    texts = [items[i][0] for i in indices]
+                    for bucket in length_buckets([len(text) for text in texts], settings.translation_bucket_size):
+                        outputs = translator.translate([texts[j] for j in bucket], src_lang, tgt_lang,
+                                                       **TRANSLATION_TIERS[tier])
+                        for j, output in zip(bucket, outputs):
+                            results[indices[j]] = output
         except Exception as e:
-            logger.error(f"Translation error (en2rw): {e}")
+            logger.error(f"Translation error ({direction}, batch of {len(items)}): {e}")
             raise
+        return results
     
-    def translate_rw_to_en(self, text: str) -> str:
-        """Translate Kinyarwanda text to English"""
-        if not self.rw2en_translator:
-            raise RuntimeError("Kinyarwanda to English translator not initialized")
+    def resolve_tier(self, direction: str, tier: Optional[str] = None) -> str:
+        """The requested tier, else the default one, dropping to "fast" while the queue is backed up"""
+        if tier:
+            if tier not in TRANSLATION_TIERS:
+                raise ValueError(f"Unknown translation tier '{tier}'; use one of {', '.join(TRANSLATION_TIERS)}")
+            return tier
+        batcher = self.batchers.get(direction)
+        if batcher and batcher.queue.qsize() >= settings.translation_fast_tier_queue_depth:
+            return "fast"
+        return settings.translation_default_tier
+    
+    def detect_direction(self, text: str) -> Optional[str]:
+        """Translation direction implied by the input's language, or None when unsure"""
+        if not self.language_id:
+            return None
+        lang, confidence = self.language_id.detect(text)
+        if lang is None or confidence < settings.language_id_threshold:
+            return None
+        return "en2rw" if lang == "en" else "rw2en"
+    
+    def lookup_phrase(self, direction: str, text: str) -> Optional[str]:
+        """Phrasebook translation of a fixed phrase, or None"""
+        return self.phrasebook.lookup(direction, text) if self.phrasebook else None
+    
+    def submit(self, direction: str, text: str, use_phrasebook: bool = True, tier: Optional[str] = None,
+               wait: Optional[float] = None) -> Future:
+        """Queue a text for batched translation; the future resolves to its translation.
+        
+        Fixed phrases are answered from the phrasebook. Long inputs are split
+        into sentences that are translated in the same padded batches and
+        reassembled in order with the original spacing. Without a tier, one is
+        picked from the current queue depth. With wait, a full queue blocks for
+        up to that many seconds per sentence instead of raising QueueFullError.
+        """
+        if direction not in self.batchers:
+            raise RuntimeError("Translation service not initialized")
+        tier = self.resolve_tier(direction, tier)
+        
+        if use_phrasebook:
+            phrase = self.lookup_phrase(direction, text)
+            if phrase is not None:
+                return completed(phrase)
         
+        segments = split_sentences(text, self.SOURCE_LANGUAGES[direction], settings.translation_max_sentence_chars)
+        if len(segments) <= 1:
+            return self.translate_sentence(direction, text.strip(), tier, wait)
+        
+        futures = []
         try:
-            result = self.rw2en_translator(text)
-            return result[0]['translation_text']
-        except Exception as e:
-            logger.error(f"Translation error (rw2en): {e}")
+            for sentence, _ in segments:
+                futures.append(self.translate_sentence(direction, sentence, tier, wait))
+        except QueueFullError:
+            # The text is rejected as a whole; don't spend model time on its queued sentences
+            for future in futures:
+                future.cancel()
             raise
+        separators = [separator for _, separator in segments]
+        return gather(futures, lambda parts: "".join(
+            part + separator for part, separator in zip(parts, separators)
+        ).strip())
+    
+    def translate_sentence(self, direction: str, sentence: str, tier: str = "balanced",
+                           wait: Optional[float] = None) -> Future:
+        """Serve a sentence from translation memory, else queue it and remember the result"""
+        # Only output from this tier or a better one is reused
+        if self.memory:
+            cached = self.memory.lookup(direction, sentence, tier)
+            if cached is not None:
+                return completed(cached)
+        
+        future = self.batchers[direction].submit((sentence, tier), timeout=wait)
+        if self.memory:
+            def remember(done: Future):
+                if not done.cancelled() and done.exception() is None:
+                    self.memory.store(direction, sentence, done.result(), tier)
+            future.add_done_callback(remember)
+        return future
+    
+    def translate(self, direction: str, text: str, use_phrasebook: bool = True, tier: Optional[str] = None) -> str:
+        """Translate text and wait for the result"""
+        return self.submit(direction, text, use_phrasebook, tier).result()
+    
+    def translate_en_to_rw(self, text: str) -> str:
+        """Translate English text to Kinyarwanda"""
+        return self.translate("en2rw", text)
+    
+    def translate_rw_to_en(self, text: str) -> str:
+        """Translate Kinyarwanda text to English"""
+        return self.translate("rw2en", text)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching metrics per direction"""
+        return {direction: batcher.get_stats() for direction, batcher in self.batchers.items()}
+    
+    def shutdown(self):
+        """Stop the batchers and close the translation memory"""
+        for batcher in self.batchers.values():
+            batcher.stop()
+        if self.memory:
+            self.memory.close()
     
     def initialize(self):
         """Initialize the translation service"""
-        self.initialize_models() 
\ No newline at end of file
+        self.initialize_models()
+        if settings.phrasebook_enabled:
+            self.phrasebook = Phrasebook()
+            self.phrasebook.load()
+        if settings.language_id_enabled:
+            self.language_id = LanguageIdentifier()
+            self.language_id.load()
+        if settings.translation_memory_enabled:
+            self.memory = TranslationMemory()
+            self.memory.load()
+        self.start_batchers()
\ No newline at end of file
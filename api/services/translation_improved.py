@@ -2,18 +2,16 @@ import logging
 import requests
 import time
 from typing import Optional, Dict, Any
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import torch
 
 from config import settings
+from services.model_registry import model_registry
+from services.translation import ENGLISH, KINYARWANDA, register_translator
 
 logger = logging.getLogger(__name__)
 
 class ImprovedTranslationService:
     def __init__(self):
-        self.en2rw_translator = None
-        self.rw2en_translator = None
-        self.fallback_translator = None
+        self.translator_model = None
         self.use_api_fallback = False
         
     def initialize_models(self):
@@ -21,42 +19,9 @@ class ImprovedTranslationService:
         try:
             logger.info("Loading improved translation models...")
             
-            # Primary models (better than Helsinki-NLP)
-            primary_models = {
-                "en2rw": "facebook/nllb-200-distilled-600M",  # Better multilingual model
-                "rw2en": "facebook/nllb-200-distilled-600M"
-            }
-            
-            # Fallback models
-            fallback_models = {
-                "en2rw": "Helsinki-NLP/opus-mt-en-rw",
-                "rw2en": "Helsinki-NLP/opus-mt-rw-en"
-            }
-            
-            # Try to load primary models
-            try:
-                logger.info("Loading primary NLLB models...")
-                self.en2rw_translator = pipeline(
-                    "translation", 
-                    model=primary_models["en2rw"],
-                    src_lang="eng_Latn",
-                    tgt_lang="kin_Latn"
-                )
-                self.rw2en_translator = pipeline(
-                    "translation", 
-                    model=primary_models["rw2en"],
-                    src_lang="kin_Latn", 
-                    tgt_lang="eng_Latn"
-                )
-                logger.info("Primary NLLB models loaded successfully")
-                
-            except Exception as e:
-                logger.warning(f"Failed to load primary models: {e}")
-                logger.info("Falling back to Helsinki-NLP models...")
-                
-                # Fallback to original models
-                self.en2rw_translator = pipeline("translation", model=fallback_models["en2rw"])
-                self.rw2en_translator = pipeline("translation", model=fallback_models["rw2en"])
+            # One NLLB model (better multilingual model) serves both directions and is
+            # shared with TranslationService; Helsinki-NLP models are the fallback
+            self.translator_model = register_translator("facebook/nllb-200-distilled-600M")
             
             # Initialize API fallback if configured
             if hasattr(settings, 'google_translate_api_key') and settings.google_translate_api_key:
@@ -102,13 +67,13 @@ class ImprovedTranslationService:
     
     def translate_en_to_rw(self, text: str) -> str:
         """Translate English text to Kinyarwanda with fallback"""
-        if not self.en2rw_translator:
+        if not self.translator_model:
             raise RuntimeError("English to Kinyarwanda translator not initialized")
         
         try:
             # Try primary translation
-            result = self.en2rw_translator(text)
-            translation = result[0]['translation_text']
+            with model_registry.acquire(self.translator_model) as translator:
+                translation = translator.translate([text], ENGLISH, KINYARWANDA)[0]
             
             # Post-process
             translation = self.post_process_translation(translation, "en2rw")
@@ -133,13 +98,13 @@ class ImprovedTranslationService:
     
     def translate_rw_to_en(self, text: str) -> str:
         """Translate Kinyarwanda text to English with fallback"""
-        if not self.rw2en_translator:
+        if not self.translator_model:
             raise RuntimeError("Kinyarwanda to English translator not initialized")
         
         try:
             # Try primary translation
-            result = self.rw2en_translator(text)
-            translation = result[0]['translation_text']
+            with model_registry.acquire(self.translator_model) as translator:
+                translation = translator.translate([text], KINYARWANDA, ENGLISH)[0]
             
             # Post-process
             translation = self.post_process_translation(translation, "rw2en")
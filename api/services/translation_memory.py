@@ -0,0 +1,299 @@
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Max rows per write transaction
+WRITE_BATCH_SIZE = 256
+# Translation tiers from cheapest to best; an entry serves requests of its own tier or lower
+TIER_RANKS = {"fast": 0, "balanced": 1, "best": 2}
+
+WORD = re.compile(r"[\w']+")
+# Words that change a translation's meaning when they differ by a single token
+NEGATIONS = {
+    "no", "not", "never", "none", "nothing", "nobody", "nowhere", "neither", "nor", "without", "cannot",
+    "ntabwo", "nta", "si", "oya",
+}
+NUMBER_WORDS = {
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven",
+    "twelve", "twenty", "thirty", "forty", "fifty", "hundred", "thousand", "half", "dozen",
+    "first", "second", "third", "noon", "midnight", "am", "pm",
+    "rimwe", "kabiri", "gatatu", "kane", "gatanu", "gatandatu", "karindwi", "umunani", "icyenda",
+    "icumi", "ijana", "igihumbi", "babiri", "batatu", "bane", "abiri", "atatu", "ane", "atanu",
+}
+
+def key_tokens(text: str) -> FrozenSet[str]:
+    """Digits, number and time words, and negations in a normalized text"""
+    return frozenset(
+        word for word in WORD.findall(text)
+        if any(ch.isdigit() for ch in word) or word in NUMBER_WORDS or word in NEGATIONS
+        or word.endswith("n't") or word.startswith("nti")
+    )
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized text, padded so short words still match"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TranslationMemory:
+    """Persistent store of past translations with exact and optional fuzzy lookup.
+
+    Exact hits (after normalizing case and whitespace) come from an in-memory
+    LRU, then from SQLite. With fuzzy lookup enabled, near matches come from a
+    character-trigram index scored with the Dice coefficient. A one-word
+    difference can change the meaning ("8 am" / "9 am", "is safe" / "is not
+    safe"), so a near match is only used when its numbers, times and negations
+    are identical to the query's.
+
+    Each entry records the tier that produced it and only answers requests
+    for that tier or a cheaper one, so greedy "fast" output is never served
+    as "balanced" or "best".
+
+    New translations are visible immediately through the LRU and fuzzy index;
+    a writer thread persists them to SQLite in batched transactions, so the
+    translation batcher never waits on a commit.
+    """
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or settings.persistent_path / "translation_memory.db"
+        self.lru_size = settings.translation_memory_lru_size
+        self.fuzzy_enabled = settings.translation_memory_fuzzy
+        self.fuzzy_threshold = settings.translation_memory_fuzzy_threshold
+        self.fuzzy_max_chars = settings.translation_memory_fuzzy_max_chars
+        self.max_entries = settings.translation_memory_max_entries
+
+        self.lock = threading.Lock()
+        # Guards the SQLite connection; held separately so store() never waits on a commit
+        self.db_lock = threading.Lock()
+        self.conn = None
+        self.writes: queue.Queue = queue.Queue()
+        self.writer = None
+        # (direction, normalized source) -> (translation, tier rank)
+        self.lru: "OrderedDict[Tuple[str, str], Tuple[str, int]]" = OrderedDict()
+
+        # Fuzzy index per direction: trigram -> entry ids;
+        # entry id -> (normalized source, translation, trigram count, tier rank)
+        self.postings: Dict[str, Dict[str, Set[int]]] = {}
+        self.fuzzy_entries: Dict[str, Dict[int, Tuple[str, str, int, int]]] = {}
+        # (direction, normalized source) -> entry id, oldest first
+        self.ids: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self.next_id = 0
+
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def load(self):
+        """Open the database and index the most recently used entries"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS translation_memory (
+                direction TEXT NOT NULL,
+                source_norm TEXT NOT NULL,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                tier_rank INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (direction, source_norm)
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(translation_memory)")}
+        if "tier_rank" not in columns:
+            # Entries written before tiers were recorded count as the cheapest tier
+            self.conn.execute("ALTER TABLE translation_memory ADD COLUMN tier_rank INTEGER NOT NULL DEFAULT 0")
+        self.conn.commit()
+
+        rows = self.conn.execute(
+            "SELECT direction, source_norm, translation, tier_rank FROM translation_memory "
+            "ORDER BY updated_at DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        if self.fuzzy_enabled:
+            with self.lock:
+                for direction, source_norm, translation, rank in reversed(rows):
+                    self._index(direction, source_norm, translation, rank)
+        self.writer = threading.Thread(target=self._write_loop, name="translation-memory-writer", daemon=True)
+        self.writer.start()
+        logger.info(f"Translation memory loaded {len(rows)} entries from {self.db_path}")
+
+    def _write_loop(self):
+        """Persist queued entries, committing everything waiting in one transaction"""
+        while True:
+            rows = [self.writes.get()]
+            while len(rows) < WRITE_BATCH_SIZE:
+                try:
+                    rows.append(self.writes.get_nowait())
+                except queue.Empty:
+                    break
+            entries = [row for row in rows if row is not None]
+            try:
+                if entries:
+                    with self.db_lock:
+                        if self.conn:
+                            # Never overwrite a translation from a better tier
+                            self.conn.executemany(
+                                "INSERT INTO translation_memory "
+                                "(direction, source_norm, source, translation, updated_at, tier_rank) "
+                                "VALUES (?, ?, ?, ?, ?, ?) "
+                                "ON CONFLICT (direction, source_norm) DO UPDATE SET "
+                                "source = excluded.source, translation = excluded.translation, "
+                                "updated_at = excluded.updated_at, tier_rank = excluded.tier_rank "
+                                "WHERE excluded.tier_rank >= translation_memory.tier_rank",
+                                entries
+                            )
+                            self.conn.commit()
+            except Exception as e:
+                logger.error(f"Failed to write {len(entries)} translation memory entries: {e}")
+            finally:
+                for _ in rows:
+                    self.writes.task_done()
+            if len(entries) < len(rows):
+                return
+
+    def _index(self, direction: str, source_norm: str, translation: str, rank: int):
+        key = (direction, source_norm)
+        if key in self.ids:
+            self._unindex(key)
+        grams = trigrams(source_norm)
+        entry_id = self.next_id
+        self.next_id += 1
+        self.ids[key] = entry_id
+        self.fuzzy_entries.setdefault(direction, {})[entry_id] = (source_norm, translation, len(grams), rank)
+        postings = self.postings.setdefault(direction, {})
+        for gram in grams:
+            postings.setdefault(gram, set()).add(entry_id)
+        # Entries beyond the cap stay in SQLite for exact lookups only
+        while len(self.ids) > self.max_entries:
+            self._unindex(next(iter(self.ids)))
+
+    def _unindex(self, key: Tuple[str, str]):
+        direction, source_norm = key
+        entry_id = self.ids.pop(key)
+        self.fuzzy_entries[direction].pop(entry_id)
+        postings = self.postings[direction]
+        for gram in trigrams(source_norm):
+            ids = postings.get(gram)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del postings[gram]
+
+    def _remember(self, key: Tuple[str, str], translation: str, rank: int):
+        self.lru[key] = (translation, rank)
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
+    def _fuzzy_match(self, direction: str, source_norm: str, min_rank: int) -> Optional[Tuple[float, str]]:
+        grams = trigrams(source_norm)
+        counts: Dict[int, int] = {}
+        for gram in grams:
+            for entry_id in self.postings.get(direction, {}).get(gram, ()):
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+
+        best = None
+        required = key_tokens(source_norm)
+        entries = self.fuzzy_entries.get(direction, {})
+        for entry_id, shared in counts.items():
+            candidate, translation, candidate_grams, rank = entries[entry_id]
+            score = 2 * shared / (len(grams) + candidate_grams)
+            if score >= self.fuzzy_threshold and (best is None or score > best[0]) \
+                    and rank >= min_rank and key_tokens(candidate) == required:
+                best = (score, translation)
+        return best
+
+    def lookup(self, direction: str, text: str, tier: str = "balanced") -> Optional[str]:
+        """Return a stored translation for text from the given tier or a better one, or None"""
+        source_norm = self.normalize(text)
+        key = (direction, source_norm)
+        min_rank = TIER_RANKS[tier]
+        with self.lock:
+            cached = self.lru.get(key)
+            if cached is not None and cached[1] >= min_rank:
+                self.lru.move_to_end(key)
+                self.exact_hits += 1
+                return cached[0]
+
+        row = None
+        with self.db_lock:
+            if self.conn:
+                row = self.conn.execute(
+                    "SELECT translation, tier_rank FROM translation_memory "
+                    "WHERE direction = ? AND source_norm = ? AND tier_rank >= ?", (*key, min_rank)
+                ).fetchone()
+
+        with self.lock:
+            if row:
+                self._remember(key, row[0], row[1])
+                self.exact_hits += 1
+                return row[0]
+
+            # Repeated traffic is short phrases; skip the scan for long texts
+            match = None
+            if self.fuzzy_enabled and len(source_norm) <= self.fuzzy_max_chars:
+                match = self._fuzzy_match(direction, source_norm, min_rank)
+            if match:
+                self.fuzzy_hits += 1
+                logger.info(f"Translation memory fuzzy hit ({match[0]:.2f}) for: {text[:50]}")
+                return match[1]
+
+            self.misses += 1
+            return None
+
+    def store(self, direction: str, text: str, translation: str, tier: str = "balanced"):
+        """Record a model translation produced by the given tier"""
+        source_norm = self.normalize(text)
+        if not source_norm or not translation:
+            return
+        key = (direction, source_norm)
+        rank = TIER_RANKS[tier]
+        with self.lock:
+            cached = self.lru.get(key)
+            if cached is not None and cached[1] > rank:
+                return
+            self._remember(key, translation, rank)
+            if self.fuzzy_enabled:
+                self._index(direction, source_norm, translation, rank)
+        if self.writer:
+            self.writes.put((direction, source_norm, text, translation, time.time(), rank))
+
+    def flush(self):
+        """Wait until every stored entry has been written to the database"""
+        if self.writer:
+            self.writes.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics"""
+        with self.lock:
+            lookups = self.exact_hits + self.fuzzy_hits + self.misses
+            return {
+                "indexed_entries": len(self.ids),
+                "lru_entries": len(self.lru),
+                "exact_hits": self.exact_hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.fuzzy_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    def close(self):
+        if self.writer:
+            # The sentinel is queued after pending entries, so they are written first
+            self.writes.put(None)
+            self.writer.join(timeout=5)
+            self.writer = None
+        with self.db_lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
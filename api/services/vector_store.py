@@ -1,20 +1,60 @@
 import os
+import json
+import uuid
 import logging
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain.embeddings.base import Embeddings
 from langchain.schema import Document
 
 from config import settings
-from utils.helpers import load_data, deduplicate_data, fix_chromadb_schema
+from services.bm25 import BM25Index
+from services.embedding_cache import EmbeddingCache
+from services.hybrid_retriever import HybridRetriever
+from services.model_registry import model_registry
+from services.numpy_store import NumpyVectorStore
+from services.onnx_embeddings import OnnxEmbeddings, onnx_model_dir
+from utils.helpers import load_data, deduplicate_data, fix_chromadb_schema, qa_content_id
 
 logger = logging.getLogger(__name__)
 
+class RegistryEmbeddings(Embeddings):
+    """Embeddings that borrow the model from the registry on every call.
+
+    Chroma and the caches keep a reference to this proxy, not to the model, so
+    the registry can evict the model while it is idle.
+    """
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with model_registry.acquire(self.model_name) as embeddings:
+            return embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        with model_registry.acquire(self.model_name) as embeddings:
+            return embeddings.embed_query(text)
+
 class VectorStoreService:
+    EMBEDDING_MODEL = "embedding"
+    
     def __init__(self):
         self.embeddings = None
+        # Identifies the vectors a model produces; the ONNX export gets its own id
+        self.embedding_model_id = settings.embedding_model
+        self.embedding_cache: Optional[EmbeddingCache] = None
         self.vector_store = None
+        # Keyword index over the same QA documents, for hybrid retrieval
+        self.bm25: Optional[BM25Index] = None
+        self.bm25_documents: List[Document] = []
+        # Changes whenever the index is rebuilt; caches built on top of it compare against this
+        self.index_id = None
+        # Normalized embeddings of every corpus question, for direct answers
+        self.question_vectors = None
+        self.question_items = []
         
     def ensure_embedding_model(self):
         """Ensure embedding model exists in persistent storage"""
@@ -31,58 +71,111 @@ class VectorStoreService:
             logger.error(f"Error with embedding model: {e}")
             raise
     
+    def onnx_model_available(self) -> bool:
+        """Whether the ONNX backend is configured and usable"""
+        if settings.embedding_backend != "onnx":
+            return False
+        model_dir = onnx_model_dir(settings.embedding_model, settings.embedding_onnx_int8)
+        if not (model_dir / "model.onnx").exists():
+            logger.warning(f"No ONNX embedding model at {model_dir} (run scripts/export_embedding_onnx.py); using PyTorch")
+            return False
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            logger.warning("onnxruntime is not installed; using the PyTorch embedding model")
+            return False
+        return True
+    
     def load_embeddings(self):
-        """Load embedding model"""
-        embedding_model_path = settings.model_cache_path / "embedding_model"
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=str(embedding_model_path),
-            model_kwargs={"device": "cuda" if os.getenv("USE_GPU", "false").lower() == "true" else "cpu"}
-        )
+        """Register the embedding model; it loads on first use"""
+        if self.onnx_model_available():
+            model_dir = onnx_model_dir(settings.embedding_model, settings.embedding_onnx_int8)
+            self.embedding_model_id = f"{settings.embedding_model}#onnx{'-int8' if settings.embedding_onnx_int8 else ''}"
+            loader = lambda: OnnxEmbeddings(model_dir)
+            logger.info(f"Using ONNX embedding model from {model_dir}")
+        else:
+            embedding_model_path = settings.model_cache_path / "embedding_model"
+            self.embedding_model_id = settings.embedding_model
+            loader = lambda: HuggingFaceEmbeddings(
+                model_name=str(embedding_model_path),
+                model_kwargs={"device": "cuda" if os.getenv("USE_GPU", "false").lower() == "true" else "cpu"}
+            )
+        model_registry.register(self.EMBEDDING_MODEL, loader, size_hint_mb=100)
+        self.embeddings = RegistryEmbeddings(self.EMBEDDING_MODEL)
+        if settings.embedding_cache_enabled:
+            # Everything embeds through the cache: index builds, the question index and queries
+            self.embedding_cache = EmbeddingCache(self.embeddings, self.embedding_model_id)
+            self.embedding_cache.load()
+            self.embeddings = self.embedding_cache
+    
+    def load_corpus(self) -> List[Dict[str, Any]]:
+        """Load and deduplicate the QA pairs with their source"""
+        sources = [
+            ("tripadvisor", "data/tripadvisor_forum.json"),
+            ("gov_faq", "data/tourism_faq_gov.json"),
+            ("blog", "data/local_blog_etiquette.json"),
+        ]
+        combined_data = []
+        for source, path in sources:
+            for item in load_data(path):
+                combined_data.append(dict(item, source=source))
+        return deduplicate_data(combined_data)
+    
+    @staticmethod
+    def make_document(item: Dict[str, Any]) -> Document:
+        doc_text = f"QUESTION: {item['question']}\nANSWER: {item['answer']}"
+        metadata = {"source": item["source"], "original_question": item['question']}
+        return Document(page_content=doc_text, metadata=metadata)
     
     def create_vector_store(self):
         """Create a new vector store from source data using Document objects"""
         try:
-            # Load source data
-            tripadvisor_data = load_data("data/tripadvisor_forum.json")
-            faq_data = load_data("data/tourism_faq_gov.json")
-            blog_data = load_data("data/local_blog_etiquette.json")
+            # Load source data, keyed by content hash
+            corpus = {qa_content_id(item): item for item in self.load_corpus()}
+            ids = list(corpus)
+            documents = [self.make_document(item) for item in corpus.values()]
             
-            # Combine and deduplicate data
-            combined_data = deduplicate_data(tripadvisor_data + faq_data + blog_data)
-
-            # Create documents
-            documents = []
-            for idx, item in enumerate(combined_data):
-                doc_text = f"QUESTION: {item['question']}\nANSWER: {item['answer']}"
-                
-                # Determine source
-                if idx < len(tripadvisor_data):
-                    source = "tripadvisor"
-                elif idx < len(tripadvisor_data) + len(faq_data):
-                    source = "gov_faq"
-                else:
-                    source = "blog"
-                
-                metadata = {"source": source, "original_question": item['question']}
-                documents.append(Document(page_content=doc_text, metadata=metadata))
-            
-            # Create new vector store
-            logger.info("Creating new vector database...")
-            self.vector_store = Chroma.from_documents(
-                documents=documents,
-                embedding=self.embeddings,
-                persist_directory=str(settings.vector_db_path_obj),
-                collection_name="kigali_tourism",
-                collection_metadata={"hnsw:space": "cosine"}
-            )
-            self.vector_store.persist()
+            if settings.vector_store_backend == "numpy":
+                logger.info(f"Creating new NumPy vector store ({settings.vector_store_dtype})...")
+                self.vector_store = NumpyVectorStore.from_documents(
+                    documents=documents,
+                    embedding=self.embeddings,
+                    ids=ids,
+                    path=self.numpy_store_path,
+                    dtype=settings.vector_store_dtype
+                )
+            else:
+                # Create new vector store
+                logger.info("Creating new vector database...")
+                self.vector_store = Chroma.from_documents(
+                    documents=documents,
+                    embedding=self.embeddings,
+                    ids=ids,
+                    persist_directory=str(settings.vector_db_path_obj),
+                    collection_name="kigali_tourism",
+                    collection_metadata={"hnsw:space": "cosine"}
+                )
+            self.persist_vector_store()
+            self.write_manifest(ids)
+            self.write_index_id()
             return self.vector_store
         except Exception as e:
             logger.error(f"Error creating vector store: {e}")
             raise
     
+    @property
+    def numpy_store_path(self):
+        return settings.vector_db_path_obj / "numpy"
+    
     def load_existing_vector_store(self):
         """Load existing vector store"""
+        if settings.vector_store_backend == "numpy":
+            self.vector_store = NumpyVectorStore.load(self.embeddings, self.numpy_store_path)
+            if self.vector_store is None:
+                return False
+            self.read_index_id()
+            return True
+        
         db_file = settings.vector_db_path_obj / "chroma.sqlite3"
         
         if os.path.exists(db_file):
@@ -95,14 +188,144 @@ class VectorStoreService:
                 embedding_function=self.embeddings,
                 collection_name="kigali_tourism"
             )
+            self.read_index_id()
             return True
         return False
     
+    def persist_vector_store(self):
+        if isinstance(self.vector_store, NumpyVectorStore):
+            self.vector_store.save()
+        else:
+            self.vector_store.persist()
+    
+    @property
+    def manifest_path(self):
+        return settings.vector_db_path_obj / f"manifest.{settings.vector_store_backend}.json"
+    
+    def write_manifest(self, ids: List[str]):
+        """Record which QA pairs (by content hash) the index holds, and with which model"""
+        with open(self.manifest_path, "w") as f:
+            json.dump({"embedding_model": self.embedding_model_id, "ids": ids}, f)
+    
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable vector store manifest ({e})")
+            return None
+    
+    def sync_vector_store(self):
+        """Bring a loaded index up to date with the corpus, embedding only added or changed pairs"""
+        manifest = self.read_manifest()
+        corpus = {qa_content_id(item): item for item in self.load_corpus()}
+        if manifest is None or manifest.get("embedding_model") != self.embedding_model_id:
+            # Indexes built before content hashes (or with another model) cannot be diffed
+            logger.info("Vector store has no content manifest for this embedding model; rebuilding...")
+            if not isinstance(self.vector_store, NumpyVectorStore):
+                self.vector_store.delete_collection()
+            self.create_vector_store()
+            return
+        
+        stored = set(manifest["ids"])
+        added = [content_id for content_id in corpus if content_id not in stored]
+        removed = [content_id for content_id in manifest["ids"] if content_id not in corpus]
+        if not added and not removed:
+            logger.info(f"Vector store is up to date ({len(corpus)} QA pairs)")
+            return
+        
+        # A changed pair has a new hash, so it is deleted and re-added
+        if removed:
+            self.vector_store.delete(ids=removed)
+        if added:
+            self.vector_store.add_documents([self.make_document(corpus[content_id]) for content_id in added], ids=added)
+        self.persist_vector_store()
+        self.write_manifest(list(corpus))
+        self.write_index_id()
+        logger.info(f"Vector store updated: {len(added)} added, {len(removed)} removed")
+    
+    def write_index_id(self):
+        """Assign a fresh id to a newly built index"""
+        self.index_id = uuid.uuid4().hex
+        with open(settings.vector_db_path_obj / "index_id", "w") as f:
+            f.write(self.index_id)
+    
+    def read_index_id(self):
+        """Load the id of an existing index, assigning one if it predates ids"""
+        id_file = settings.vector_db_path_obj / "index_id"
+        if os.path.exists(id_file):
+            with open(id_file, "r") as f:
+                self.index_id = f.read().strip()
+        else:
+            self.write_index_id()
+    
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embed a query, L2-normalized so dot products are cosine similarities"""
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def build_question_index(self):
+        """Embed every corpus question for question-to-question matching"""
+        self.question_items = self.load_corpus()
+        if not self.question_items:
+            self.question_vectors = None
+            return
+        
+        vectors = np.asarray(
+            self.embeddings.embed_documents([item["question"] for item in self.question_items]),
+            dtype=np.float32
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.question_vectors = vectors / norms
+        logger.info(f"Question index built with {len(self.question_items)} entries")
+    
+    def match_question(self, query_vector: np.ndarray) -> Tuple[float, Optional[Dict[str, Any]]]:
+        """Return the most similar corpus QA pair and its cosine similarity"""
+        if self.question_vectors is None:
+            return 0.0, None
+        
+        scores = self.question_vectors @ query_vector
+        best = int(np.argmax(scores))
+        return float(scores[best]), self.question_items[best]
+    
+    def load_bm25_index(self):
+        """Load the BM25 postings saved with the index, rebuilding them if the corpus changed"""
+        corpus = {qa_content_id(item): item for item in self.load_corpus()}
+        ids = list(corpus)
+        self.bm25_documents = [self.make_document(item) for item in corpus.values()]
+        
+        bm25_path = settings.vector_db_path_obj / "bm25.npz"
+        self.bm25 = BM25Index.load(bm25_path)
+        if self.bm25 is None or self.bm25.ids != ids or (self.bm25.k1, self.bm25.b) != (settings.bm25_k1, settings.bm25_b):
+            logger.info("Building BM25 index...")
+            self.bm25 = BM25Index(settings.bm25_k1, settings.bm25_b)
+            self.bm25.build(ids, [doc.page_content for doc in self.bm25_documents])
+            self.bm25.save(bm25_path)
+        logger.info(f"BM25 index ready with {len(self.bm25)} documents and {len(self.bm25.vocabulary)} terms")
+    
     def get_retriever(self):
         """Get configured retriever"""
         if not self.vector_store:
             raise RuntimeError("Vector store not initialized")
         
+        if settings.retrieval_mode == "hybrid" and self.bm25:
+            return HybridRetriever(
+                vector_store=self.vector_store,
+                bm25=self.bm25,
+                documents=self.bm25_documents,
+                k=settings.search_k,
+                fetch_k=settings.hybrid_fetch_k,
+                fusion=settings.hybrid_fusion,
+                dense_weight=settings.hybrid_dense_weight,
+                sparse_weight=settings.hybrid_sparse_weight,
+                rrf_k=settings.hybrid_rrf_k,
+                search_type=settings.search_type
+            )
+        
         return self.vector_store.as_retriever(
             search_type=settings.search_type,
             search_kwargs={"k": settings.search_k}
@@ -113,13 +336,22 @@ class VectorStoreService:
         # Ensure embedding model exists
         self.ensure_embedding_model()
         
-        # Load embedding model
-        logger.info("Loading embedding model...")
+        # Register embedding model
+        logger.info("Registering embedding model...")
         self.load_embeddings()
         
-        # Try to load existing vector store, create new one if needed
-        if not self.load_existing_vector_store():
+        # Load the existing vector store and apply corpus changes, or create a new one
+        if self.load_existing_vector_store():
+            self.sync_vector_store()
+        else:
             logger.info("Creating new vector database...")
             self.create_vector_store()
         
+        if settings.retrieval_mode == "hybrid":
+            self.load_bm25_index()
+        
+        # Question index for the direct-answer fast path
+        if settings.direct_answer_enabled:
+            self.build_question_index()
+        
         logger.info("Vector store service initialized successfully") 
\ No newline at end of file
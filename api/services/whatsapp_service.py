@@ -3,15 +3,18 @@ import time
 from typing import Dict, Optional, Any
 
 from config import settings
+from services.inference_executor import QueueFullError
 
 logger = logging.getLogger(__name__)
 
 class WhatsAppService:
-    def __init__(self, rag_service=None, translation_service=None, maps_service=None, weather_service=None):
+    def __init__(self, rag_service=None, translation_service=None, maps_service=None, weather_service=None,
+                 inference_executor=None):
         self.rag_service = rag_service
         self.translation_service = translation_service
         self.maps_service = maps_service
         self.weather_service = weather_service
+        self.inference_executor = inference_executor
         
         self.twilio_account_sid = settings.twilio_account_sid
         self.twilio_auth_token = settings.twilio_auth_token
@@ -159,6 +162,12 @@ Please type your question:
 • Type *menu* to go back to main menu
 • Type *quit* to reset and start over"""
     
+    def run_model(self, pool: str, fn, *args):
+        """Run a model call through the shared inference pool when one is configured"""
+        if not self.inference_executor:
+            return fn(*args)
+        return self.inference_executor.submit(pool, fn, *args).result()
+    
     def process_qa_query(self, query: str) -> str:
         """Process a Q&A query using local RAG service"""
         if not self.rag_service:
@@ -166,13 +175,15 @@ Please type your question:
         
         try:
             start_time = time.time()
-            response = self.rag_service.query(query)
+            response = self.run_model("llm", self.rag_service.query, query)
             process_time = time.time() - start_time
             
             # Format for WhatsApp
             formatted_response = f"🤖 *Answer:*\n{response}"
             
             return formatted_response
+        except QueueFullError:
+            return "⏳ I'm answering a lot of questions right now. Please try again in a few seconds."
         except Exception as e:
             logger.error(f"Q&A processing error: {e}")
             return "❌ Sorry, I couldn't process your question. Please try again."
@@ -186,15 +197,26 @@ Please type your question:
             return "❌ Please provide text to translate."
         
         try:
-            if direction == "en2rw":
-                translation = self.translation_service.translate_en_to_rw(text)
-            else:
-                translation = self.translation_service.translate_rw_to_en(text)
+            # Fixed phrases are answered inline, without queueing for the model
+            translation = self.translation_service.lookup_phrase(direction, text)
+            note = ""
+            if translation is None:
+                # Users often pick the wrong menu entry. Place names can fool the detector, so keep the
+                # chosen direction, as the HTTP endpoints do, and point out the other menu option
+                detected = self.translation_service.detect_direction(text)
+                if detected and detected != direction:
+                    option = "a) English to Kinyarwanda" if detected == "en2rw" else "b) Kinyarwanda to English"
+                    note = ("\n\n_ℹ️ Your text looks like " + ("English" if detected == "en2rw" else "Kinyarwanda")
+                            + ". If so, type *menu*, choose 2️⃣ Translation and then " + option + "._")
+                # Chat users want a quick reply; greedy decoding is a fraction of the beam-search cost
+                translation = self.translation_service.translate(direction, text, False, "fast")
             
             source_lang = "English" if direction == "en2rw" else "Kinyarwanda"
             target_lang = "Kinyarwanda" if direction == "en2rw" else "English"
             
-            return f"🔄 *Translation ({source_lang} → {target_lang}):*\n\n*Original:* {text}\n*Translation:* {translation}"
+            return f"🔄 *Translation ({source_lang} → {target_lang}):*\n\n*Original:* {text}\n*Translation:* {translation}{note}"
+        except QueueFullError:
+            return "⏳ Translation is busy right now. Please try again in a few seconds."
         except Exception as e:
             logger.error(f"Translation processing error: {e}")
             return "❌ Translation failed. Please try again."
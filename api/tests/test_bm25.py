@@ -0,0 +1,94 @@
+import pytest
+from langchain.schema import Document
+
+from services.bm25 import BM25Index, tokenize
+from services.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion, weighted_fusion
+from services.numpy_store import NumpyVectorStore
+
+TEXTS = [
+    "QUESTION: Where is Kimironko market?\nANSWER: Kimironko market is in Gasabo district.",
+    "QUESTION: Is Nyamirambo worth a visit?\nANSWER: Nyamirambo has great food and a walking tour.",
+    "QUESTION: Where are the embassies?\nANSWER: Most embassies are in Kacyiru.",
+    "QUESTION: Where can I buy souvenirs?\nANSWER: Craft shops sell baskets and souvenirs across the city.",
+]
+
+class VowelEmbeddings:
+    """Vowel counts: deliberately blind to place names"""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(text.lower().count(vowel)) + 0.1 for vowel in "aeiou"]
+
+class TestBM25Index:
+    """Keyword scoring over compact postings"""
+
+    @pytest.fixture
+    def index(self):
+        index = BM25Index()
+        index.build([f"doc-{i}" for i in range(len(TEXTS))], TEXTS)
+        return index
+
+    def test_tokenize_drops_stopwords(self):
+        assert tokenize("Where is Kimironko market?") == ["kimironko", "market"]
+
+    def test_rare_names_rank_first(self, index):
+        assert index.search("kimironko", 2)[0][0] == 0
+        assert index.search("Which area has the embassies, Kacyiru?", 1)[0][0] == 2
+        assert index.search("zzz unknown", 3) == []
+
+    def test_postings_are_flat_arrays(self, index):
+        term = index.vocabulary["kimironko"]
+        start, end = index.offsets[term], index.offsets[term + 1]
+        assert index.doc_ids[start:end].tolist() == [0]
+        assert index.term_freqs[start:end].tolist() == [2]
+
+    def test_save_and_load(self, index, tmp_path):
+        index.save(tmp_path / "bm25.npz")
+        loaded = BM25Index.load(tmp_path / "bm25.npz")
+        assert loaded.ids == index.ids
+        assert loaded.scores("nyamirambo food").tolist() == index.scores("nyamirambo food").tolist()
+        assert BM25Index.load(tmp_path / "missing.npz") is None
+
+class TestFusion:
+    """Combining dense and sparse rankings"""
+
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], [1.0, 1.0], k=60)
+        assert max(fused, key=fused.get) == "b"
+        assert fused["a"] == pytest.approx(1 / 61)
+
+    def test_weighted_fusion_normalizes_scales(self):
+        fused = weighted_fusion([{"a": 0.9, "b": 0.45}, {"b": 12.0, "c": 6.0}], [1.0, 0.5])
+        assert fused == pytest.approx({"a": 1.0, "b": 1.0, "c": 0.25})
+
+    @pytest.mark.parametrize("fusion", ["rrf", "weighted"])
+    def test_hybrid_retriever_finds_place_names(self, fusion):
+        store = NumpyVectorStore.from_texts(TEXTS, VowelEmbeddings())
+        index = BM25Index()
+        index.build([str(i) for i in range(len(TEXTS))], TEXTS)
+        retriever = HybridRetriever(vector_store=store, bm25=index,
+                                    documents=[Document(page_content=text) for text in TEXTS],
+                                    k=1, fetch_k=4, fusion=fusion, sparse_weight=2.0)
+        assert retriever.invoke("Kacyiru")[0].page_content == TEXTS[2]
+
+    def test_mmr_skips_near_duplicate_results(self):
+        texts = TEXTS + ["QUESTION: Where is Kimironko market exactly?\nANSWER: Kimironko market is in Gasabo district."]
+        store = NumpyVectorStore.from_texts(texts, VowelEmbeddings())
+        index = BM25Index()
+        index.build([str(i) for i in range(len(texts))], texts)
+        documents = [Document(page_content=text) for text in texts]
+
+        def top_two(search_type):
+            retriever = HybridRetriever(vector_store=store, bm25=index, documents=documents, k=2, fetch_k=5,
+                                        sparse_weight=2.0, search_type=search_type)
+            return [doc.page_content for doc in retriever.invoke("Kimironko market")]
+
+        duplicates = {texts[0], texts[4]}
+        assert set(top_two("similarity")) == duplicates
+        first, second = top_two("mmr")
+        assert first in duplicates and second not in duplicates
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services.context_assembler import ContextAssembler, estimate_tokens
+
+def doc(question, answer):
+    return SimpleNamespace(page_content=f"QUESTION: {question}\nANSWER: {answer}", metadata={})
+
+class TestContextAssembler:
+    """Compact, deduplicated, budgeted prompt context"""
+
+    def test_compact_format(self):
+        assembler = ContextAssembler(token_budget=200, dedup_threshold=0.8)
+        context = assembler.assemble([doc("Is Kigali safe?", "Yes, very safe.")])
+        assert context == "Q: Is Kigali safe?\nA: Yes, very safe."
+        assert "page_content" not in context
+
+    def test_overlapping_passages_are_deduplicated(self):
+        assembler = ContextAssembler(token_budget=200, dedup_threshold=0.8)
+        context = assembler.assemble([
+            doc("Is Kigali safe?", "Yes, Kigali is very safe for tourists."),
+            doc("Is Kigali safe for tourists?", "Yes, Kigali is very safe for tourists."),
+            doc("Best time to visit?", "June to September is the dry season."),
+        ])
+        assert context.count("Q:") == 2
+        assert "dry season" in context
+
+    def test_token_budget_truncates(self):
+        long_answer = " ".join(["word"] * 400)
+        assembler = ContextAssembler(token_budget=100, dedup_threshold=0.8)
+        context = assembler.assemble([doc("Short question here?", long_answer), doc("Other?", "Other answer text.")])
+        assert estimate_tokens(context) <= 100
+        assert context.endswith("...")
+        assert "Other answer" not in context
+
+    def test_plain_documents_pass_through(self):
+        assembler = ContextAssembler(token_budget=200, dedup_threshold=0.8)
+        plain = SimpleNamespace(page_content="  Gorilla permits cost $1500.  ", metadata={})
+        assert assembler.assemble([plain]) == "Gorilla permits cost $1500."
+
+if __name__ == "__main__":
+    pytest.main([__file__])
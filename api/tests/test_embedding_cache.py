@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from services.embedding_cache import EmbeddingCache
+
+class CountingEmbeddings:
+    """Two-dimensional embeddings that count the texts they encode"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def embed_documents(self, texts):
+        self.encoded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+class TestEmbeddingCache:
+    """Persistent embeddings keyed by model and text hash"""
+
+    @pytest.fixture
+    def model(self):
+        return CountingEmbeddings()
+
+    @pytest.fixture
+    def cache(self, model, tmp_path):
+        cache = EmbeddingCache(model, "minilm", db_path=tmp_path / "embeddings.db", max_mb=1)
+        cache.load()
+        yield cache
+        cache.close()
+
+    def test_repeat_texts_are_not_reencoded(self, cache, model):
+        assert cache.embed_documents(["Kigali", "Musanze", "Kigali"]) == [[6.0, 1.0], [7.0, 1.0], [6.0, 1.0]]
+        assert model.encoded == ["Kigali", "Musanze"]
+
+        assert cache.embed_query("Musanze") == [7.0, 1.0]
+        assert cache.embed_documents(["Kigali", "Huye"]) == [[6.0, 1.0], [4.0, 1.0]]
+        assert model.encoded == ["Kigali", "Musanze", "Huye"]
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 3 and stats["misses"] == 3
+        assert stats["hit_rate"] == 0.5
+
+    def test_cache_persists_and_is_per_model(self, cache, model, tmp_path):
+        cache.embed_documents(["Kigali"])
+        cache.close()
+
+        reopened = EmbeddingCache(model, "minilm", db_path=tmp_path / "embeddings.db")
+        reopened.load()
+        reopened.embed_query("Kigali")
+        assert model.encoded == ["Kigali"]
+
+        other_model = EmbeddingCache(model, "minilm-int8", db_path=tmp_path / "embeddings.db")
+        other_model.load()
+        other_model.embed_query("Kigali")
+        assert model.encoded == ["Kigali", "Kigali"]
+        reopened.close()
+        other_model.close()
+
+    def test_size_cap_evicts_least_recently_used(self, cache, model):
+        # Each vector is 8 bytes; allow room for ten
+        cache.max_bytes = 80
+        cache.embed_documents([f"text {i}" for i in range(10)])
+        cache.embed_query("text 0")
+        cache.embed_documents(["text 10", "text 11"])
+
+        stats = cache.get_stats()
+        assert stats["evictions"] >= 2
+        assert cache.total_bytes <= 80
+        model.encoded.clear()
+        cache.embed_query("text 0")
+        assert model.encoded == []
+        cache.embed_query("text 1")
+        assert model.encoded == ["text 1"]
+
+    def test_hits_do_not_write_until_flushed(self, cache, model):
+        cache.embed_documents(["Kigali", "Musanze"])
+        stored = dict(cache.conn.execute("SELECT text_hash, last_used FROM embedding_cache"))
+
+        time.sleep(0.01)
+        cache.embed_query("Kigali")
+        assert dict(cache.conn.execute("SELECT text_hash, last_used FROM embedding_cache")) == stored
+        assert len(cache.touched) == 1
+
+        cache._flush_last_used()
+        refreshed = dict(cache.conn.execute("SELECT text_hash, last_used FROM embedding_cache"))
+        assert sum(refreshed[key] > stored[key] for key in stored) == 1
+        assert cache.touched == {}
+
+if __name__ == "__main__":
+    pytest.main([__file__])
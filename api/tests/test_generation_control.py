@@ -0,0 +1,94 @@
+import pytest
+
+from services import rag_service
+from services.generation_control import GenerationBudget, complete_with_budget, stream_tokens, stream_with_budget
+from services.model_registry import ModelRegistry
+
+def tokens(text, size=3):
+    """Split text into fixed-size pieces, like a token stream"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+class FakeCTransformers:
+    """LangChain's CTransformers: stream() yields the finished completion in one chunk"""
+    _llm_type = "ctransformers"
+
+    def __init__(self, text):
+        self.text = text
+        self.decoded = []
+
+    def client(self, prompt, stop=None, stream=False):
+        for piece in tokens(self.text):
+            self.decoded.append(piece)
+            yield piece
+
+    def stream(self, prompt, stop=None):
+        yield "".join(self.client(prompt, stop=stop, stream=True))
+
+class TestGenerationControl:
+    """Stop sequences and sentence budgets over streamed text"""
+
+    def test_stop_sequence_truncates(self):
+        text = "Kigali is safe.</s><|user|>What else?"
+        assert complete_with_budget(tokens(text), stop=["</s>", "<|user|>"]) == "Kigali is safe."
+
+    def test_partial_stop_sequence_is_never_emitted(self):
+        pieces = list(stream_with_budget(["Visit in June <", "|us", "er|> next"], stop=["<|user|>"]))
+        assert "".join(pieces) == "Visit in June "
+        assert all("<" not in p for p in pieces)
+
+    def test_held_back_text_is_flushed_at_end(self):
+        assert complete_with_budget(["Price is 5 <", "3 dollars"], stop=["<|user|>"]) == "Price is 5 <3 dollars"
+
+    def test_sentence_budget(self):
+        text = "Kigali is clean. It costs 3.5 dollars. Buses are cheap. Taxis too. "
+        assert complete_with_budget(tokens(text), max_sentences=2) == "Kigali is clean. It costs 3.5 dollars."
+
+    def test_decoding_stops_early(self):
+        consumed = []
+
+        def source():
+            for piece in tokens("One. Two. Three. Four. Five. "):
+                consumed.append(piece)
+                yield piece
+
+        assert complete_with_budget(source(), max_sentences=1) == "One."
+        assert len(consumed) < len(tokens("One. Two. Three. Four. Five. "))
+
+    def test_non_positive_budget_is_unlimited(self):
+        assert complete_with_budget(tokens("One. Two. "), max_sentences=-1) == "One. Two."
+
+    def test_no_limits_passes_through(self):
+        budget = GenerationBudget()
+        assert budget.feed("Hello ") == "Hello "
+        assert budget.feed("world") == "world"
+        assert budget.finish() == ""
+        assert budget.text == "Hello world"
+
+class TestTokenStreaming:
+    """Generation streams token by token instead of one finished chunk"""
+
+    def test_ctransformers_client_is_streamed(self):
+        llm = FakeCTransformers("Kigali is clean. Buses are cheap. ")
+        assert len(list(stream_tokens(llm, "prompt"))) > 1
+
+    def test_generation_streams_tokens_and_stops_decoding(self, monkeypatch):
+        text = "Kigali is clean. Buses are cheap. Taxis too. Moto taxis are fast. "
+        llm = FakeCTransformers(text)
+        registry = ModelRegistry(budget_mb=100)
+        registry.register(rag_service.RAGService.LLM_MODEL, lambda: llm)
+        monkeypatch.setattr(rag_service, "model_registry", registry)
+
+        service = rag_service.RAGService(vector_store_service=None)
+        service.context_assembler = type("Assembler", (), {"count_tokens": staticmethod(len)})()
+        pieces = list(service.stream_prompt("prompt", {"stop": ["</s>"], "max_sentences": 1}))
+
+        assert len(pieces) > 1
+        assert "".join(pieces) == "Kigali is clean."
+        assert len(llm.decoded) < len(tokens(text))
+
+        llm.decoded.clear()
+        assert service.complete("prompt", {"stop": ["</s>"], "max_sentences": 2}) == "Kigali is clean. Buses are cheap."
+        assert len(llm.decoded) < len(tokens(text))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.inference_executor import InferenceExecutor, QueueFullError
+
+class TestInferenceExecutor:
+    """Bounded model pools and backpressure"""
+
+    def test_run_returns_result(self):
+        executor = InferenceExecutor()
+        executor.register_pool("llm", workers=1, queue_size=1)
+        try:
+            result = asyncio.run(executor.run("llm", lambda x: x * 2, 21))
+            assert result == 42
+        finally:
+            executor.shutdown()
+
+    def test_rejects_when_queue_full(self):
+        executor = InferenceExecutor()
+        executor.register_pool("llm", workers=1, queue_size=1)
+        release = threading.Event()
+        try:
+            running = executor.submit("llm", release.wait)
+            queued = executor.submit("llm", release.wait)
+            with pytest.raises(QueueFullError) as exc_info:
+                executor.submit("llm", release.wait)
+            assert exc_info.value.retry_after > 0
+            assert executor.get_stats()["llm"]["rejected"] == 1
+
+            release.set()
+            running.result(timeout=5)
+            queued.result(timeout=5)
+
+            # Capacity is released once work completes
+            assert executor.submit("llm", lambda: "ok").result(timeout=5) == "ok"
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_stream_yields_generator_items(self):
+        executor = InferenceExecutor()
+        executor.register_pool("llm", workers=1, queue_size=1)
+
+        def tokens(n):
+            for i in range(n):
+                yield f"t{i}"
+
+        async def collect():
+            return [token async for token in executor.stream("llm", tokens, 3)]
+
+        try:
+            assert asyncio.run(collect()) == ["t0", "t1", "t2"]
+        finally:
+            executor.shutdown()
+
+    def test_stream_propagates_errors(self):
+        executor = InferenceExecutor()
+        executor.register_pool("llm", workers=1, queue_size=1)
+
+        def failing():
+            yield "partial"
+            raise ValueError("decode failed")
+
+        async def collect():
+            seen = []
+            with pytest.raises(ValueError):
+                async for token in executor.stream("llm", failing):
+                    seen.append(token)
+            return seen
+
+        try:
+            assert asyncio.run(collect()) == ["partial"]
+        finally:
+            executor.shutdown()
+
+    def test_unknown_pool(self):
+        executor = InferenceExecutor()
+        with pytest.raises(KeyError):
+            executor.submit("missing", lambda: None)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
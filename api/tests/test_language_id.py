@@ -0,0 +1,41 @@
+import pytest
+
+from services.language_id import LanguageIdentifier, char_ngrams
+
+class TestLanguageIdentifier:
+    """English vs Kinyarwanda detection from character n-grams"""
+
+    @pytest.fixture(scope="class")
+    def identifier(self):
+        identifier = LanguageIdentifier()
+        identifier.load()
+        return identifier
+
+    def test_ngrams_mark_word_edges(self):
+        grams = char_ngrams("Mu", max_n=2)
+        assert " m" in grams and "u " in grams
+        assert char_ngrams("2024 !!") == []
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Where can I find a good restaurant near the hotel?", "en"),
+        ("How much does the gorilla permit cost?", "en"),
+        ("Ndashaka kujya ku isoko rya Kimironko", "rw"),
+        ("Murakoze cyane, mwaramutse", "rw"),
+        ("Amafaranga angahe?", "rw"),
+    ])
+    def test_detects_language(self, identifier, text, expected):
+        lang, confidence = identifier.detect(text)
+        assert lang == expected
+        assert confidence > 0.9
+
+    def test_no_letters_is_undetermined(self, identifier):
+        assert identifier.detect("12:30 !!") == (None, 0.0)
+
+    def test_stats_count_detections(self, identifier):
+        identifier.detect("Thank you very much")
+        stats = identifier.get_stats()
+        assert stats["detections"]["en"] >= 1
+        assert stats["avg_us"] > 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
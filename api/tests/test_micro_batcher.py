@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from services.inference_executor import QueueFullError
+from services.micro_batcher import MicroBatcher, gather, length_buckets
+
+class TestMicroBatcher:
+    """Request coalescing for batched model calls"""
+
+    def test_concurrent_requests_share_a_batch(self):
+        calls = []
+
+        def batch_fn(payloads):
+            calls.append(list(payloads))
+            return [p.upper() for p in payloads]
+
+        batcher = MicroBatcher("test", batch_fn, max_batch_size=4, max_wait_ms=200)
+        batcher.start()
+        try:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda p: batcher.submit(p).result(timeout=5), ["a", "b", "c", "d"]))
+        finally:
+            batcher.stop()
+
+        assert results == ["A", "B", "C", "D"]
+        assert sum(len(c) for c in calls) == 4
+        assert len(calls) < 4
+
+        stats = batcher.get_stats()
+        assert stats["items"] == 4
+        assert stats["avg_batch_size"] > 1
+
+    def test_batch_errors_reach_every_caller(self):
+        def batch_fn(payloads):
+            raise ValueError("model crashed")
+
+        batcher = MicroBatcher("test", batch_fn, max_batch_size=2, max_wait_ms=1)
+        batcher.start()
+        try:
+            with pytest.raises(ValueError):
+                batcher.submit("x").result(timeout=5)
+        finally:
+            batcher.stop()
+
+    def test_full_queue_is_rejected(self):
+        batcher = MicroBatcher("test", lambda p: p, max_batch_size=1, max_wait_ms=1, queue_size=1)
+        batcher.submit("queued")
+        with pytest.raises(QueueFullError):
+            batcher.submit("overflow")
+
+    def test_submit_with_timeout_waits_for_space(self):
+        batcher = MicroBatcher("test", lambda p: p, max_batch_size=2, max_wait_ms=1, queue_size=2)
+        batcher.start()
+        try:
+            futures = [batcher.submit(i, timeout=5) for i in range(20)]
+            assert [future.result(timeout=5) for future in futures] == list(range(20))
+        finally:
+            batcher.stop()
+
+    def test_submit_timeout_expires_on_full_queue(self):
+        batcher = MicroBatcher("test", lambda p: p, max_batch_size=1, max_wait_ms=1, queue_size=1)
+        batcher.submit("queued")
+        with pytest.raises(QueueFullError):
+            batcher.submit("overflow", timeout=0.05)
+
+    def test_stop_does_not_block_on_a_full_queue(self):
+        release = threading.Event()
+
+        def batch_fn(payloads):
+            release.wait(5)
+            return payloads
+
+        batcher = MicroBatcher("test", batch_fn, max_batch_size=1, max_wait_ms=1, queue_size=1)
+        batcher.start()
+        batcher.submit("running")
+        time.sleep(0.05)
+        batcher.submit("queued")
+
+        stopper = threading.Thread(target=batcher.stop, daemon=True)
+        stopper.start()
+        time.sleep(0.05)
+        release.set()
+        # The dispatcher exits after the running batch, leaving the queue full
+        stopper.join(timeout=2)
+        assert not stopper.is_alive()
+
+    def test_cancelled_payloads_are_skipped(self):
+        calls = []
+
+        def batch_fn(payloads):
+            calls.append(list(payloads))
+            return payloads
+
+        batcher = MicroBatcher("test", batch_fn, max_batch_size=4, max_wait_ms=50)
+        cancelled = batcher.submit("cancelled")
+        kept = batcher.submit("kept")
+        assert cancelled.cancel()
+        batcher.start()
+        try:
+            assert kept.result(timeout=5) == "kept"
+        finally:
+            batcher.stop()
+        assert calls == [["kept"]]
+
+class TestLengthBuckets:
+    """Grouping texts of similar length to limit padding"""
+
+    def test_similar_lengths_share_a_bucket(self):
+        lengths = [10, 200, 12, 190, 11]
+        buckets = length_buckets(lengths, max_bucket_size=8)
+        assert buckets == [[0, 4, 2], [3, 1]]
+
+    def test_every_index_appears_once(self):
+        lengths = [5, 80, 40, 3, 300, 41, 7]
+        buckets = length_buckets(lengths, max_bucket_size=2)
+        assert sorted(i for bucket in buckets for i in bucket) == list(range(len(lengths)))
+        assert all(len(bucket) <= 2 for bucket in buckets)
+
+    def test_empty_input(self):
+        assert length_buckets([], max_bucket_size=4) == []
+
+class TestGather:
+    """Combining per-sentence futures into one result"""
+
+    def test_results_are_combined_in_order(self):
+        futures = [Future(), Future(), Future()]
+        combined = gather(futures, " ".join)
+        futures[2].set_result("c")
+        futures[0].set_result("a")
+        assert not combined.done()
+        futures[1].set_result("b")
+        assert combined.result(timeout=1) == "a b c"
+
+    def test_errors_propagate(self):
+        futures = [Future(), Future()]
+        combined = gather(futures, list)
+        futures[0].set_result("a")
+        futures[1].set_exception(ValueError("failed"))
+        with pytest.raises(ValueError):
+            combined.result(timeout=1)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
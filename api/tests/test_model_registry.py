@@ -0,0 +1,129 @@
+import pytest
+
+from services.model_registry import ModelRegistry, parameter_bytes
+
+class FakeParameter:
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+    def numel(self):
+        return self.nbytes
+
+    def element_size(self):
+        return 1
+
+class FakeModel:
+    """Stands in for a torch model of a given size"""
+    def __init__(self, size_mb):
+        self.params = [FakeParameter(size_mb * 1024 * 1024)]
+
+    def parameters(self):
+        return iter(self.params)
+
+def use(registry, name):
+    """Borrow a model briefly, as a service call would"""
+    with registry.acquire(name) as model:
+        return model
+
+class TestModelRegistry:
+    """Lazy loading and RAM-budgeted eviction"""
+
+    def make_registry(self, budget_mb, sizes, idle_ttl=0):
+        registry = ModelRegistry(budget_mb=budget_mb, idle_ttl=idle_ttl)
+        loads = []
+        for name, size in sizes.items():
+            def loader(name=name, size=size):
+                loads.append(name)
+                return FakeModel(size)
+            registry.register(name, loader, size_hint_mb=size)
+        return registry, loads
+
+    def test_models_load_on_first_use_only(self):
+        registry, loads = self.make_registry(100, {"a": 10})
+        assert loads == []
+        assert not registry.is_loaded("a")
+
+        first = use(registry, "a")
+        second = use(registry, "a")
+
+        assert first is second
+        assert loads == ["a"]
+        assert registry.get_stats()["models"]["a"]["size_mb"] == 10.0
+
+    def test_least_recently_used_idle_model_is_evicted(self):
+        registry, loads = self.make_registry(100, {"a": 40, "b": 40, "c": 40})
+        use(registry, "a")
+        use(registry, "b")
+        use(registry, "a")  # b is now least recently used
+        use(registry, "c")
+
+        assert registry.is_loaded("a")
+        assert not registry.is_loaded("b")
+        assert registry.is_loaded("c")
+        assert registry.get_stats()["models"]["b"]["evictions"] == 1
+        assert registry.resident_bytes() <= 100 * 1024 * 1024
+
+    def test_models_in_use_are_not_evicted(self):
+        registry, loads = self.make_registry(100, {"a": 60, "b": 60})
+        with registry.acquire("a"):
+            use(registry, "b")
+            assert registry.is_loaded("a")
+            assert registry.get_stats()["models"]["a"]["in_use"] == 1
+
+        # a was pinned, so the budget is exceeded until it becomes idle again
+        use(registry, "a")
+        assert not registry.is_loaded("b")
+
+    def test_evicted_model_reloads(self):
+        registry, loads = self.make_registry(50, {"a": 40, "b": 40})
+        use(registry, "a")
+        use(registry, "b")
+        use(registry, "a")
+
+        assert loads == ["a", "b", "a"]
+        assert registry.get_stats()["models"]["a"]["loads"] == 2
+
+    def test_idle_models_are_evicted_after_ttl(self):
+        registry, loads = self.make_registry(100, {"a": 10, "b": 10}, idle_ttl=60)
+        use(registry, "a")
+        use(registry, "b")
+
+        registry.resident["a"]["last_used"] -= 120
+        assert registry.evict_idle() == 1
+        assert not registry.is_loaded("a")
+        assert registry.is_loaded("b")
+
+        use(registry, "a")
+        assert loads == ["a", "b", "a"]
+
+    def test_models_in_use_outlive_the_ttl(self):
+        registry, _ = self.make_registry(100, {"a": 10}, idle_ttl=60)
+        with registry.acquire("a"):
+            registry.resident["a"]["last_used"] -= 120
+            assert registry.evict_idle() == 0
+        # Releasing the model restarts its idle clock
+        assert registry.evict_idle() == 0
+        assert registry.is_loaded("a")
+
+    def test_zero_ttl_disables_idle_eviction(self):
+        registry, _ = self.make_registry(100, {"a": 10})
+        use(registry, "a")
+        registry.resident["a"]["last_used"] -= 10 ** 6
+        assert registry.evict_idle() == 0
+        registry.start()
+        assert registry.reaper is None
+
+    def test_unknown_model_raises(self):
+        registry = ModelRegistry(budget_mb=10)
+        with pytest.raises(KeyError):
+            use(registry, "missing")
+
+    def test_parameter_bytes_finds_wrapped_models(self):
+        class Pipeline:
+            model = FakeModel(3)
+
+        assert parameter_bytes(Pipeline()) == 3 * 1024 * 1024
+        assert parameter_bytes(object()) == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from langchain.embeddings.base import Embeddings
+from langchain.schema import Document
+
+from services.numpy_store import NumpyVectorStore, mmr_select, top_k
+
+class LetterEmbeddings(Embeddings):
+    """Letter-count vectors: texts sharing letters are similar"""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        vector = [0.0] * 26
+        for char in text.lower():
+            if "a" <= char <= "z":
+                vector[ord(char) - ord("a")] += 1.0
+        return vector
+
+TEXTS = ["aaa", "aab", "aab ", "zzz", "zzy"]
+
+class TestNumpyVectorStore:
+    """Exact search over a normalized embedding matrix"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return NumpyVectorStore.from_texts(TEXTS, LetterEmbeddings(), [{"n": i} for i in range(len(TEXTS))],
+                                           path=tmp_path)
+
+    def test_top_k_orders_best_first(self):
+        assert top_k(np.array([0.1, 0.9, 0.5, 0.7]), 3).tolist() == [1, 3, 2]
+        assert top_k(np.array([0.3]), 5).tolist() == [0]
+
+    def test_similarity_search_is_exact(self, store):
+        results = store.similarity_search_with_score("zzz", k=2)
+        assert [doc.page_content for doc, _ in results] == ["zzz", "zzy"]
+        assert results[0][1] == pytest.approx(1.0)
+
+    def test_mmr_skips_near_duplicates(self, store):
+        plain = store.similarity_search("aab", k=2)
+        diverse = store.max_marginal_relevance_search("aab", k=2, fetch_k=5, lambda_mult=0.3)
+        assert {doc.page_content for doc in plain} == {"aab", "aab "}
+        assert diverse[0].page_content in ("aab", "aab ")
+        assert diverse[1].page_content not in ("aab", "aab ")
+
+    def test_mmr_with_lambda_one_is_similarity_order(self):
+        rows = np.eye(3, dtype=np.float32)
+        assert mmr_select(rows, np.array([0.2, 0.9, 0.5], dtype=np.float32), 3, 1.0) == [1, 2, 0]
+
+    @pytest.mark.parametrize("dtype", ["float32", "float16"])
+    def test_save_and_memory_mapped_load(self, tmp_path, dtype):
+        store = NumpyVectorStore.from_texts(TEXTS, LetterEmbeddings(), path=tmp_path, dtype=dtype)
+        store.save()
+
+        loaded = NumpyVectorStore.load(LetterEmbeddings(), tmp_path)
+        assert isinstance(loaded.matrix, np.memmap)
+        assert loaded.matrix.dtype == np.dtype(dtype)
+        assert loaded.ids == store.ids
+        assert loaded.similarity_search("zzy", k=1)[0].page_content == "zzy"
+
+    def test_load_missing_store(self, tmp_path):
+        assert NumpyVectorStore.load(LetterEmbeddings(), tmp_path / "missing") is None
+
+    def test_delete_and_add(self, store):
+        doc_id = store.ids[TEXTS.index("zzz")]
+        assert store.delete([doc_id])
+        assert store.similarity_search("zzz", k=1)[0].page_content == "zzy"
+
+        store.add_vectors(np.array([LetterEmbeddings().embed_query("zzz")]), [Document(page_content="zzz")])
+        assert len(store) == len(TEXTS)
+        assert store.similarity_search("zzz", k=1)[0].page_content == "zzz"
+
+    def test_retriever_contract(self, store):
+        retriever = store.as_retriever(search_type="mmr", search_kwargs={"k": 2})
+        assert len(retriever.invoke("aab")) == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,40 @@
+import pytest
+
+from services.phrasebook import Phrasebook
+
+class TestPhrasebook:
+    """Fixed-phrase translations without the model"""
+
+    @pytest.fixture
+    def phrasebook(self):
+        phrasebook = Phrasebook()
+        phrasebook.load()
+        return phrasebook
+
+    def test_exact_phrases_ignore_case_and_punctuation(self, phrasebook):
+        assert phrasebook.lookup("rw2en", "murakoze!") == "Thank you"
+        assert phrasebook.lookup("rw2en", "Amakuru") == "How are you?"
+        assert phrasebook.lookup("en2rw", "where is the TOILET") == "Ubwiherero buri he?"
+
+    def test_clauses_are_composed_from_known_phrases(self, phrasebook):
+        assert phrasebook.lookup("rw2en", "Muraho, murakoze cyane!") == "Hello, Thank you very much!"
+
+    def test_partial_coverage_falls_through_to_the_model(self, phrasebook):
+        assert phrasebook.lookup("en2rw", "Hello, where can I buy a SIM card?") is None
+        # Vocabulary entries only match a whole input
+        assert phrasebook.lookup("en2rw", "Water") == "Amazi"
+        assert phrasebook.lookup("en2rw", "Food market") is None
+
+    def test_hit_rate(self, phrasebook):
+        phrasebook.lookup("rw2en", "Muraho")
+        phrasebook.lookup("rw2en", "Muraho, amakuru?")
+        phrasebook.lookup("rw2en", "Ndashaka kujya i Musanze")
+
+        stats = phrasebook.get_stats()
+        assert stats["exact_hits"] == 1
+        assert stats["composed_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == round(2 / 3, 3)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
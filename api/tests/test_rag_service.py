@@ -0,0 +1,177 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from config import settings
+from services.inference_executor import InferenceExecutor
+from services.rag_service import RAGService
+from services.semantic_cache import SemanticCache
+
+CORPUS = [
+    {"question": "Is Kigali safe?", "answer": "Yes, Kigali is one of the safest cities in Africa."},
+    {"question": "When is the best time to visit Rwanda?", "answer": "June to September, in the dry season."},
+]
+
+class StubVectorStoreService:
+    """Bag-of-words question matching that counts how often queries are embedded"""
+    vocab = ["kigali", "safe", "visit", "best", "time", "rwanda", "gorillas", "price"]
+
+    def __init__(self):
+        self.index_id = "index-1"
+        self.embedded = 0
+        self.question_items = CORPUS
+        self.question_vectors = np.stack([self.embed_query(item["question"]) for item in CORPUS])
+        self.embedded = 0
+
+    def embed_query(self, text):
+        self.embedded += 1
+        words = text.lower().replace("?", "").split()
+        vector = np.asarray([float(words.count(w)) for w in self.vocab], dtype=np.float32) + 0.01
+        return vector / np.linalg.norm(vector)
+
+    def match_question(self, query_vector):
+        scores = self.question_vectors @ query_vector
+        best = int(np.argmax(scores))
+        return float(scores[best]), self.question_items[best]
+
+class StubChain:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, text, config=None):
+        self.calls += 1
+        return "Generated answer."
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor()
+    executor.register_pool("embedding", workers=1, queue_size=8)
+    executor.register_pool("llm", workers=1, queue_size=8)
+    yield executor
+    executor.shutdown()
+
+@pytest.fixture
+def vector_store():
+    return StubVectorStoreService()
+
+@pytest.fixture
+def service(vector_store, tmp_path):
+    service = RAGService(vector_store)
+    service.rag_chain = StubChain()
+    service.semantic_cache = SemanticCache(vector_store, cache_dir=tmp_path)
+    return service
+
+class TestAnswerPaths:
+    """Direct answers, the semantic cache and LLM generation"""
+
+    def test_direct_answer_above_threshold(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "direct_answer_enabled", True)
+        monkeypatch.setattr(settings, "direct_answer_threshold", 0.9)
+
+        result = service.answer("is kigali safe")
+
+        assert result == {"response": CORPUS[0]["answer"], "service_used": "RAG-direct"}
+        assert service.rag_chain.calls == 0
+
+    def test_no_direct_answer_below_threshold(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "direct_answer_enabled", True)
+        monkeypatch.setattr(settings, "direct_answer_threshold", 0.9)
+
+        # Shares "kigali" with a corpus question, but not closely enough
+        assert service.fast_answer("Kigali gorillas price")[0] is None
+        assert service.answer("Kigali gorillas price")["service_used"] == "RAG"
+        assert service.rag_chain.calls == 1
+
+    def test_repeated_query_is_served_from_the_cache(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "direct_answer_enabled", True)
+
+        service.answer("How much do gorillas permits cost?")
+        result = service.answer("how much do gorillas permits cost")
+
+        assert result == {"response": "Generated answer.", "service_used": "RAG-cache"}
+        assert service.rag_chain.calls == 1
+
+    def test_path_counts_and_direct_rate(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "direct_answer_enabled", True)
+        monkeypatch.setattr(settings, "direct_answer_threshold", 0.9)
+        assert service.get_stats()["direct_rate"] == 0.0
+
+        service.answer("Is Kigali safe?")
+        service.answer("best time to visit rwanda")
+        service.answer("How much do gorillas permits cost?")
+        service.answer("How much do gorillas permits cost?")
+
+        stats = service.get_stats()
+        assert (stats["direct"], stats["cache"], stats["llm"]) == (2, 1, 1)
+        assert stats["direct_rate"] == 0.5
+
+    def test_fast_path_can_be_skipped(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "direct_answer_enabled", True)
+
+        assert service.answer("Is Kigali safe?", use_fast_path=False)["service_used"] == "RAG"
+        assert service.get_stats()["direct"] == 0
+
+    def test_llm_answer_embeds_the_query_once(self, service, vector_store):
+        result = service.answer("How much do gorillas permits cost?")
+
+        assert result["service_used"] == "RAG"
+        assert vector_store.embedded == 1
+        assert service.semantic_cache.get_stats()["entries"] == 1
+
+    def test_fast_path_miss_hands_its_vector_to_the_llm_path(self, service, vector_store):
+        # The /ask endpoint: fast paths on the embedding pool, then the LLM path
+        result, query_vector = service.fast_answer("How much do gorillas permits cost?")
+        assert result is None
+        result = service.answer("How much do gorillas permits cost?", use_fast_path=False, query_vector=query_vector)
+
+        assert result["service_used"] == "RAG"
+        assert vector_store.embedded == 1
+
+    def test_cache_only_serves_default_generation_options(self, service):
+        service.answer("How much do gorillas permits cost?")
+
+        result = service.answer("How much do gorillas permits cost?", max_sentences=1)
+        assert result["service_used"] == "RAG"
+        result = service.answer("How much do gorillas permits cost?", stop=["Permits"])
+        assert result["service_used"] == "RAG"
+        # Answers generated with custom options are not cached for default requests either
+        assert service.semantic_cache.get_stats()["entries"] == 1
+        assert service.rag_chain.calls == 3
+
+class TestStreaming:
+    """astream reports which path produced the answer"""
+
+    def stream(self, service, executor, text):
+        result = {}
+
+        async def consume():
+            return "".join([token async for token in service.astream(text, executor, result=result)])
+
+        return asyncio.run(consume()), result["service_used"]
+
+    @pytest.fixture
+    def streaming(self, service, monkeypatch):
+        monkeypatch.setattr(service, "retrieve", lambda text: [])
+        monkeypatch.setattr(service, "build_prompt", lambda text, docs: text)
+        monkeypatch.setattr(service, "stream_prompt", lambda prompt, options: iter(["Generated ", "answer."]))
+        return service
+
+    def test_stream_reports_each_path(self, streaming, executor, monkeypatch):
+        monkeypatch.setattr(settings, "direct_answer_enabled", True)
+        monkeypatch.setattr(settings, "direct_answer_threshold", 0.9)
+
+        assert self.stream(streaming, executor, "Is Kigali safe?") == (CORPUS[0]["answer"], "RAG-direct")
+        assert self.stream(streaming, executor, "How much do gorillas permits cost?") == ("Generated answer.", "RAG")
+        assert self.stream(streaming, executor, "How much do gorillas permits cost?") == ("Generated answer.", "RAG-cache")
+
+    def test_prompt_is_built_off_the_event_loop(self, streaming, executor, monkeypatch):
+        threads = []
+        monkeypatch.setattr(streaming, "build_prompt", lambda text, docs: threads.append(threading.current_thread()) or text)
+
+        assert self.stream(streaming, executor, "How much do gorillas permits cost?")[1] == "RAG"
+        assert threads and threads[0] is not threading.main_thread()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
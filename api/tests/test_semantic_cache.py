@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+import pytest
+
+from services.semantic_cache import SemanticCache
+
+class FakeEmbeddings:
+    """Deterministic bag-of-words embeddings for tests"""
+    vocab = ["kigali", "safe", "visit", "best", "time", "rwanda", "is", "when"]
+
+    def embed_query(self, text):
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(w)) for w in self.vocab]
+
+class FakeVectorStoreService:
+    def __init__(self):
+        self.embeddings = FakeEmbeddings()
+        self.index_id = "index-1"
+
+    def embed_query(self, text):
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+@pytest.fixture
+def vector_store():
+    return FakeVectorStoreService()
+
+class TestSemanticCache:
+    """Embedding-keyed answer cache"""
+
+    def test_similar_query_hits(self, vector_store, tmp_path):
+        cache = SemanticCache(vector_store, cache_dir=tmp_path)
+        cache.threshold = 0.9
+        cache.store("Is Kigali safe?", "Yes, Kigali is very safe.")
+
+        assert cache.lookup("is kigali safe") == "Yes, Kigali is very safe."
+        assert cache.lookup("best time to visit Rwanda?") is None
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    def test_ttl_and_lru_eviction(self, vector_store, tmp_path):
+        cache = SemanticCache(vector_store, cache_dir=tmp_path)
+        cache.max_entries = 1
+        cache.store("Is Kigali safe?", "Yes.")
+        cache.store("When is the best time to visit Rwanda?", "June to September.")
+        assert cache.lookup("Is Kigali safe?") is None
+        assert cache.get_stats()["entries"] == 1
+
+        cache.ttl = 0
+        time.sleep(0.01)
+        assert cache.lookup("When is the best time to visit Rwanda?") is None
+
+    def test_index_rebuild_invalidates(self, vector_store, tmp_path):
+        cache = SemanticCache(vector_store, cache_dir=tmp_path)
+        cache.store("Is Kigali safe?", "Yes.")
+        vector_store.index_id = "index-2"
+        assert cache.lookup("Is Kigali safe?") is None
+
+    def test_persistence_round_trip(self, vector_store, tmp_path):
+        cache = SemanticCache(vector_store, cache_dir=tmp_path)
+        cache.store("Is Kigali safe?", "Yes.")
+        cache.save()
+
+        restored = SemanticCache(vector_store, cache_dir=tmp_path)
+        restored.load()
+        assert restored.lookup("Is Kigali safe?") == "Yes."
+
+        vector_store.index_id = "index-2"
+        stale = SemanticCache(vector_store, cache_dir=tmp_path)
+        stale.load()
+        assert stale.get_stats()["entries"] == 0
+
+    def test_save_replaces_files_atomically(self, vector_store, tmp_path):
+        cache = SemanticCache(vector_store, cache_dir=tmp_path)
+        cache.store("Is Kigali safe?", "Yes.")
+        cache.save()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["entries.json", "vectors.npy"]
+
+        # Vectors that do not line up with the entries are discarded, not misassigned
+        np.save(tmp_path / "vectors.npy", np.zeros((3, 8), dtype=np.float32))
+        restored = SemanticCache(vector_store, cache_dir=tmp_path)
+        restored.load()
+        assert restored.get_stats()["entries"] == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,33 @@
+import pytest
+
+from utils.text import split_sentences
+
+class TestSplitSentences:
+    """Sentence segmentation used before translation"""
+
+    def test_splits_on_terminal_punctuation(self):
+        segments = split_sentences("Hello there. Is it far? Yes!")
+        assert [s for s, _ in segments] == ["Hello there.", "Is it far?", "Yes!"]
+
+    def test_english_abbreviations_and_decimals_do_not_split(self):
+        segments = split_sentences("Mr. Smith arrives at 3 p.m. today. The fee is 3.5 USD.")
+        assert [s for s, _ in segments] == ["Mr. Smith arrives at 3 p.m. today.", "The fee is 3.5 USD."]
+
+    def test_kinyarwanda_abbreviations(self):
+        segments = split_sentences("Nyakub. Minisitiri yaje. Dr. Kamali ari i Kigali.", "rw")
+        assert [s for s, _ in segments] == ["Nyakub. Minisitiri yaje.", "Dr. Kamali ari i Kigali."]
+
+    def test_line_breaks_are_boundaries_and_preserved(self):
+        text = "Muraho\n1. Pasiporo\n2. Viza"
+        segments = split_sentences(text, "rw")
+        assert [s for s, _ in segments] == ["Muraho", "1. Pasiporo", "2. Viza"]
+        assert "".join(s + sep for s, sep in segments) == text
+
+    def test_long_sentences_are_wrapped(self):
+        text = ", ".join(["word"] * 200) + "."
+        segments = split_sentences(text, max_chars=100)
+        assert len(segments) > 1
+        assert all(len(s) <= 100 for s, _ in segments)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,104 @@
+import pytest
+
+from services.translation_memory import TranslationMemory
+
+class TestTranslationMemory:
+    """Exact and fuzzy reuse of past translations"""
+
+    def make_memory(self, tmp_path, fuzzy=False):
+        memory = TranslationMemory(db_path=tmp_path / "tm.db")
+        memory.fuzzy_enabled = fuzzy
+        memory.load()
+        return memory
+
+    def test_exact_hit_ignores_case_and_spacing(self, tmp_path):
+        memory = self.make_memory(tmp_path)
+        memory.store("en2rw", "Thank you", "Murakoze")
+
+        assert memory.lookup("en2rw", "  thank   YOU ") == "Murakoze"
+        assert memory.lookup("rw2en", "Thank you") is None
+
+    def test_exact_only_by_default(self, tmp_path):
+        memory = TranslationMemory(db_path=tmp_path / "tm.db")
+        memory.load()
+        memory.store("en2rw", "How much does a taxi to the airport cost?", "Tagisi ijya ku kibuga cy'indege igura angahe?")
+
+        assert memory.lookup("en2rw", "How much does a taxi to the airport cost") is None
+        assert memory.get_stats()["indexed_entries"] == 0
+
+    def test_fuzzy_hit_for_near_duplicates_only(self, tmp_path):
+        memory = self.make_memory(tmp_path, fuzzy=True)
+        memory.store("en2rw", "How much does a taxi to the airport cost?", "Tagisi ijya ku kibuga cy'indege igura angahe?")
+
+        assert memory.lookup("en2rw", "How much does a taxi to the airport cost") is not None
+        assert memory.lookup("en2rw", "Where can I buy a SIM card?") is None
+
+        stats = memory.get_stats()
+        assert stats["fuzzy_hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.parametrize("stored,query", [
+        ("The bus leaves at 8 am from Nyabugogo", "The bus leaves at 9 am from Nyabugogo"),
+        ("I would like two tickets for the morning bus to Musanze please",
+         "I would like three tickets for the morning bus to Musanze please"),
+        ("My booking is for Room 12 at the hotel", "My booking is for Room 13 at the hotel"),
+        ("The road to the lake is safe at night", "The road to the lake is not safe at night"),
+    ])
+    def test_fuzzy_never_changes_numbers_or_negation(self, tmp_path, stored, query):
+        memory = self.make_memory(tmp_path, fuzzy=True)
+        memory.store("en2rw", stored, "stored translation")
+
+        assert memory.lookup("en2rw", query) is None
+
+    def test_entries_persist_across_restarts(self, tmp_path):
+        memory = self.make_memory(tmp_path)
+        memory.store("rw2en", "Muraho", "Hello")
+        memory.close()
+
+        reloaded = self.make_memory(tmp_path)
+        assert reloaded.lookup("rw2en", "muraho") == "Hello"
+        assert reloaded.get_stats()["exact_hits"] == 1
+
+    def test_fuzzy_index_is_capped(self, tmp_path):
+        memory = self.make_memory(tmp_path, fuzzy=True)
+        memory.max_entries = 2
+        for i in range(5):
+            memory.store("en2rw", f"phrase number {i}", f"interuro {i}")
+
+        assert memory.get_stats()["indexed_entries"] == 2
+        # Entries dropped from the fuzzy index still hit exactly through SQLite
+        memory.flush()
+        memory.lru.clear()
+        assert memory.lookup("en2rw", "phrase number 0") == "interuro 0"
+
+    def test_writes_are_batched_off_the_caller(self, tmp_path):
+        memory = self.make_memory(tmp_path)
+        with memory.db_lock:
+            # The writer is blocked on the database; store() must not wait for it
+            for i in range(50):
+                memory.store("en2rw", f"sentence {i}", f"interuro {i}")
+            assert memory.lookup("en2rw", "sentence 7") == "interuro 7"
+
+        memory.flush()
+        rows = memory.conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0]
+        assert rows == 50
+
+    def test_entries_only_serve_their_tier_or_cheaper(self, tmp_path):
+        memory = self.make_memory(tmp_path, fuzzy=True)
+        memory.store("en2rw", "Where is the bus station?", "Gare iri he?", tier="fast")
+
+        assert memory.lookup("en2rw", "Where is the bus station?", tier="fast") == "Gare iri he?"
+        assert memory.lookup("en2rw", "Where is the bus station?", tier="balanced") is None
+        assert memory.lookup("en2rw", "Where is the bus station", tier="balanced") is None
+
+        memory.store("en2rw", "Where is the bus station?", "Sitasiyo ya bisi iri he?", tier="best")
+        memory.store("en2rw", "Where is the bus station?", "Gare iri he?", tier="fast")
+        memory.flush()
+        memory.lru.clear()
+
+        # A cheaper tier never overwrites a better translation, in memory or on disk
+        assert memory.lookup("en2rw", "Where is the bus station?", tier="best") == "Sitasiyo ya bisi iri he?"
+        assert memory.lookup("en2rw", "Where is the bus station?", tier="fast") == "Sitasiyo ya bisi iri he?"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
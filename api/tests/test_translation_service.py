@@ -0,0 +1,109 @@
+import pytest
+
+from config import settings
+from services import translation
+from services.inference_executor import QueueFullError
+from services.model_registry import ModelRegistry
+from services.translation import TranslationService
+from services.translation_memory import TranslationMemory
+
+MODEL = "translation:test-model"
+
+class FakeTranslator:
+    """Upper-cases each text and records the generate calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, texts, src_lang, tgt_lang, **generate_kwargs):
+        self.calls.append((list(texts), generate_kwargs))
+        return [text.upper() for text in texts]
+
+@pytest.fixture
+def translator(monkeypatch):
+    translator = FakeTranslator()
+    registry = ModelRegistry(budget_mb=100)
+    registry.register(MODEL, lambda: translator)
+    monkeypatch.setattr(translation, "model_registry", registry)
+    return translator
+
+@pytest.fixture
+def service(translator, tmp_path):
+    service = TranslationService()
+    service.models = {"en2rw": MODEL, "rw2en": MODEL}
+    service.memory = TranslationMemory(db_path=tmp_path / "tm.db")
+    service.memory.load()
+    service.start_batchers()
+    yield service
+    service.shutdown()
+
+class TestSubmit:
+    """Sentence splitting, memory reuse and reassembly"""
+
+    def test_sentences_are_reassembled_in_order(self, service, translator):
+        service.memory.store("en2rw", "How are you?", "Amakuru?")
+
+        text = "Hello there.  How are you? The bus leaves at noon."
+        result = service.submit("en2rw", text, use_phrasebook=False, tier="fast").result(timeout=5)
+
+        assert result == "HELLO THERE.  Amakuru? THE BUS LEAVES AT NOON."
+        translated = [text for texts, _ in translator.calls for text in texts]
+        assert sorted(translated) == ["Hello there.", "The bus leaves at noon."]
+
+    def test_queue_full_cancels_queued_sentences(self, service, translator, monkeypatch):
+        batcher = service.batchers["en2rw"]
+        batcher.stop()
+        submitted = []
+        original_submit = batcher.submit
+
+        def submit(payload, timeout=None):
+            if submitted:
+                raise QueueFullError(batcher.name, 1)
+            submitted.append(original_submit(payload, timeout))
+            return submitted[-1]
+
+        monkeypatch.setattr(batcher, "submit", submit)
+        with pytest.raises(QueueFullError):
+            service.submit("en2rw", "First sentence. Second sentence.", use_phrasebook=False, tier="fast")
+        assert submitted[0].cancelled()
+
+    def test_memory_only_serves_the_same_or_a_better_tier(self, service, translator):
+        service.memory.store("en2rw", "Good morning.", "Mwaramutse.", tier="fast")
+
+        assert service.submit("en2rw", "Good morning.", use_phrasebook=False, tier="fast").result(timeout=5) == "Mwaramutse."
+        assert service.submit("en2rw", "Good morning.", use_phrasebook=False, tier="balanced").result(timeout=5) == "GOOD MORNING."
+        assert translator.calls == [(["Good morning."], {"num_beams": 2, "max_length": 400})]
+
+class TestTiers:
+    """Tier resolution and per-tier generation"""
+
+    def test_explicit_tier_wins(self, service):
+        assert service.resolve_tier("en2rw", "best") == "best"
+
+    def test_unknown_tier_is_rejected(self, service):
+        with pytest.raises(ValueError):
+            service.resolve_tier("en2rw", "perfect")
+
+    def test_default_tier_until_the_queue_backs_up(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "translation_default_tier", "balanced")
+        monkeypatch.setattr(settings, "translation_fast_tier_queue_depth", 2)
+        batcher = service.batchers["en2rw"]
+        batcher.stop()
+
+        assert service.resolve_tier("en2rw") == "balanced"
+        batcher.submit(("One.", "balanced"))
+        assert service.resolve_tier("en2rw") == "balanced"
+        batcher.submit(("Two.", "balanced"))
+        assert service.resolve_tier("en2rw") == "fast"
+        # An explicit tier is never downgraded
+        assert service.resolve_tier("en2rw", "best") == "best"
+
+    def test_batch_generates_once_per_tier(self, service, translator):
+        items = [("One.", "fast"), ("Two.", "best"), ("Three.", "fast")]
+
+        assert service.translate_batch("en2rw", items) == ["ONE.", "TWO.", "THREE."]
+        calls = sorted((kwargs["num_beams"], sorted(texts)) for texts, kwargs in translator.calls)
+        assert calls == [(1, ["One.", "Three."]), (5, ["Two."])]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
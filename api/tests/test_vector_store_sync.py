@@ -0,0 +1,91 @@
+import pytest
+
+from config import settings
+from services.vector_store import VectorStoreService
+from utils.helpers import content_hash, deduplicate_data
+
+class CountingEmbeddings:
+    """Letter-count embeddings that record how many texts were embedded"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(text.lower().count(chr(c))) + 0.01 for c in range(ord("a"), ord("z") + 1)]
+
+def qa(question, answer):
+    return {"question": question, "answer": answer, "source": "gov_faq"}
+
+CORPUS = [
+    qa("Is Kigali safe at night?", "Yes, Kigali is one of the safest cities in Africa."),
+    qa("Do I need a visa for Rwanda?", "Most visitors can get a visa on arrival."),
+    qa("What currency is used?", "The Rwandan franc (RWF) is the local currency."),
+]
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_db_path", str(tmp_path))
+    monkeypatch.setattr(settings, "vector_store_backend", "numpy")
+    service = VectorStoreService()
+    service.embeddings = CountingEmbeddings()
+    service.corpus = list(CORPUS)
+    service.load_corpus = lambda: deduplicate_data(service.corpus)
+    return service
+
+class TestContentHash:
+    """Stable identifiers for corpus entries"""
+
+    def test_hash_ignores_case_and_spacing(self):
+        assert content_hash("Is Kigali  safe?") == content_hash("is kigali safe?")
+        assert content_hash("a", "b") != content_hash("a b")
+        # Same value in every process, unlike the salted built-in hash()
+        assert content_hash("Kigali") == "fcb8c6fe3c375cf41265e84f18328d3c9b9c0466"
+
+class TestVectorStoreSync:
+    """Incremental index updates keyed by content hash"""
+
+    def test_unchanged_corpus_embeds_nothing(self, service):
+        service.create_vector_store()
+        index_id = service.index_id
+        service.embeddings.embedded = 0
+
+        assert service.load_existing_vector_store()
+        service.sync_vector_store()
+        assert service.embeddings.embedded == 0
+        assert service.index_id == index_id
+
+    def test_only_changed_pairs_are_embedded(self, service):
+        service.create_vector_store()
+        index_id = service.index_id
+        service.embeddings.embedded = 0
+
+        service.corpus[1] = qa("Do I need a visa for Rwanda?", "Citizens of every country get a visa on arrival.")
+        service.corpus.append(qa("Can I drink tap water?", "Boil or filter it first, or drink bottled water."))
+        del service.corpus[0]
+
+        assert service.load_existing_vector_store()
+        service.sync_vector_store()
+        assert service.embeddings.embedded == 2
+        assert service.index_id != index_id
+
+        stored = {doc.metadata["original_question"] for doc in service.vector_store.documents}
+        assert stored == {item["question"] for item in service.corpus}
+        assert service.load_existing_vector_store()
+        assert len(service.vector_store) == 3
+
+    def test_missing_manifest_rebuilds(self, service):
+        service.create_vector_store()
+        service.manifest_path.unlink()
+        service.embeddings.embedded = 0
+
+        assert service.load_existing_vector_store()
+        service.sync_vector_store()
+        assert service.embeddings.embedded == 3
+        assert service.read_manifest()["embedding_model"] == settings.embedding_model
+
+if __name__ == "__main__":
+    pytest.main([__file__])
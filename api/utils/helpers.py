@@ -1,5 +1,6 @@
 import os
 import json
+import hashlib
 import logging
 import sqlite3
 from pathlib import Path
@@ -27,6 +28,15 @@ def validate_qa_pair(item: Dict[str, Any]) -> bool:
         return False
     return True
 
+def content_hash(*parts: str) -> str:
+    """Stable SHA-1 of case- and whitespace-normalized text (unlike hash(), the same in every process)"""
+    normalized = "\n".join(" ".join(part.lower().split()) for part in parts)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+def qa_content_id(item: Dict[str, Any]) -> str:
+    """Content hash identifying a Q&A pair in the vector index"""
+    return content_hash(item['question'], item['answer'])
+
 def deduplicate_data(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Remove duplicate Q&A pairs based on question content"""
     seen = set()
@@ -34,7 +44,7 @@ def deduplicate_data(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     for item in data:
         if not validate_qa_pair(item):
             continue
-        question_hash = hash(item['question'].lower().strip())
+        question_hash = content_hash(item['question'])
         if question_hash not in seen:
             seen.add(question_hash)
             unique_data.append(item)
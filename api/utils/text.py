@@ -0,0 +1,80 @@
+import re
+from typing import List, Tuple
+
+# Abbreviations that end in a period without ending the sentence (lowercase, no trailing period)
+ABBREVIATIONS = {
+    "en": {
+        "mr", "mrs", "ms", "dr", "prof", "st", "mt", "ave", "rd", "no", "vs", "etc", "e.g", "i.e",
+        "approx", "dept", "est", "min", "max", "jan", "feb", "mar", "apr", "jun", "jul", "aug",
+        "sep", "sept", "oct", "nov", "dec", "a.m", "p.m", "u.s", "u.k",
+    },
+    "rw": {
+        # Nyakubahwa (Honourable), Madame, Mademoiselle, Monseigneur, numéro
+        "dr", "prof", "nyakub", "mme", "mlle", "mgr", "no", "n°", "st", "mt", "a.m", "p.m",
+    },
+}
+
+# Candidate boundary: terminal punctuation, optional closing quotes/brackets, then whitespace;
+# or a line break on its own (list items, greetings without punctuation)
+BOUNDARY = re.compile(r"[.!?…]+[\"'”’)\]]*(\s+)|(\s*\n\s*)")
+
+def _previous_token(text: str, end: int) -> str:
+    """The word (including inner periods) that ends just before the punctuation at end"""
+    start = end
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    return text[start:end].rstrip(".!?…\"'”’)]").lower()
+
+def _is_boundary(text: str, match: re.Match, abbreviations: set) -> bool:
+    if match.group(2) or "\n" in match.group(1):
+        return True
+    following = text[match.end():match.end() + 1]
+    # Sentences start with a capital, a digit or an opening quote/bracket
+    if following and not (following.isupper() or following.isdigit() or following in "\"'“‘(["):
+        return False
+    if match.group(0)[0] != ".":
+        return True
+    token = _previous_token(text, match.start() + 1)
+    # Abbreviations, initials ("J. Smith") and list numbers ("1.")
+    return not (token in abbreviations or len(token) == 1 or token.isdigit())
+
+def _wrap(sentence: str, max_chars: int) -> List[str]:
+    """Split an over-long sentence at clause or word boundaries"""
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = max(sentence.rfind(", ", 0, max_chars), sentence.rfind("; ", 0, max_chars))
+        cut = cut + 1 if cut > max_chars // 2 else sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    pieces.append(sentence)
+    return pieces
+
+def split_sentences(text: str, lang: str = "en", max_chars: int = 400) -> List[Tuple[str, str]]:
+    """Split text into (sentence, following whitespace) pairs.
+
+    Joining sentence + whitespace for every pair reproduces the text's layout,
+    so translations can be reassembled with the original line breaks.
+    Sentences longer than max_chars are wrapped at commas or spaces.
+    """
+    abbreviations = ABBREVIATIONS.get(lang, ABBREVIATIONS["en"])
+    segments = []
+    start = 0
+    for match in BOUNDARY.finditer(text):
+        if not _is_boundary(text, match, abbreviations):
+            continue
+        separator = match.group(1) or match.group(2)
+        end = match.start(1) if match.group(1) else match.start(2)
+        segments.append((text[start:end].strip(), separator))
+        start = match.end()
+    segments.append((text[start:].strip(), ""))
+
+    result = []
+    for sentence, separator in segments:
+        if not sentence:
+            continue
+        pieces = _wrap(sentence, max_chars)
+        result.extend((piece, " ") for piece in pieces[:-1])
+        result.append((pieces[-1], separator))
+    return result